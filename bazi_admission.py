@@ -0,0 +1,111 @@
+"""
+/bazi 的准入控制（负载削峰）：限制同时计算的请求数，超出的在有界队列里等待，
+队列满了或等待超过期限时立即返回 503 + Retry-After，而不是把请求全压到线程池 / 进程池的队列里，
+让所有人的延迟一起变长。
+
+- BAZI_MAX_INFLIGHT: 同时计算的请求数上限（默认 0，不限制）
+- BAZI_QUEUE_SIZE: 等待队列长度（默认 64；0 表示满了就直接拒绝）
+- BAZI_QUEUE_TIMEOUT: 在队列里最多等多少秒（默认 2）
+- BAZI_RETRY_AFTER: 503 响应的 Retry-After 秒数（默认 1）
+
+只在事件循环里使用（acquire / release 都在同一个线程），不需要锁。释放的名额直接交给队首的等待者（先到先得）。
+REQUEST_CACHE 命中的请求不经过这里（见 bazi_executor.run_summary_json）。
+正在计算的数、队列深度和拒绝次数从 /metrics 输出（bazi_admission_*），可以作为扩容信号。
+"""
+import asyncio
+import os
+from collections import deque
+
+ADMISSION_MAX_INFLIGHT = int(os.environ.get("BAZI_MAX_INFLIGHT", "0"))
+ADMISSION_QUEUE_SIZE = int(os.environ.get("BAZI_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("BAZI_QUEUE_TIMEOUT", "2"))
+ADMISSION_RETRY_AFTER = int(os.environ.get("BAZI_RETRY_AFTER", "1"))
+
+SHED_REASONS = ("queue_full", "timeout")
+
+
+class Overloaded(Exception):
+    """
+    请求被准入控制拒绝；reason 为 SHED_REASONS 之一，retry_after 为建议的重试秒数
+    """
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Server overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    计算名额（max_inflight，0 为不限制）+ 有界 FIFO 等待队列（queue_size）+ 等待期限（timeout 秒）
+    """
+
+    def __init__(self, max_inflight=ADMISSION_MAX_INFLIGHT, queue_size=ADMISSION_QUEUE_SIZE,
+                 timeout=ADMISSION_QUEUE_TIMEOUT, retry_after=ADMISSION_RETRY_AFTER):
+        self.max_inflight = max_inflight
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.inflight = 0
+        self._waiters = deque()  # 等待名额的 Future，按到达顺序
+        self.admitted = 0
+        self.queued = 0
+        self.shed = dict.fromkeys(SHED_REASONS, 0)
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def _reject(self, reason):
+        self.shed[reason] += 1
+        raise Overloaded(reason, self.retry_after)
+
+    async def acquire(self):
+        """
+        取得一个计算名额；队列满或等待超时抛 Overloaded。调用方算完后必须 release
+        """
+        if self.max_inflight <= 0 or (self.inflight < self.max_inflight and not self._waiters):
+            self.inflight += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait((waiter,), timeout=self.timeout)
+        except asyncio.CancelledError:  # 客户端断开：已经拿到的名额转给下一个
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            waiter.cancel()
+            self._reject("timeout")
+        self.admitted += 1  # 名额由 release 直接转交，inflight 不变
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.inflight -= 1
+
+    def stats(self):
+        return {
+            "max_inflight": self.max_inflight,
+            "queue_size": self.queue_size,
+            "inflight": self.inflight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+        }
+
+
+ADMISSION = AdmissionController()
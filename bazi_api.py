@@ -1,13 +1,92 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from bazi_calculator import generate_summary
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from bazi_admission import ADMISSION, Overloaded
+from bazi_calculator import SUMMARY_CACHE, get_profile, resolve_fields
+from bazi_executor import run_summary_json, shutdown_executor, start_executor, warm_up_service
+from bazi_json import REQUEST_CACHE, RESPONSE_CACHE, dumps
+from bazi_metrics import (
+    METRICS_ENABLED,
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    observe,
+    render_prometheus,
+)
+from bazi_profiles import init_profiles, profile_info, stop_watcher
+from bazi_store import get_store
+from bazi_sweep import SWEEP_MAX_PERIODS, iter_ndjson, parse_range, period_count, sweep
+from bazi_timezone import is_valid_timezone
+
+# 单次批量请求最多的记录数
+BATCH_MAX_RECORDS = int(os.environ.get("BAZI_BATCH_MAX", "10000"))
+
+# 启动预热: blocking（默认，预热完才开始接受请求）/ background（先接受请求，/ready 在预热完成前返回 503）/ off
+WARM_UP_MODES = ("blocking", "background", "off")
+WARM_UP_MODE = os.environ.get("BAZI_WARM_UP", "blocking").lower()
+if WARM_UP_MODE not in WARM_UP_MODES:
+    raise ValueError(f"Unknown BAZI_WARM_UP {WARM_UP_MODE!r}, expected one of {WARM_UP_MODES}")
+
+# /ready 的状态
+READINESS = {"ready": False, "warm_up": None, "seconds": None}
+
+
+async def _warm_up():
+    start = perf_counter()
+    READINESS["warm_up"] = await run_in_threadpool(warm_up_service)
+    READINESS["seconds"] = round(perf_counter() - start, 3)
+    READINESS["ready"] = True
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # 加载打分方案（BAZI_PROFILES）、打开预计算命盘库（BAZI_STORE），文件有问题时启动即失败；
+    # 再启动执行后端（BAZI_EXECUTOR=process 时先拉起并预热进程池）
+    init_profiles()
+    get_store()
+    if os.environ.get("BAZI_MATCH_INDEX"):
+        from bazi_match import get_index  # 合盘候选人索引（依赖 NumPy，只在配置了索引时导入）
+
+        get_index()
+    start_executor()
+    task = None
+    if WARM_UP_MODE == "blocking":
+        await _warm_up()
+    elif WARM_UP_MODE == "background":
+        task = asyncio.create_task(_warm_up())
+    else:
+        READINESS["ready"] = True
+    yield
+    READINESS["ready"] = False
+    if task is not None and not task.done():
+        task.cancel()
+    shutdown_executor()
+    stop_watcher()
+
+class TimedJSONResponse(JSONResponse):
+    # BAZI_METRICS=1 时记录 JSON 序列化耗时（stage="render_json"）
+    def render(self, content):
+        start = perf_counter()
+        try:
+            return super().render(content)
+        finally:
+            observe("render_json", perf_counter() - start)
 
 # Create FastAPI app (custom name)
 bazi_api = FastAPI(
     title="Bazi Analysis API",
     description="API for Bazi / Four Pillars of Destiny analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse if METRICS_ENABLED else JSONResponse
 )
 
 # Allow all origins (for now)
@@ -19,17 +98,215 @@ bazi_api.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    bazi_api.add_middleware(MetricsMiddleware)
+
 class BaziInput(BaseModel):
     birth: str
-    time: str
+    # /bazi 可以不给出生时间：一次返回出生当天各个时辰的结果（见 bazi_hours.py），其他接口仍然必填
+    time: Optional[str] = None
     tz: str
     gender: str
+    # 可选：只返回部分字段（分组名如 "fiveElements"、"advice"，或单个字段名）和语言（zh / en / both）
+    fields: Optional[List[str]] = None
+    lang: Optional[str] = None
+    # 可选：打分方案名（见 bazi_profiles.py，GET /profiles 列出可用方案），不写为默认方案
+    profile: Optional[str] = None
 
 # Use bazi_api instead of app
 @bazi_api.post("/bazi")
-def bazi_analysis(input_data: BaziInput):
-    result = generate_summary(input_data.dict())
-    return result
+async def bazi_analysis(input_data: BaziInput):
+    if not is_valid_timezone(input_data.tz):
+        raise HTTPException(status_code=422, detail=f"Unknown timezone {input_data.tz!r}")
+    if input_data.fields or input_data.lang:
+        try:
+            resolve_fields(input_data.fields, input_data.lang)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+    try:
+        profile = get_profile(input_data.profile)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    # 请求缓存命中时在事件循环里直接返回；否则在线程池或进程池（BAZI_EXECUTOR）中计算并编码，跳过 jsonable_encoder。
+    # 没有 time 时返回 {"common_fields", "day_pillars", "variants"}：出生当天各个时辰的结果和与时辰无关的字段
+    # 计算名额满、等待队列也满（或等待超时）时直接 503 + Retry-After（见 bazi_admission.py）
+    try:
+        body = await run_summary_json(input_data.dict(), profile)
+    except Overloaded as exc:
+        return JSONResponse({"detail": str(exc)}, status_code=503,
+                            headers={"Retry-After": str(exc.retry_after)})
+    return Response(content=body, media_type="application/json")
+
+@bazi_api.post("/bazi/batch")
+def bazi_batch(records: List[BaziInput]):
+    # 按四柱去重后批量打分，单条记录出错只在该条返回 error
+    if len(records) > BATCH_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_RECORDS} records per batch")
+    from bazi_batch import batch_summaries  # bazi_batch 依赖 NumPy，只在批量接口用到时才导入
+
+    return Response(content=dumps(batch_summaries([record.dict() for record in records])),
+                    media_type="application/json")
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    边读请求体边写响应的流式响应。
+    请求体由 body_iterator 自己读取，所以不能再起一个监听 disconnect 的任务去抢 receive()；
+    客户端断开时由 send 报错或 request.stream() 抛 ClientDisconnect 结束。
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+async def _iter_request_lines(request):
+    # 按换行切分请求体；超长行丢弃到下一个换行为止，并以 None 标记
+    from bazi_batch import STREAM_MAX_LINE_BYTES
+
+    buffer = b""
+    overflow = False
+    async for data in request.stream():
+        buffer += data
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            if overflow or len(line) > STREAM_MAX_LINE_BYTES:
+                overflow = False
+                yield None
+            else:
+                yield line.decode("utf-8", errors="replace")
+        if len(buffer) > STREAM_MAX_LINE_BYTES:
+            overflow = True
+            buffer = b""
+    if overflow:
+        yield None
+    elif buffer:
+        yield buffer.decode("utf-8", errors="replace")
+
+
+async def _stream_results(request):
+    # 读一块、算一块、写一块：客户端不读响应时也不会继续读请求（背压）
+    from bazi_batch import STREAM_CHUNK_SIZE, process_ndjson_chunk
+
+    chunk = []
+    line_no = 0
+    async for line in _iter_request_lines(request):
+        line_no += 1
+        if line is not None and not line.strip():
+            continue
+        chunk.append((line_no, line))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            for out_line in await run_in_threadpool(process_ndjson_chunk, chunk):
+                yield out_line
+            chunk = []
+    if chunk:
+        for out_line in await run_in_threadpool(process_ndjson_chunk, chunk):
+            yield out_line
+
+
+@bazi_api.post("/bazi/stream")
+async def bazi_stream(request: Request):
+    # NDJSON 输入（每行一个 BaziInput），NDJSON 输出（每行 {"line", "result"} 或 {"line", "error"}）
+    return NDJSONStreamingResponse(_stream_results(request))
+
+class MatchCandidate(BaziInput):
+    id: Optional[str] = None
+
+class MatchInput(BaseModel):
+    user: MatchCandidate
+    # 不给 candidates 时对 BAZI_MATCH_INDEX 预建的候选人索引打分
+    candidates: Optional[List[MatchCandidate]] = None
+    top_k: int = 10
+
+@bazi_api.post("/bazi/match")
+def bazi_match(input_data: MatchInput):
+    # 合盘：按五行互补程度对候选人排序，返回得分最高的 top_k 个（排盘出错的候选人列在 errors）
+    from bazi_match import MATCH_MAX_CANDIDATES, MatchIndex, get_index, match
+
+    errors = []
+    if input_data.candidates is not None:
+        if len(input_data.candidates) > MATCH_MAX_CANDIDATES:
+            raise HTTPException(status_code=413, detail=f"At most {MATCH_MAX_CANDIDATES} candidates per request")
+        index, errors = MatchIndex.build([candidate.dict() for candidate in input_data.candidates])
+    else:
+        index = get_index()
+        if index is None:
+            raise HTTPException(status_code=422, detail="No candidates given and no BAZI_MATCH_INDEX configured")
+    try:
+        matches = match(input_data.user.dict(), index, input_data.top_k)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return Response(content=dumps({"candidates": len(index), "matches": matches, "errors": errors}),
+                    media_type="application/json")
+
+class LuckInput(BaziInput):
+    years: int = 100
+
+@bazi_api.post("/bazi/luck")
+def bazi_luck(input_data: LuckInput):
+    # 大运 + 流年时间线（从出生年起 years 年），整条时间线按命盘缓存
+    from bazi_luck import timeline  # 依赖 NumPy
+
+    if not is_valid_timezone(input_data.tz):
+        raise HTTPException(status_code=422, detail=f"Unknown timezone {input_data.tz!r}")
+    try:
+        result = timeline(input_data.dict(), input_data.years)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return Response(content=dumps(result), media_type="application/json")
+
+class SweepInput(BaseModel):
+    natal: BaziInput
+    start: str
+    end: str
+    step: str = "day"
+
+@bazi_api.post("/bazi/sweep")
+async def bazi_sweep(input_data: SweepInput):
+    # 本命盘 + 日期区间（含两端），逐日或逐时辰（step="hour"）输出流日干支、五行和喜忌得分（NDJSON）
+    if not is_valid_timezone(input_data.natal.tz):
+        raise HTTPException(status_code=422, detail=f"Unknown timezone {input_data.natal.tz!r}")
+    try:
+        first, last, hours = parse_range(input_data.start, input_data.end, input_data.step)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if period_count(first, last, hours) > SWEEP_MAX_PERIODS:
+        raise HTTPException(status_code=413, detail=f"At most {SWEEP_MAX_PERIODS} periods per sweep")
+    try:
+        periods = await run_in_threadpool(
+            sweep, input_data.natal.dict(), input_data.start, input_data.end, input_data.step)
+    except ValueError as exc:  # 本命盘的出生日期 / 时间格式不对
+        raise HTTPException(status_code=422, detail=str(exc))
+    return StreamingResponse(iter_ndjson(periods), media_type="application/x-ndjson")
+
+@bazi_api.get("/metrics")
+def metrics():
+    # Prometheus 文本格式；步骤耗时需要 BAZI_METRICS=1，缓存统计和准入控制状态始终输出
+    caches = {"summary": SUMMARY_CACHE, "response": RESPONSE_CACHE, "request": REQUEST_CACHE}
+    try:
+        from bazi_luck import TIMELINE_CACHE  # 依赖 NumPy
+    except ImportError:
+        pass
+    else:
+        caches["timeline"] = TIMELINE_CACHE
+    return PlainTextResponse(render_prometheus(caches, ADMISSION), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@bazi_api.get("/profiles")
+def list_profiles():
+    # 可用的打分方案、默认方案、各方案的参数指纹，以及配置文件最近一次加载的状态
+    return Response(content=dumps(profile_info()), media_type="application/json")
+
+@bazi_api.get("/ready")
+async def ready():
+    # 就绪探针：预热完成前和关闭过程中返回 503；存活检查仍用 GET /
+    if not READINESS["ready"]:
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True, "warm_up": READINESS["warm_up"], "seconds": READINESS["seconds"]}
 
 @bazi_api.get("/")
 def read_root():
@@ -0,0 +1,379 @@
+"""
+批量八字分析：按四柱 + 性别去重，五行得分和日主强弱用 NumPy 对整批命盘一起计算。
+Batch Bazi analysis over (N, 5) element-score matrices.
+
+也可以作为命令行工具流式处理 NDJSON（每行一个 BaziInput）:
+    python bazi_batch.py input.jsonl -o results.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from bazi_calculator import (
+    BRANCH_HIDDEN_STEMS,
+    ELEMENT_INDEX,
+    ELEMENT_RELATIONS,
+    ELEMENTS,
+    JIAZI,
+    JIAZI_INDEX,
+    PILLAR_POSITIONS,
+    POSITION_WEIGHTS,
+    RESULT_KEYS,
+    SEASON_TABLE,
+    STATE_WEIGHTS,
+    STEMS,
+    BRANCHES,
+    STEM_TO_ELEMENT,
+    STRENGTH_RATIO,
+    SUMMARY_CACHE,
+    Chart,
+    calc_bazi,
+    chart_key,
+    get_profile,
+    local_datetime,
+    resolve_fields,
+)
+from bazi_json import dumps
+from bazi_timezone import to_beijing, to_beijing_many
+
+# 每柱最多的加分步骤：天干 1.0 + 天干位置权重，再加最多三个地支藏干
+MAX_STEPS = 2 + max(len(hidden) for hidden in BRANCH_HIDDEN_STEMS.values())
+
+STRENGTH_CODES = ("身强", "身弱", "中和")
+
+# NDJSON 流式处理：每次最多处理多少行（控制内存）
+STREAM_CHUNK_SIZE = int(os.environ.get("BAZI_STREAM_CHUNK", "512"))
+RECORD_FIELDS = ("birth", "time", "tz", "gender")
+# 原样回传的记录标识字段，方便调用方对齐输入输出
+ECHO_FIELDS = ("id", "request_id")
+# 单行最大字节数，超过的行直接报错（流式接口不会为一行无限缓冲）
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
+
+def _build_step_tensor(position_weights=POSITION_WEIGHTS, branch_hidden_stems=BRANCH_HIDDEN_STEMS):
+    """
+    STEP_TENSOR[柱位, 甲子序号, 步骤] -> 五行加分向量 (5,)
+    由 POSITION_WEIGHTS 和 BRANCH_HIDDEN_STEMS 生成。每一步只有一个五行非零，
+    按步骤顺序累加，浮点结果与 five_elements 的逐项累加完全一致。
+    """
+    max_steps = 2 + max(len(hidden) for hidden in branch_hidden_stems.values())
+    steps = np.zeros((len(PILLAR_POSITIONS), len(JIAZI), max_steps, len(ELEMENTS)))
+    for p, pos in enumerate(PILLAR_POSITIONS):
+        gan_weight = position_weights[pos[0] + "干"]
+        zhi_weight = position_weights[pos[0] + "支"]
+        for j, gz in enumerate(JIAZI):
+            gan_elem = ELEMENT_INDEX[STEM_TO_ELEMENT[gz[0]]]
+            steps[p, j, 0, gan_elem] = 1.0
+            steps[p, j, 1, gan_elem] = gan_weight
+            for k, (hidden_gan, weight) in enumerate(branch_hidden_stems[gz[1]]):
+                steps[p, j, 2 + k, ELEMENT_INDEX[STEM_TO_ELEMENT[hidden_gan]]] = weight * zhi_weight
+    return steps
+
+
+def _build_season_weights(state_weights=STATE_WEIGHTS):
+    """
+    SEASON_WEIGHTS[月支序号] -> 五行月令修正系数 (5,)，由 SEASON_TABLE + STATE_WEIGHTS 生成
+    """
+    return np.array([
+        [state_weights[SEASON_TABLE[zhi][elem]] for elem in ELEMENTS]
+        for zhi in BRANCHES
+    ])
+
+
+def _build_relations():
+    """
+    RELATIONS[日主五行] -> (比劫, 印星, 食伤, 财星, 官杀) 对应的五行序号
+    """
+    return np.array(ELEMENT_RELATIONS, dtype=np.intp)
+
+
+STEP_TENSOR = _build_step_tensor()
+STEP_MASK = (STEP_TENSOR != 0).any(axis=2)  # (柱位, 甲子, 五行): 该柱是否给这个五行加过分
+SEASON_WEIGHTS = _build_season_weights()
+RELATIONS = _build_relations()
+STEM_ELEMENT_INDEX = np.array([ELEMENT_INDEX[STEM_TO_ELEMENT[gan]] for gan in STEMS], dtype=np.intp)
+
+
+@lru_cache(maxsize=32)
+def _profile_tables(profile):
+    """
+    打分方案 -> (STEP_TENSOR, STEP_MASK, SEASON_WEIGHTS, 身强阈值)；默认参数直接用上面的模块常量
+    """
+    if profile is None or profile.namespace is None:
+        return STEP_TENSOR, STEP_MASK, SEASON_WEIGHTS, STRENGTH_RATIO
+    params = profile.params
+    steps = _build_step_tensor(params["position_weights"], params["branch_hidden_stems"])
+    return steps, (steps != 0).any(axis=2), _build_season_weights(params["state_weights"]), profile.strength_ratio
+
+
+def _round3(values):
+    # 用 Python 的 round 保证与单条计算逐位一致（np.round 的舍入方式不同）
+    return np.array([round(x, 3) for x in values.ravel().tolist()]).reshape(values.shape)
+
+
+def score_charts(pillar_rows, profile=None):
+    """
+    对一批命盘（每行为年、月、日、时四柱干支）按打分方案 profile（默认 DEFAULT_PROFILE）向量化计算:
+    - elements_score (N, 5): 未经月令调整的五行得分
+    - touched (N, 5): 该五行是否得过分（没得过分的在单条计算里保持整数 0）
+    - adjusted_score (N, 5): 月令调整后的五行得分
+    - power / resistance (N,): 助力、克泄合计
+    - strength (N,): STRENGTH_CODES 的序号
+    """
+    step_tensor, step_mask, season_weights, ratio = _profile_tables(profile)
+    idx = np.array([[JIAZI_INDEX[gz] for gz in row] for row in pillar_rows], dtype=np.intp).reshape(-1, 4)
+    n = len(idx)
+
+    scores = np.zeros((n, len(ELEMENTS)))
+    for p in range(len(PILLAR_POSITIONS)):
+        steps = step_tensor[p, idx[:, p]]  # (N, 步骤数, 5)
+        for k in range(steps.shape[1]):
+            scores += steps[:, k]
+    touched = step_mask[np.arange(len(PILLAR_POSITIONS)), idx].any(axis=1)
+
+    # 根据月令（月柱地支）调整
+    adjusted = _round3(scores * season_weights[idx[:, 1] % 12])
+
+    # 日主强弱: 比劫 + 印星 对 食伤 + 财星 + 官杀
+    stars = adjusted[np.arange(n)[:, None], RELATIONS[STEM_ELEMENT_INDEX[idx[:, 2] % 10]]]
+    power = _round3(stars[:, 0] + stars[:, 1])
+    resistance = _round3(stars[:, 2] + stars[:, 3] + stars[:, 4])
+    strength = np.where(power > resistance * ratio, 0, np.where(resistance > power, 1, 2))
+
+    return {
+        "elements_score": scores,
+        "touched": touched,
+        "adjusted_score": adjusted,
+        "power": power,
+        "resistance": resistance,
+        "strength": strength,
+    }
+
+
+def _chart_scores(scored):
+    """
+    把向量化结果拆成 Chart 需要的逐命盘得分（按 ELEMENTS 顺序的列表）
+    """
+    elements_rows = scored["elements_score"].tolist()
+    touched_rows = scored["touched"].tolist()
+    adjusted_rows = scored["adjusted_score"].tolist()
+    powers = scored["power"].tolist()
+    resistances = scored["resistance"].tolist()
+    for elements, touched, adjusted, power, resistance in zip(
+            elements_rows, touched_rows, adjusted_rows, powers, resistances):
+        yield {
+            "elements_score": [val if hit else 0 for val, hit in zip(elements, touched)],
+            "adjusted_score": adjusted,
+            "power": power,
+            "resistance": resistance,
+        }
+
+
+def _error_message(exc):
+    return f"{type(exc).__name__}: {exc}"
+
+
+def batch_charts(records):
+    """
+    批量排盘：换算北京时间、排盘、按四柱 + 性别 + 打分方案去重，缓存未命中的命盘按方案分组向量化打分。
+    输入: BaziInput 字典列表
+    输出: (charts, errors)
+         charts: {缓存键: (惰性 Chart, [输入序号])}，按命盘首次出现的顺序
+         errors: {输入序号: 错误信息}，单条出错不影响其他记录
+    batch_summaries 和列式导出（bazi_export）共用这一步。
+    """
+    errors = {}
+
+    # Step 1: 解析当地时间，整批换算成北京时间
+    locals_ = {}  # 输入序号 -> (当地 naive 时间, 时区名)
+    for i, data in enumerate(records):
+        try:
+            locals_[i] = local_datetime(data)
+        except Exception as exc:
+            errors[i] = _error_message(exc)
+    try:
+        beijing = dict(zip(locals_, to_beijing_many(list(locals_.values()))))
+    except Exception:
+        # 个别记录换算失败（如超出 datetime 范围）时逐条换算，错误只记在该条
+        beijing = {}
+        for i, (dt_local, tz_str) in locals_.items():
+            try:
+                beijing[i] = to_beijing(dt_local, tz_str)
+            except Exception as exc:
+                errors[i] = _error_message(exc)
+
+    # Step 2: 排盘并按四柱 + 性别 + 打分方案去重（整批对同一方案名只取一次方案，热更新不影响本批）
+    profiles = {}
+    groups = {}  # key -> (bazi, gender, profile, [输入序号])
+    for i, data in enumerate(records):
+        if i not in beijing:
+            continue
+        try:
+            name = data.get("profile")
+            profile = profiles.get(name)
+            if profile is None:
+                profile = profiles[name] = get_profile(name)
+            bazi = calc_bazi(data, beijing[i])
+            key = chart_key(bazi["fourPillars"], data["gender"], profile)
+        except Exception as exc:
+            errors[i] = _error_message(exc)
+            continue
+        entry = groups.get(key)
+        if entry is None:
+            entry = groups[key] = (bazi, data["gender"], profile, [])
+        entry[3].append(i)
+
+    # Step 3: 缓存未命中的命盘按方案一起向量化打分，得分交给惰性 Chart
+    charts = {}
+    misses = {}  # 方案 -> [缓存键]
+    for key, (_, _, profile, indices) in groups.items():
+        cached = SUMMARY_CACHE.get(key)
+        charts[key] = (cached, indices)
+        if cached is None:
+            misses.setdefault(profile, []).append(key)
+
+    for profile, keys in misses.items():
+        scored = score_charts([key[0] for key in keys], profile)
+        for key, scores in zip(keys, _chart_scores(scored)):
+            bazi, gender, _, indices = groups[key]
+            chart = Chart(bazi["fourPillars"], bazi["dayMaster"], gender, scores, profile)
+            SUMMARY_CACHE.put(key, chart)
+            charts[key] = (chart, indices)
+
+    return charts, errors
+
+
+def batch_summaries(records):
+    """
+    批量版 generate_summary。
+    输入: BaziInput 字典列表
+    输出: {"count", "unique_charts", "results"}，results 与输入一一对应，
+         每项为 {"index", "result"} 或 {"index", "error"}，单条出错不影响其他记录。
+    """
+    results = [None] * len(records)
+    charts, errors = batch_charts(records)
+    for i, message in errors.items():
+        results[i] = {"index": i, "error": message}
+
+    # 按输入顺序组装，每条记录只取（只计算）它要的字段
+    # 同一命盘、同样字段的记录共用一份结果（Chart 每次 result 都会重新生成输出字段）
+    for chart, indices in charts.values():
+        rendered = {}
+        for i in indices:
+            try:
+                fields, lang = records[i].get("fields"), records[i].get("lang")
+                keys = resolve_fields(fields, lang) if fields or lang else RESULT_KEYS
+                result = rendered.get(keys)
+                if result is None:
+                    result = rendered[keys] = chart.result(keys)
+                results[i] = {"index": i, "result": result}
+            except Exception as exc:
+                results[i] = {"index": i, "error": _error_message(exc)}
+
+    return {
+        "count": len(records),
+        "unique_charts": len(charts),
+        "results": results,
+    }
+
+
+def parse_record(line):
+    """
+    解析一行 NDJSON 为 BaziInput 字典，格式不对时抛 ValueError
+    line 为 None 表示该行超过 STREAM_MAX_LINE_BYTES 已被丢弃
+    """
+    if line is None:
+        raise ValueError(f"line exceeds {STREAM_MAX_LINE_BYTES} bytes")
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("each line must be a JSON object")
+    missing = [field for field in RECORD_FIELDS if not isinstance(record.get(field), str)]
+    if missing:
+        raise ValueError(f"missing or non-string field(s): {', '.join(missing)}")
+    return record
+
+
+def process_ndjson_chunk(chunk):
+    """
+    处理一块 (行号, 原始行) ，返回对应的 NDJSON 输出行列表（字节串，顺序与输入一致）
+    每行输出为 {"line", "result"} 或 {"line", "error"}，并回传 id / request_id；
+    编码与 /bazi、/bazi/batch 相同（bazi_json.dumps）
+    """
+    records = []
+    outputs = []
+    for line_no, line in chunk:
+        out = {"line": line_no}
+        try:
+            record = parse_record(line)
+        except ValueError as exc:  # json.JSONDecodeError 也是 ValueError
+            out["error"] = _error_message(exc)
+            outputs.append((out, None))
+            continue
+        for field in ECHO_FIELDS:
+            if field in record:
+                out[field] = record[field]
+        outputs.append((out, len(records)))
+        records.append(record)
+
+    results = batch_summaries(records)["results"] if records else []
+    lines = []
+    for out, pos in outputs:
+        if pos is not None:
+            item = results[pos]
+            if "result" in item:
+                out["result"] = item["result"]
+            else:
+                out["error"] = item["error"]
+        lines.append(dumps(out) + b"\n")
+    return lines
+
+
+def iter_ndjson_results(lines, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    生成器流水线：逐行读取 NDJSON，按块批量分析，逐行产出 NDJSON 结果（字节串）。
+    内存只和 chunk_size 有关，下游不消费时上游也不会继续读取。
+    """
+    chunk = []
+    for line_no, line in enumerate(lines, 1):
+        if line is not None and not line.strip():
+            continue
+        chunk.append((line_no, line))
+        if len(chunk) >= chunk_size:
+            yield from process_ndjson_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from process_ndjson_chunk(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream NDJSON BaziInput records through generate_summary.")
+    parser.add_argument("input", help="NDJSON file with one BaziInput per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file ('-' for stdout)")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+                        help="records analyzed per batch (bounds memory)")
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    dst = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        pending = 0
+        for out_line in iter_ndjson_results(src, args.chunk_size):
+            dst.write(out_line)
+            pending += 1
+            if pending >= args.chunk_size:
+                dst.flush()
+                pending = 0
+        dst.flush()
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout.buffer:
+            dst.close()
+
+
+if __name__ == "__main__":
+    main()
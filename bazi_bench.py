@@ -0,0 +1,510 @@
+"""
+性能基准。
+
+    python bazi_bench.py stages --requests 2000            # 各分析步骤单独计时
+    python bazi_bench.py http --requests 2000 --concurrency 16   # 进程内 ASGI 端到端压测
+    python bazi_bench.py all -o bench.json                 # stages + http，保存为基线
+    python bazi_bench.py all --baseline bench.json         # 与基线对比，有退化时退出码为 1
+    python bazi_bench.py executors --workers 1 4 16 --requests 400
+    python bazi_bench.py startup --budget-ms 1500             # 启动剖析：各模块导入耗时 / 内存、到第一个响应的时间
+
+输入集由 make_corpus 按随机种子生成（日期、时区、性别），结果以 JSON 输出。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from statistics import mean, quantiles
+
+# 基准测试不走结果缓存，每条记录都完整计算（进程池 worker 继承这个环境变量）
+os.environ.setdefault("BAZI_CACHE_SIZE", "0")
+
+from bazi_calculator import (  # noqa: E402
+    calc_bazi,
+    compute_ten_gods,
+    dataframe_to_json,
+    five_elements,
+    generate_summary,
+    judge_strength,
+    suggest_five_elem,
+    table_to_dataframe,
+    table_to_json,
+    ten_god_advice,
+)
+from bazi_executor import EXECUTOR_MODES, create_executor, prestart  # noqa: E402
+
+CORPUS_TIMEZONES = (
+    "Asia/Shanghai",
+    "Asia/Tokyo",
+    "Asia/Kolkata",
+    "Europe/London",
+    "America/New_York",
+    "America/Los_Angeles",
+    "Australia/Sydney",
+    "UTC",
+)
+CORPUS_GENDERS = ("男", "女")
+
+
+def make_corpus(n, seed=2024):
+    """
+    可复现的输入集：1901–2099 年的随机日期时间、不同时区和性别
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        corpus.append({
+            "birth": f"{rng.randint(1901, 2099)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "tz": rng.choice(CORPUS_TIMEZONES),
+            "gender": rng.choice(CORPUS_GENDERS),
+        })
+    return corpus
+
+
+def _summary_or_none(data):
+    # 个别命盘会抛异常，基准测试只关心耗时
+    try:
+        return generate_summary(data) is not None
+    except Exception:
+        return None
+
+
+def bench_executors(corpus, workers_list, modes=EXECUTOR_MODES):
+    """
+    每种模式 × 每个 worker 数跑一遍整个输入集，返回吞吐量记录
+    """
+    results = []
+    for mode in modes:
+        for workers in workers_list:
+            executor = create_executor(mode, workers)
+            try:
+                prestart(executor, workers)
+                start = time.perf_counter()
+                list(executor.map(_summary_or_none, corpus, chunksize=1))
+                elapsed = time.perf_counter() - start
+            finally:
+                executor.shutdown(wait=True)
+            results.append({
+                "mode": mode,
+                "workers": workers,
+                "requests": len(corpus),
+                "seconds": round(elapsed, 4),
+                "requests_per_second": round(len(corpus) / elapsed, 1),
+            })
+    return results
+
+
+# 分析流水线的各个步骤，顺序与 generate_summary 一致
+STAGES = (
+    "calc_bazi",
+    "five_elements",
+    "judge_strength",
+    "compute_ten_gods",
+    "suggest_five_elem",
+    "ten_god_advice",
+    "table_to_json",
+    "dataframe_to_json",
+    "generate_summary",
+)
+
+# 与基线对比时允许的波动（相对值），超过即视为退化
+DEFAULT_TOLERANCE = 0.2
+
+
+def _latency_stats(samples_ns):
+    """
+    纳秒耗时列表 -> 统计（微秒）
+    """
+    if not samples_ns:
+        return {"count": 0}
+    us = sorted(ns / 1000 for ns in samples_ns)
+    if len(us) > 1:
+        cuts = quantiles(us, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = us[0]
+    return {
+        "count": len(us),
+        "mean_us": round(mean(us), 2),
+        "p50_us": round(p50, 2),
+        "p95_us": round(p95, 2),
+        "p99_us": round(p99, 2),
+        "max_us": round(us[-1], 2),
+    }
+
+
+def _run_stages(data, timings):
+    """
+    按 generate_summary 的顺序逐步执行并计时；某一步出错时后面的步骤不再计时
+    """
+    clock = time.perf_counter_ns
+
+    t0 = clock()
+    bazi = calc_bazi(data)
+    t1 = clock()
+    timings["calc_bazi"].append(t1 - t0)
+
+    pillars, day_master = bazi["fourPillars"], bazi["dayMaster"]
+    fe = five_elements(pillars, day_master)
+    t2 = clock()
+    timings["five_elements"].append(t2 - t1)
+
+    strength = judge_strength(day_master, fe["fiveElementsScore_adjusted"], fe["fiveElementsState"])
+    t3 = clock()
+    timings["judge_strength"].append(t3 - t2)
+
+    ten_gods = compute_ten_gods(pillars, day_master, data["gender"])
+    t4 = clock()
+    timings["compute_ten_gods"].append(t4 - t3)
+
+    suggestion = suggest_five_elem(
+        day_master, strength["strength"], strength["stars_strength"], fe["fiveElementsScore_adjusted"])
+    t5 = clock()
+    timings["suggest_five_elem"].append(t5 - t4)
+
+    ten_god_advice(day_master, suggestion["favored"], suggestion["unfavored"])
+    t6 = clock()
+    timings["ten_god_advice"].append(t6 - t5)
+
+    table_to_json(ten_gods["tenGodsTable"])
+    t7 = clock()
+    timings["table_to_json"].append(t7 - t6)
+
+    if "dataframe_to_json" in timings:
+        # 只计 dataframe_to_json 本身，不计构造 DataFrame
+        df = table_to_dataframe(ten_gods["tenGodsTable"])
+        t8 = clock()
+        dataframe_to_json(df)
+        timings["dataframe_to_json"].append(clock() - t8)
+
+
+def bench_stages(corpus, rounds=1):
+    """
+    对输入集逐条执行各步骤，返回每个步骤的耗时统计（微秒）
+    """
+    timings = {stage: [] for stage in STAGES}
+    skipped = {}
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        del timings["dataframe_to_json"]
+        skipped["dataframe_to_json"] = "pandas is not installed"
+
+    errors = 0
+    for _ in range(rounds):
+        for data in corpus:
+            try:
+                _run_stages(data, timings)
+            except Exception:
+                errors += 1
+            start = time.perf_counter_ns()
+            _summary_or_none(data)
+            timings["generate_summary"].append(time.perf_counter_ns() - start)
+
+    stages = {stage: _latency_stats(samples) for stage, samples in timings.items()}
+    for stage, reason in skipped.items():
+        stages[stage] = {"count": 0, "skipped": reason}
+    return {"records": len(corpus) * rounds, "errors": errors, "stages": stages}
+
+
+async def _http_load(corpus, concurrency):
+    import httpx
+
+    from bazi_api import bazi_api
+
+    latencies = []
+    statuses = {}
+    queue = iter(corpus)
+
+    async def worker(client):
+        for data in queue:
+            start = time.perf_counter_ns()
+            response = await client.post("/bazi", json=data)
+            latencies.append(time.perf_counter_ns() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    transport = httpx.ASGITransport(app=bazi_api, raise_app_exceptions=False)
+    async with bazi_api.router.lifespan_context(bazi_api):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    return latencies, statuses, elapsed
+
+
+def bench_http(corpus, concurrency=16):
+    """
+    用进程内 ASGI 客户端（httpx.ASGITransport）并发请求 POST /bazi，不经过网络
+    """
+    latencies, statuses, elapsed = asyncio.run(_http_load(corpus, concurrency))
+    return {
+        "requests": len(corpus),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(len(corpus) / elapsed, 1),
+        "status_codes": statuses,
+        "latency": _latency_stats(latencies),
+    }
+
+# 启动剖析：在全新的子进程里导入应用（python -X importtime），跑 lifespan（含预热）并请求一次 POST /bazi。
+# 先导入 httpx 再打标记，标记之后的 importtime 记录才算应用的导入
+STARTUP_MARKER = "--bazi-startup-app--"
+STARTUP_PROBE = """
+import asyncio, json, os, sys, time
+import httpx
+memory = sys.argv[2] == "1"
+if memory:
+    import tracemalloc
+    tracemalloc.start()
+sys.stderr.write("%s\\n")
+sys.stderr.flush()
+t0 = time.perf_counter()
+import importlib
+module, _, attr = sys.argv[1].partition(":")
+app = getattr(importlib.import_module(module), attr)
+t1 = time.perf_counter()
+report = {"import_s": t1 - t0, "loaded": sorted(sys.modules)}
+if memory:
+    files = {}
+    for stat in tracemalloc.take_snapshot().statistics("filename"):
+        files[stat.traceback[0].filename] = stat.size
+    report["files"] = files
+    report["paths"] = [os.path.abspath(path) for path in sys.path]
+    tracemalloc.stop()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.post("/bazi", json=json.loads(sys.argv[3]))
+        t3 = time.perf_counter()
+    return t2, t3, time.time(), response.status_code
+
+t2, t3, wall, status = asyncio.run(first_request())
+report.update(lifespan_s=t2 - t1, request_s=t3 - t2, first_response_wall=wall, status=status)
+import resource
+report["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps(report))
+""" % STARTUP_MARKER
+
+# 不应该在导入应用时就加载的重依赖（只在查表范围外、批量接口或导出时才用到）
+DEFERRED_MODULES = ("pandas", "numpy", "lunar_python")
+STARTUP_REQUEST = {"birth": "1990-05-17", "time": "08:30", "tz": "Asia/Shanghai", "gender": "男"}
+
+
+def _parse_importtime(stderr):
+    """
+    -X importtime 的输出 -> [(模块名, 自身微秒, 累计微秒)]，只取标记之后的记录
+    """
+    records = []
+    started = False
+    for line in stderr.splitlines():
+        if line == STARTUP_MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        records.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return records
+
+
+def _package_of(filename, paths):
+    # 源文件 -> 顶层包名（按最长的 sys.path 前缀）
+    best = ""
+    for path in paths:
+        if filename.startswith(path.rstrip(os.sep) + os.sep) and len(path) > len(best):
+            best = path
+    if not best:
+        return "<other>"
+    top = filename[len(best.rstrip(os.sep)) + 1:].split(os.sep)[0]
+    return top[:-3] if top.endswith(".py") else top
+
+
+def _run_probe(app, memory, request):
+    start = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_PROBE, app, "1" if memory else "0",
+         json.dumps(request, ensure_ascii=False)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup probe failed:\n{proc.stderr[-2000:]}")
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    report["first_request_s"] = report.pop("first_response_wall") - start
+    return report, _parse_importtime(proc.stderr)
+
+
+def bench_startup(app="bazi_api:bazi_api", repeat=3, top=15, request=STARTUP_REQUEST):
+    """
+    启动剖析：重复启动 repeat 次取中位数，另起一次带 tracemalloc 的启动统计内存。
+    - imports: 各顶层包的导入耗时（自身耗时之和）和导入期间分配、仍然存活的内存
+    - slowest_imports: 累计耗时最长的模块
+    - deferred_loaded: DEFERRED_MODULES 里在导入应用时就被加载的模块（应当为空）
+    """
+    runs = [_run_probe(app, False, request) for _ in range(repeat)]
+    pick = sorted(runs, key=lambda run: run[0]["first_request_s"])[len(runs) // 2]
+    report, records = pick
+    memory, _ = _run_probe(app, True, request)
+
+    packages = {}
+    for name, self_us, _ in records:
+        pkg = packages.setdefault(name.split(".")[0], {"import_ms": 0.0, "memory_kb": 0.0})
+        pkg["import_ms"] += self_us / 1000
+    for filename, size in memory["files"].items():
+        pkg = packages.setdefault(_package_of(filename, memory["paths"]), {"import_ms": 0.0, "memory_kb": 0.0})
+        pkg["memory_kb"] += size / 1024
+    imports = {
+        name: {"import_ms": round(pkg["import_ms"], 2), "memory_kb": round(pkg["memory_kb"], 1)}
+        for name, pkg in sorted(packages.items(), key=lambda item: -item[1]["import_ms"])
+    }
+    slowest = sorted(records, key=lambda record: -record[2])[:top]
+
+    def median(key):
+        return round(sorted(run[0][key] for run in runs)[len(runs) // 2] * 1000, 2)
+
+    return {
+        "app": app,
+        "repeat": repeat,
+        "status": report["status"],
+        "import_ms": median("import_s"),
+        "lifespan_ms": median("lifespan_s"),
+        "request_ms": median("request_s"),
+        "first_request_ms": median("first_request_s"),
+        "max_rss_kb": report["max_rss_kb"],
+        "imports": imports,
+        "slowest_imports": [
+            {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cum_us / 1000, 2)}
+            for name, self_us, cum_us in slowest
+        ],
+        "deferred_loaded": [name for name in DEFERRED_MODULES if name in report["loaded"]],
+    }
+
+
+def check_startup(startup, budget_ms=None):
+    """
+    启动预算检查：到第一个响应超过 budget_ms，或重依赖在导入时就被加载，都算退化
+    """
+    regressions = []
+    if budget_ms is not None and startup["first_request_ms"] > budget_ms:
+        regressions.append(f"startup.first_request_ms > {budget_ms}")
+    regressions.extend(f"startup.deferred_loaded.{name}" for name in startup["deferred_loaded"])
+    return regressions
+
+
+def _metrics(report):
+    """
+    把报告展开成 {指标名: (数值, 越大越好?)}，用于和基线对比
+    """
+    metrics = {}
+    for stage, stats in report.get("stages", {}).get("stages", {}).items():
+        for field in ("p50_us", "p95_us"):
+            if field in stats:
+                metrics[f"stages.{stage}.{field}"] = (stats[field], False)
+    http = report.get("http")
+    if http:
+        metrics["http.requests_per_second"] = (http["requests_per_second"], True)
+        for field in ("p50_us", "p95_us"):
+            if field in http["latency"]:
+                metrics[f"http.latency.{field}"] = (http["latency"][field], False)
+    startup = report.get("startup")
+    if startup:
+        for field in ("import_ms", "first_request_ms"):
+            metrics[f"startup.{field}"] = (startup[field], False)
+    return metrics
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    与基线报告逐项对比，返回 {"tolerance", "regressions", "metrics"}
+    变化比例 change = 当前 / 基线 - 1；耗时类指标 change > tolerance、吞吐量 change < -tolerance 视为退化
+    """
+    current, base = _metrics(report), _metrics(baseline)
+    rows = []
+    regressions = []
+    for name, (value, higher_is_better) in current.items():
+        if name not in base or not base[name][0]:
+            continue
+        change = value / base[name][0] - 1
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        rows.append({"metric": name, "baseline": base[name][0], "current": value,
+                     "change": round(change, 4), "regressed": regressed})
+        if regressed:
+            regressions.append(name)
+    return {"tolerance": tolerance, "regressions": regressions, "metrics": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bazi API benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--requests", type=int, default=2000)
+    common.add_argument("--seed", type=int, default=2024)
+    common.add_argument("-o", "--output", help="also write the JSON report to this file")
+    common.add_argument("--baseline", help="compare against a previously saved report")
+    common.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    pipeline = argparse.ArgumentParser(add_help=False)
+    pipeline.add_argument("--rounds", type=int, default=1)
+    load = argparse.ArgumentParser(add_help=False)
+    load.add_argument("--concurrency", type=int, default=16)
+
+    sub.add_parser("stages", parents=[common, pipeline], help="time each analysis stage")
+    sub.add_parser("http", parents=[common, load], help="end-to-end load on POST /bazi (in-process ASGI)")
+    sub.add_parser("all", parents=[common, pipeline, load], help="stages + http")
+
+    ex = sub.add_parser("executors", parents=[common], help="thread pool vs process pool throughput")
+    ex.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    ex.add_argument("--modes", nargs="+", choices=EXECUTOR_MODES, default=list(EXECUTOR_MODES))
+
+    st = sub.add_parser("startup", parents=[common], help="per-module import time / memory and time to first request")
+    st.add_argument("--app", default="bazi_api:bazi_api")
+    st.add_argument("--repeat", type=int, default=3)
+    st.add_argument("--budget-ms", type=float,
+                    default=float(os.environ["BAZI_STARTUP_BUDGET_MS"]) if os.environ.get("BAZI_STARTUP_BUDGET_MS") else None,
+                    help="fail when the time to first response exceeds this (BAZI_STARTUP_BUDGET_MS)")
+
+    args = parser.parse_args(argv)
+    corpus = make_corpus(args.requests, args.seed)
+    report = {
+        "benchmark": args.command,
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+    }
+    if args.command in ("stages", "all"):
+        report["stages"] = bench_stages(corpus, args.rounds)
+    if args.command in ("http", "all"):
+        report["http"] = bench_http(corpus, args.concurrency)
+    if args.command == "executors":
+        report["results"] = bench_executors(corpus, args.workers, args.modes)
+    if args.command == "startup":
+        report["startup"] = bench_startup(args.app, args.repeat)
+        report["startup"]["budget_ms"] = args.budget_ms
+        report["startup"]["regressions"] = check_startup(report["startup"], args.budget_ms)
+
+    exit_code = 1 if report.get("startup", {}).get("regressions") else 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        exit_code = 1 if report["comparison"]["regressions"] else exit_code
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    sys.stdout.write(text + "\n")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
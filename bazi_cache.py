@@ -0,0 +1,639 @@
+"""
+可插拔的响应缓存后端（缓存 summary_json 编码好的 generate_summary 结果字节）。
+
+- memory（默认）: 进程内 LRU，和原来的 RESPONSE_CACHE 相同
+- sqlite: 同一台机器上的多个 uvicorn worker 共用一个 SQLite 文件（WAL 模式）
+- redis: 多台机器共用一个 Redis（内置的最小 RESP 客户端，不依赖 redis-py）；
+  本地可以用 `python bazi_cache.py fake-redis --port 6379` 起一个假的 Redis 服务器来试
+
+所有后端都支持:
+- TTL: BAZI_CACHE_TTL 秒（0 表示不过期）
+- 条数上限: BAZI_CACHE_SIZE（0 关闭缓存）；sqlite 按最近使用淘汰，redis 按写入顺序淘汰
+- 防击穿: get_or_compute 里同一个键同时只有一个线程计算，其余线程等它的结果；
+  sqlite / redis 还用一个带过期时间的租约让其他进程等结果出现，而不是一起计算
+
+    BAZI_CACHE_BACKEND=sqlite BAZI_CACHE_URL=/tmp/bazi_cache.sqlite
+    BAZI_CACHE_BACKEND=redis BAZI_CACHE_URL=redis://:password@127.0.0.1:6379/0
+
+共享后端出错（Redis 连不上、SQLite 被锁住太久）时只当作未命中，请求照常计算。
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+CACHE_BACKENDS = ("memory", "sqlite", "redis")
+CACHE_BACKEND = os.environ.get("BAZI_CACHE_BACKEND", "memory").lower()
+CACHE_URL = os.environ.get("BAZI_CACHE_URL", "")
+CACHE_SIZE = int(os.environ.get("BAZI_CACHE_SIZE", "10000"))
+CACHE_TTL = float(os.environ.get("BAZI_CACHE_TTL", "0"))
+# 共享后端的键前缀；分析逻辑变化后改掉它，旧结果就不会再被读到
+CACHE_NAMESPACE = os.environ.get("BAZI_CACHE_NAMESPACE", "bazi:v1")
+
+# 跨进程防击穿：租约最长持有时间（秒）和等待时的轮询间隔
+LEASE_SECONDS = 5.0
+LEASE_POLL_SECONDS = 0.005
+
+
+class _Flight:
+    # 进程内同一个键正在进行的计算
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class CacheBackend:
+    """
+    缓存后端的公共部分：命中统计、TTL / 条数上限的默认值、get_or_compute（防击穿）。
+    子类实现 _get / _put / _size / clear，共享后端再实现 _acquire / _release（跨进程租约）。
+    """
+    shared = False
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            self.misses += 1
+            return None
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value, ttl=None):
+        if self.maxsize <= 0:
+            return
+        self._put(key, value, ttl or self.ttl)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        命中时直接返回；否则同一个键只计算一次（compute 无参数，返回要缓存的值），
+        同时到达的其他请求等这次计算的结果，计算抛异常时一起抛出
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            return flight.wait()
+        try:
+            flight.value = self._compute_once(key, compute, ttl)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _compute_once(self, key, compute, ttl):
+        # 共享后端：拿不到租约说明别的进程正在算，等它写入（最多等到租约过期，之后自己算）
+        held = self.shared and self.maxsize > 0 and self._acquire(key)
+        if self.shared and self.maxsize > 0 and not held:
+            deadline = time.monotonic() + LEASE_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(LEASE_POLL_SECONDS)
+                value = self._get(key)
+                if value is not None:
+                    return value
+        try:
+            value = compute()
+            self.put(key, value, ttl)
+            return value
+        finally:
+            if held:
+                self._release(key)
+
+    def __len__(self):
+        return self._size()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "errors": self.errors,
+        }
+
+
+def encode_key(key):
+    """
+    缓存键（字符串、元组、None 组成）-> 共享后端里的字符串键
+    """
+    return CACHE_NAMESPACE + ":" + json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+
+
+class MemoryCache(CacheBackend):
+    """
+    进程内 LRU（带 TTL）
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        super().__init__(maxsize, ttl)
+        self._data = OrderedDict()  # 键 -> (值, 过期时间或 None)
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def _put(self, key, value, ttl):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _size(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class SQLiteCache(CacheBackend):
+    """
+    多进程共用的 SQLite 缓存：每个线程一个连接，WAL 模式下读不阻塞写。
+    命中时（距上次记录超过 1 秒才）更新最近使用时间，每写入若干条（最多 32）检查一次条数上限。
+    """
+    shared = True
+
+    def __init__(self, path, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self._evict_every = max(1, min(32, maxsize // 16))
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, used REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL NOT NULL)")
+
+    def _conn(self):
+        # fork 出来的子进程不能沿用父进程的连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _get(self, key):
+        key = encode_key(key)
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT value, expires, used FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires, used = row
+            if expires is not None and expires <= now:
+                conn.execute("DELETE FROM entries WHERE key = ? AND expires <= ?", (key, now))
+                return None
+            if now - used > 1.0:
+                conn.execute("UPDATE entries SET used = ? WHERE key = ?", (now, key))
+            return value
+        except sqlite3.Error:
+            self.errors += 1
+            return None
+
+    def _put(self, key, value, ttl):
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (encode_key(key), value, now + ttl if ttl else None, now))
+            self._writes += 1
+            if self._writes % self._evict_every == 0:
+                self._evict(conn, now)
+        except sqlite3.Error:
+            self.errors += 1
+
+    def _evict(self, conn, now):
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+            excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.maxsize
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)", (excess,))
+
+    def _acquire(self, key):
+        key = encode_key(key)
+        now = time.time()
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO leases (key, expires) VALUES (?, ?)", (key, now + LEASE_SECONDS))
+                return cursor.rowcount == 1
+        except sqlite3.Error:
+            self.errors += 1
+            return True  # 拿不到锁就自己算
+
+    def _release(self, key):
+        try:
+            self._conn().execute("DELETE FROM leases WHERE key = ?", (encode_key(key),))
+        except sqlite3.Error:
+            self.errors += 1
+
+    def _size(self):
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            self.errors += 1
+            return 0
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM leases")
+        self.hits = 0
+        self.misses = 0
+
+
+class RedisError(RuntimeError):
+    """
+    Redis 返回的错误回复（-ERR ...）
+    """
+
+
+class RedisClient:
+    """
+    最小的 RESP2 客户端：每个线程一条连接，支持管道（execute_many）
+    """
+
+    def __init__(self, url, timeout=2.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL {url!r}, expected redis://host:port/db")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn, self._local.pid = conn, os.getpid()
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            if setup:
+                self.execute_many(setup)
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    @staticmethod
+    def _encode(command):
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if isinstance(arg, str):
+                arg = arg.encode("utf-8")
+            elif not isinstance(arg, bytes):
+                arg = str(arg).encode("ascii")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by Redis server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode("utf-8")
+        if kind == b"-":
+            raise RedisError(rest.decode("utf-8"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            if length < 0:
+                return None
+            return [self._read(reader) for _ in range(length)]
+        raise ConnectionError(f"unexpected reply from Redis server: {line!r}")
+
+    def execute_many(self, commands):
+        """
+        一次发送多条命令，按顺序返回回复；出错回复在读完全部回复后抛出第一个
+        """
+        sock, reader = self._connection()
+        try:
+            sock.sendall(b"".join(self._encode(command) for command in commands))
+            replies, error = [], None
+            for _ in commands:
+                try:
+                    replies.append(self._read(reader))
+                except RedisError as exc:
+                    replies.append(None)
+                    error = error or exc
+        except OSError:
+            self.close()  # 半截的连接不能再用
+            raise
+        if error is not None:
+            raise error
+        return replies
+
+    def execute(self, *command):
+        return self.execute_many([command])[0]
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis 缓存：值用 SET ... PX 存（带 TTL），另用一个有序集合按写入时间记录键，超出条数上限时从最早的删起。
+    """
+    shared = True
+
+    def __init__(self, url, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        super().__init__(maxsize, ttl)
+        self.client = RedisClient(url)
+        self.index_key = CACHE_NAMESPACE + ":index"
+
+    def _get(self, key):
+        try:
+            return self.client.execute("GET", encode_key(key))
+        except (OSError, RedisError):
+            self.errors += 1
+            return None
+
+    def _put(self, key, value, ttl):
+        key = encode_key(key)
+        command = ["SET", key, value]
+        if ttl:
+            command += ["PX", int(ttl * 1000)]
+        try:
+            _, _, size = self.client.execute_many([command, ("ZADD", self.index_key, time.time(), key),
+                                                   ("ZCARD", self.index_key)])
+            if size > self.maxsize:
+                evicted = self.client.execute("ZPOPMIN", self.index_key, size - self.maxsize)
+                keys = evicted[::2]  # [成员, 分数, 成员, 分数, ...]
+                if keys:
+                    self.client.execute("DEL", *keys)
+        except (OSError, RedisError):
+            self.errors += 1
+
+    def _acquire(self, key):
+        try:
+            return self.client.execute(
+                "SET", encode_key(key) + ":lease", "1", "NX", "PX", int(LEASE_SECONDS * 1000)) == "OK"
+        except (OSError, RedisError):
+            self.errors += 1
+            return True
+
+    def _release(self, key):
+        try:
+            self.client.execute("DEL", encode_key(key) + ":lease")
+        except (OSError, RedisError):
+            self.errors += 1
+
+    def _size(self):
+        # 过期的键要等被淘汰才从索引里消失，所以这是上限
+        try:
+            return self.client.execute("ZCARD", self.index_key)
+        except (OSError, RedisError):
+            self.errors += 1
+            return 0
+
+    def clear(self):
+        keys = self.client.execute("ZRANGE", self.index_key, 0, -1)
+        self.client.execute("DEL", self.index_key, *keys)
+        self.hits = 0
+        self.misses = 0
+
+
+def make_cache(backend=None, url=None, maxsize=None, ttl=None):
+    """
+    按参数（默认取 BAZI_CACHE_BACKEND / BAZI_CACHE_URL / BAZI_CACHE_SIZE / BAZI_CACHE_TTL）创建缓存后端
+    """
+    backend = (backend or CACHE_BACKEND).lower()
+    url = url if url is not None else CACHE_URL
+    maxsize = CACHE_SIZE if maxsize is None else maxsize
+    ttl = CACHE_TTL if ttl is None else ttl
+    if backend == "memory":
+        return MemoryCache(maxsize, ttl)
+    if backend == "sqlite":
+        return SQLiteCache(url or "bazi_cache.sqlite", maxsize, ttl)
+    if backend == "redis":
+        return RedisCache(url or "redis://127.0.0.1:6379/0", maxsize, ttl)
+    raise ValueError(f"Unknown BAZI_CACHE_BACKEND {backend!r}, expected one of {CACHE_BACKENDS}")
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """
+    本地开发用的假 Redis：只实现本模块用到的命令（PING、AUTH、SELECT、GET、SET [NX] [PX|EX]、DEL、
+    EXISTS、DBSIZE、FLUSHDB、ZADD、ZCARD、ZPOPMIN、ZRANGE），数据只在内存里，过期在访问时检查。
+    port=0 时由系统分配端口（见 server_address）。
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _FakeRedisHandler)
+        self.data = {}  # 键 -> (值, 过期时间或 None)；有序集合的值是 {成员: 分数}
+        self.lock = threading.Lock()
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True)
+        thread.start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def command(self, name, args):
+        with self.lock:
+            return self._command(name, args)
+
+    def _command(self, name, args):
+        if name == "PING":
+            return "PONG"
+        if name in ("AUTH", "SELECT", "FLUSHDB"):
+            if name == "FLUSHDB":
+                self.data.clear()
+            return "OK"
+        if name == "GET":
+            entry = self._live(args[0])
+            return None if entry is None else entry[0]
+        if name == "SET":
+            key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+            if b"NX" in options and self._live(key) is not None:
+                return None
+            expires = None
+            for unit, scale in ((b"PX", 1000), (b"EX", 1)):
+                if unit in options:
+                    expires = time.monotonic() + int(args[2 + options.index(unit) + 1]) / scale
+            self.data[key] = (value, expires)
+            return "OK"
+        if name in ("DEL", "EXISTS"):
+            count = sum(1 for key in args if self._live(key) is not None)
+            if name == "DEL":
+                for key in args:
+                    self.data.pop(key, None)
+            return count
+        if name == "DBSIZE":
+            return sum(1 for key in list(self.data) if self._live(key) is not None)
+        if name in ("ZADD", "ZCARD", "ZPOPMIN", "ZRANGE"):
+            entry = self._live(args[0])
+            zset = entry[0] if entry is not None else {}
+            if name == "ZADD":
+                added = 0
+                for score, member in zip(args[1::2], args[2::2]):
+                    added += member not in zset
+                    zset[member] = float(score)
+                self.data[args[0]] = (zset, None)
+                return added
+            if name == "ZCARD":
+                return len(zset)
+            ordered = sorted(zset, key=lambda member: (zset[member], member))
+            if name == "ZRANGE":
+                start, stop = int(args[1]), int(args[2])
+                stop = len(ordered) if stop == -1 else stop + 1
+                return ordered[start:stop]
+            popped = ordered[:int(args[1]) if len(args) > 1 else 1]
+            reply = []
+            for member in popped:
+                reply += [member, repr(zset.pop(member)).encode("ascii")]
+            return reply
+        raise RedisError(f"ERR unknown command '{name}'")
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if not line.startswith(b"*"):
+                self._write(RedisError("ERR only RESP arrays are supported"))
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2])
+            name = args[0].decode("ascii").upper()
+            if name == "QUIT":
+                self._write("OK")
+                return
+            try:
+                reply = self.server.command(name, args[1:])
+            except RedisError as exc:
+                reply = exc
+            except (IndexError, ValueError):
+                reply = RedisError(f"ERR wrong arguments for '{name}' command")
+            self._write(reply)
+
+    def _write(self, reply):
+        self.wfile.write(_encode_reply(reply))
+
+
+def _encode_reply(reply):
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, RedisError):
+        return b"-" + str(reply).encode("utf-8") + b"\r\n"
+    if isinstance(reply, str):
+        return b"+" + reply.encode("utf-8") + b"\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode_reply(item) for item in reply)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Response cache backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fake = sub.add_parser("fake-redis", help="run an in-memory Redis stand-in for local development")
+    fake.add_argument("--host", default="127.0.0.1")
+    fake.add_argument("--port", type=int, default=6379)
+    sub.add_parser("stats", help="print the configured backend's stats")
+    args = parser.parse_args(argv)
+
+    if args.command == "fake-redis":
+        server = FakeRedisServer(args.host, args.port)
+        print(f"fake Redis listening on {server.url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(json.dumps({"backend": CACHE_BACKEND, **make_cache().stats()}))
+
+
+if __name__ == "__main__":
+    main()
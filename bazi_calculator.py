@@ -1,8 +1,13 @@
+import hashlib
 import json
-from lunar_python import Solar
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
-import pytz
-import pandas as pd
+from bazi_calendar import BRANCHES, JIAZI, JIAZI_INDEX, STEMS, four_pillars
+from bazi_metrics import timed
+from bazi_timezone import get_zone, to_beijing
 from statistics import mean
 
 # 五行映射
@@ -159,29 +164,258 @@ TEN_GODS_TRANSLATION = {
 
 TEN_GODS_TRANSLATION_REVERSE = {v: k for k, v in TEN_GODS_TRANSLATION.items()}
 
+# 十神喜忌建议文本
+TEN_GODS_FAVORABLE = {
+    "比肩": "代表自我、兄弟、伙伴。喜比肩时，多合作、结交志同道合的人，可以增强自信和行动力",
+    "劫财": "代表朋友、同伴、竞争。喜劫财时，朋友能带来帮助和资源共享",
+    "正印": "代表学习、贵人、保护。喜正印时，应多学习、提升学识，并依靠贵人支持",
+    "偏印": "代表灵感、创造、直觉。喜偏印时，有助于发展创造力、灵性与直觉",
+    "食神": "代表才华、子女、表达。喜食神时，应多发挥才华，注重表达与分享",
+    "伤官": "代表创造力、叛逆、表现。喜伤官时，可以勇于创新与表达自我",
+    "正财": "代表财富、责任、配偶。喜正财时，宜脚踏实地、注重理财和责任",
+    "偏财": "代表机会、变通、人脉。喜偏财时，应抓住机会、灵活变通，注重人脉关系",
+    "正官": "代表事业、责任、纪律。喜正官时，守纪律、重责任，有助于事业发展",
+    "七杀": "代表挑战、竞争、魄力。喜七杀时，敢于挑战、果断有魄力，有助于开拓事业"
+}
+
+TEN_GODS_UNFAVORABLE = {
+    "比肩": "忌比肩时，容易固执，与人对抗，需避免争强好胜",
+    "劫财": "忌劫财时，易生竞争与冲突，需要学会分享与设立界限",
+    "正印": "忌正印时，过于依赖他人，缺乏独立，需保持自主",
+    "偏印": "忌偏印时，容易不切实际或精神不安定，应脚踏实地",
+    "食神": "忌食神时，易懒散、贪图享乐，应自律",
+    "伤官": "忌伤官时，易冲动叛逆，与权威对抗，需控制情绪",
+    "正财": "忌正财时，可能过于物质或劳累，应适度理财并平衡生活",
+    "偏财": "忌偏财时，易投机取巧、感情不稳，应谨慎理财与感情",
+    "正官": "忌正官时，容易受束缚或压力过大，应学会调适与放松",
+    "七杀": "忌七杀时，过度压力或冲动冒险，需谨慎行事"
+}
+
+TEN_GODS_FAVORABLE_ENG = {
+    "BiJian Star, Friend and Self (比肩)": "Represents self, siblings, and partners. When favorable, BiJian encourages cooperation and connecting with like-minded people, boosting confidence and initiative.",
+    "JieCai Star, Rival (劫财)": "Represents friends, companions, and competition. When favorable, JieCai means friends can bring help and share resources.",
+    "ZhengYin Star, Direct Resource (正印)": "Represents learning, mentors, and protection. When favorable, ZhengYin suggests focusing on study, knowledge growth, and support from benefactors.",
+    "PianYin Star, Unconventional Resource (偏印)": "Represents inspiration, creativity, and intuition. When favorable, PianYin enhances imagination, spirituality, and intuitive insight.",
+    "ShiShen Star, Artisan (食神)": "Represents talent, children, and expression. When favorable, ShiShen encourages showcasing talents and sharing with others.",
+    "ShangGuan Star, Performer (伤官)": "Represents creativity, rebellion, and performance. When favorable, ShangGuan brings courage to innovate and express oneself boldly.",
+    "ZhengCai Star, Stable Wealth (正财)": "Represents wealth, responsibility, and spouse. When favorable, ZhengCai emphasizes diligence, financial management, and responsibility.",
+    "PianCai Star, Opportunity Wealth (偏财)": "Represents opportunity, adaptability, and connections. When favorable, PianCai encourages seizing opportunities, flexibility, and building networks.",
+    "ZhengGuan Star, Authority (正官)": "Represents career, responsibility, and discipline. When favorable, ZhengGuan supports following rules, taking responsibility, and career advancement.",
+    "QiSha Star, Challenger (七杀)": "Represents challenges, competition, and drive. When favorable, QiSha brings courage, decisiveness, and the power to pioneer new paths."
+}
+
+TEN_GODS_UNFAVORABLE_ENG = {
+    "BiJian Star, Friend and Self (比肩)": "When unfavorable, BiJian may cause stubbornness and conflict with others; avoid being overly competitive.",
+    "JieCai Star, Rival (劫财)": "When unfavorable, JieCai can bring rivalry and conflict; learn to share and set healthy boundaries.",
+    "ZhengYin Star, Direct Resource (正印)": "When unfavorable, ZhengYin may cause over-reliance on others and lack of independence; maintain autonomy.",
+    "PianYin Star, Unconventional Resource (偏印)": "When unfavorable, PianYin may lead to unrealistic thinking or mental instability; stay grounded.",
+    "ShiShen Star, Artisan (食神)": "When unfavorable, ShiShen may cause laziness and indulgence in pleasure; practice self-discipline.",
+    "ShangGuan Star, Performer (伤官)": "When unfavorable, ShangGuan may cause impulsiveness, rebellion, and conflict with authority; control emotions.",
+    "ZhengCai Star, Stable Wealth (正财)": "When unfavorable, ZhengCai may lead to materialism or overwork; manage finances wisely and seek balance.",
+    "PianCai Star, Opportunity Wealth (偏财)": "When unfavorable, PianCai may cause opportunism and unstable relationships; be cautious in money and love matters.",
+    "ZhengGuan Star, Authority (正官)": "When unfavorable, ZhengGuan may bring restrictions or excessive pressure; learn to adjust and relax.",
+    "QiSha Star, Challenger (七杀)": "When unfavorable, QiSha may cause excessive stress or reckless risk-taking; act with caution."
+}
+
+
+# ---------------------------------------------------------------------------
+# 预计算查表（模块加载时生成，热路径只做索引）
+# ---------------------------------------------------------------------------
+
+# STEMS / BRANCHES / JIAZI（六十甲子）/ JIAZI_INDEX 来自 bazi_calendar
+ELEMENTS = ("木", "火", "土", "金", "水")  # 与 five_elements 中 elements_score 的顺序一致
+
+# 柱位（与 calc_bazi 返回的 fourPillars 顺序一致），首字用于 POSITION_WEIGHTS
+PILLAR_POSITIONS = ("年柱 Year Pillar", "月柱 Month Pillar", "日柱 Day Pillar", "时柱 Hour Pillar")
+
+
+def _ten_god_by_rule(dayMaster, other_gan):
+    """
+    Return the ten-god (Chinese) name for 'other_gan' relative to 'dayMaster'.
+    Deterministic based on five-element relation and yin/yang.
+    用来计算十神的一个中间步骤，比对日干和其他天干的关系，根据阴阳和五行生克来决定。
+    """
+    if dayMaster not in STEM_TO_ELEMENT or other_gan not in STEM_TO_ELEMENT:
+        return None  # invalid stems
+
+    if dayMaster == other_gan:
+        # same exact stem: treat as same-element with same polarity => 比肩
+        # (if you want to mark the day pillar itself, you can return "日主" externally)
+        return "比肩"
+
+    day_elem = STEM_TO_ELEMENT[dayMaster]
+    other_elem = STEM_TO_ELEMENT[other_gan]
+    day_pol = STEM_POLARITY[dayMaster] # 日干阴阳
+    other_pol = STEM_POLARITY[other_gan] # 其他天干阴阳
+
+# Same element as Day Master
+    if other_elem == day_elem:
+        return "BiJian Star, Friend and Self (比肩)" if other_pol == day_pol else "JieCai Star, Rival (劫财)"
+
+# Day Master generates other element => Output Stars
+    if GENERATE[day_elem] == other_elem:
+        return "ShiShen Star, Artisan (食神)" if other_pol == day_pol else "ShangGuan Star, Performer (伤官)"
+
+# Other element generates Day Master => Resource Stars
+    if GENERATE[other_elem] == day_elem:
+        return "PianYin Star, Unconventional Resource (偏印)" if other_pol == day_pol else "ZhengYin Star, Direct Resource (正印)"
 
-def calc_bazi(data):
+# Other element overcomes Day Master => Authority Stars
+    if OVERCOME[other_elem] == day_elem:
+        return "QiSha Star, Challenger (七杀)" if other_pol == day_pol else "ZhengGuan Star, Authority (正官)"
+
+# Day Master overcomes other element => Wealth Stars
+    if OVERCOME[day_elem] == other_elem:
+        return "PianCai Star, Opportunity Wealth (偏财)" if other_pol == day_pol else "ZhengCai Star, Stable Wealth (正财)"
+
+    # fallback (should not happen)
+    return None
+
+
+def _build_ten_god_matrix():
+    """
+    10x10 十神矩阵: TEN_GOD_MATRIX[日干][其他天干] -> 十神
+    """
+    return {dm: {gan: _ten_god_by_rule(dm, gan) for gan in STEMS} for dm in STEMS}
+
+
+def _build_pillar_contributions(position_weights=POSITION_WEIGHTS, branch_hidden_stems=BRANCH_HIDDEN_STEMS):
+    """
+    每个柱位 × 六十甲子 的五行贡献:
+    PILLAR_CONTRIBUTIONS[柱位首字][干支] = (increments, pillar_str, pillar_str_eng)
+    increments 按 five_elements 原来的累加顺序排列 ((五行, 加分), ...)，
+    保证逐项相加的浮点结果与逐柱计算完全一致。
+    """
+    table = {}
+    for pos in PILLAR_POSITIONS:
+        pos_char = pos[0]
+        gan_weight = position_weights[pos_char + "干"]
+        zhi_weight = position_weights[pos_char + "支"]
+        per_pos = {}
+        for gz in JIAZI:
+            gan, zhi = gz[0], gz[1]
+            gan_elem = STEM_TO_ELEMENT[gan]
+            # 天干直接加 1.0，再根据天干位置加分；地支藏干按权重 × 地支位置加分
+            increments = [(gan_elem, 1.0), (gan_elem, gan_weight)]
+            for hidden_gan, weight in branch_hidden_stems[zhi]:
+                increments.append((STEM_TO_ELEMENT[hidden_gan], weight * zhi_weight))
+
+            zhi_elems = tuple(STEM_TO_ELEMENT[hidden_gan] for hidden_gan, _ in branch_hidden_stems[zhi])
+            zhi_elems_eng = [ELEMENT_TRANSLATION[elem] for elem in zhi_elems]
+            pillar_str = f"{gan}({gan_elem}) + {zhi}({''.join(zhi_elems)})"
+            pillar_str_eng = f"{gan}({ELEMENT_TRANSLATION[gan_elem]}) + {zhi}({' and '.join(zhi_elems_eng)})"
+            per_pos[gz] = (tuple(increments), pillar_str, pillar_str_eng)
+        table[pos_char] = per_pos
+    return table
+
+
+def _build_hidden_ten_gods(branch_hidden_stems=BRANCH_HIDDEN_STEMS):
+    """
+    HIDDEN_TEN_GODS[日干][地支] = (((藏干, 十神, 权重), ...), 表格单元格字符串)
+    """
+    table = {}
+    for dm in STEMS:
+        row = TEN_GOD_MATRIX[dm]
+        per_dm = {}
+        for zhi, hidden in branch_hidden_stems.items():
+            entries = tuple((hidden_gan, row[hidden_gan], weight) for hidden_gan, weight in hidden)
+            cell = "; ".join(f"{tg}({weight})" for _, tg, weight in entries)
+            per_dm[zhi] = (entries, cell)
+        table[dm] = per_dm
+    return table
+
+
+def _build_advice_lines():
+    """
+    ADVICE_LINES[日干][五行] = (喜的 (中文, 英文) 建议列表, 忌的 (中文, 英文) 建议列表)
+    """
+    table = {}
+    for dm in STEMS:
+        per_dm = {}
+        for elem in ELEMENTS:
+            favorable, unfavorable = [], []
+            for gan in ELEMENT_STEMS[elem]:
+                tg = TEN_GOD_MATRIX[dm][gan]
+                if tg and tg in TEN_GODS_FAVORABLE_ENG:
+                    reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
+                    favorable.append((
+                        f"喜{reverse_key}：{TEN_GODS_FAVORABLE[reverse_key]}",
+                        f"Favorable {tg}: {TEN_GODS_FAVORABLE_ENG[tg]}",
+                    ))
+                if tg and tg in TEN_GODS_UNFAVORABLE_ENG:
+                    reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
+                    unfavorable.append((
+                        f"忌{reverse_key}：{TEN_GODS_UNFAVORABLE[reverse_key]}",
+                        f"Unfavorable {tg}: {TEN_GODS_UNFAVORABLE_ENG[tg]}",
+                    ))
+            per_dm[elem] = (tuple(favorable), tuple(unfavorable))
+        table[dm] = per_dm
+    return table
+
+
+ELEMENT_STEMS = {elem: tuple(gan for gan in STEMS if STEM_TO_ELEMENT[gan] == elem) for elem in ELEMENTS}
+TEN_GOD_MATRIX = _build_ten_god_matrix()
+PILLAR_CONTRIBUTIONS = _build_pillar_contributions()
+HIDDEN_TEN_GODS = _build_hidden_ten_gods()
+ADVICE_LINES = _build_advice_lines()
+
+
+
+def local_datetime(data):
+    """
+    BaziInput 字典 -> (当地 naive 时间, 时区名)；未知时区抛 pytz.UnknownTimeZoneError
+    """
     birth = data["birth"]
     time = data["time"]
     tz_str = data["tz"]
+    if not time:
+        raise ValueError("time is required")
 
     year, month, day = map(int, birth.split("-"))
     hour, minute = map(int, time.split(":"))
 
-    local_tz = pytz.timezone(tz_str)
-    beijing_tz = pytz.timezone("Asia/Shanghai")
-    dt_local = local_tz.localize(datetime(year, month, day, hour, minute))
-    dt_bj = dt_local.astimezone(beijing_tz)
+    get_zone(tz_str)
+    return datetime(year, month, day, hour, minute), tz_str
+
+
+@timed("calc_bazi")
+def calc_bazi(data, dt_bj=None):
+    """
+    dt_bj（北京时间）可以由批量换算（bazi_timezone.to_beijing_many）预先给出
+    """
+    if dt_bj is None:
+        dt_local, tz_str = local_datetime(data)
+        dt_bj = to_beijing(dt_local, tz_str)
+    else:
+        tz_str = data["tz"]
+
+    # 快速干支历（1900–2100 查表），超出范围时回退到 lunar_python
+    ganzhi = four_pillars(dt_bj.year, dt_bj.month, dt_bj.day, dt_bj.hour)
+    if ganzhi is None:
+        from lunar_python import Solar  # 只有查表范围外才需要，不放在导入路径上
+
+        solar = Solar.fromYmdHms(
+            dt_bj.year, dt_bj.month, dt_bj.day, dt_bj.hour, dt_bj.minute, dt_bj.second)
+        lunar = solar.getLunar()
+        ganzhi = (
+            lunar.getYearInGanZhi(),
+            lunar.getMonthInGanZhi(),
+            lunar.getDayInGanZhi(),
+            lunar.getTimeInGanZhi(),
+        )
 
-    solar = Solar.fromYmdHms(
-        dt_bj.year, dt_bj.month, dt_bj.day, dt_bj.hour, dt_bj.minute, dt_bj.second)
-    lunar = solar.getLunar()
+    return bazi_from_ganzhi(tz_str, dt_bj, ganzhi)
 
+
+def bazi_from_ganzhi(tz_str, dt_bj, ganzhi):
+    """
+    时区名 + 北京时间 + (年柱, 月柱, 日柱, 时柱) 干支 -> calc_bazi 的结果
+    """
     pillars = {
-        "年柱 Year Pillar": lunar.getYearInGanZhi(),
-        "月柱 Month Pillar": lunar.getMonthInGanZhi(),
-        "日柱 Day Pillar": lunar.getDayInGanZhi(),
-        "时柱 Hour Pillar": lunar.getTimeInGanZhi(),
+        "年柱 Year Pillar": ganzhi[0],
+        "月柱 Month Pillar": ganzhi[1],
+        "日柱 Day Pillar": ganzhi[2],
+        "时柱 Hour Pillar": ganzhi[3],
     }
     pillars_eng = {k: "".join(f"{ch}({GANZHI_PINYIN.get(ch, ch)})" for ch in v) for k, v in pillars.items()}
 
@@ -195,299 +429,543 @@ def calc_bazi(data):
         "local_tz": tz_str,
         "beijing_tz": dt_bj,
         "fourPillars": pillars,
-        "dayMaster": lunar.getDayGan(),
+        "dayMaster": ganzhi[2][0],  # 日干
         #"bazi_explanation": bazi_exp
     }
 
     return result   
 
 
-def five_elements(pillars,day_master):
-    # 五行得分
-    elements_score = {"木": 0, "火": 0, "土": 0, "金": 0, "水": 0}
-    pillars_elements_str = []  # 每柱的五行表示
-    pillars_elements_str_eng = []
+# ---------------------------------------------------------------------------
+# 紧凑命盘模型：分析步骤之间只传整数序号（天干 0–9、五行 0–4、六十甲子 0–59）和按序号排列的
+# 定长列表，带 "年柱 Year Pillar"、"Stem (Top Symbol) 天干" 这类长字符串键的 dict 只在输出时生成
+# （Chart.result，以及 five_elements / judge_strength / compute_ten_gods 这些公开函数）
+# ---------------------------------------------------------------------------
 
-    for pos, p in pillars.items():
-        gan, zhi = p[0], p[1]
+ELEMENT_INDEX = {elem: i for i, elem in enumerate(ELEMENTS)}
+STEM_INDEX = {gan: i for i, gan in enumerate(STEMS)}
+STEM_ELEMENTS = tuple(ELEMENT_INDEX[STEM_TO_ELEMENT[gan]] for gan in STEMS)
+ELEMENT_LABELS_ENG = tuple(f"{elem} {ELEMENT_TRANSLATION[elem]}" for elem in ELEMENTS)
+ELEMENT_NAMES_ENG = tuple(ELEMENT_TRANSLATION[elem] for elem in ELEMENTS)
+TEN_GOD_NAMES = tuple(TEN_GODS_TRANSLATION.values())  # tenGodsSummary 的顺序
+TEN_GOD_INDEX = {tg: i for i, tg in enumerate(TEN_GOD_NAMES)}
+DAY_PILLAR = PILLAR_POSITIONS.index("日柱 Day Pillar")
 
-        # 记录天干对应的五行
-        gan_elem = STEM_TO_ELEMENT[gan] 
-        gan_elem_eng = ELEMENT_TRANSLATION[gan_elem]
+# 日主五行 -> (比劫, 印星, 食伤, 财星, 官杀) 的五行序号
+STAR_NAMES = ("比劫", "印星", "食伤", "财星", "官杀")
+ELEMENT_RELATIONS = tuple(
+    tuple(ELEMENT_INDEX[e] for e in (elem, MOTHER[elem], GENERATE[elem], OVERCOME[elem], RESTRAIN[elem]))
+    for elem in ELEMENTS
+)
 
-        # 天干直接加 1.0
-        elements_score[STEM_TO_ELEMENT[gan]] += 1.0
-        elements_score[gan_elem] += POSITION_WEIGHTS[pos[0] + "干"] # 根据天干位置调整得分
-     
-        # 地支藏干记录
-        zhi_elems = [STEM_TO_ELEMENT[hidden_gan] for hidden_gan, _ in BRANCH_HIDDEN_STEMS[zhi]]
-        zhi_elems_eng = [ELEMENT_TRANSLATION[elem] for elem in zhi_elems]
 
-        zhi_elem_str = "".join(zhi_elems)
-        zhi_elem_str_eng = " and ".join(zhi_elems_eng)
- 
-        # 地支藏干加权 根据权重表“地支藏干 + 权重”
-        for hidden_gan, weight in BRANCH_HIDDEN_STEMS[zhi]:
-            hidden_elem = STEM_TO_ELEMENT[hidden_gan]
-            elements_score[hidden_elem] += weight * POSITION_WEIGHTS[pos[0] + "支"] # 根据地支位置调整得分
+def _build_pillar_increments(contributions=PILLAR_CONTRIBUTIONS):
+    """
+    PILLAR_INCREMENTS[柱位序号][甲子序号] = ((五行序号, 加分), ...)，顺序与 PILLAR_CONTRIBUTIONS 相同
+    """
+    return tuple(
+        tuple(
+            tuple((ELEMENT_INDEX[elem], inc) for elem, inc in contributions[pos[0]][gz][0])
+            for gz in JIAZI
+        )
+        for pos in PILLAR_POSITIONS
+    )
 
-        # 生成展示字符串，比如 "辛巳 → 辛(金) + 巳(火土金)"
-        pillar_str = f"{gan}({gan_elem}) + {zhi}({zhi_elem_str})"
-        pillars_elements_str.append(pillar_str)
 
-        pillar_str_eng = f"{gan}({gan_elem_eng}) + {zhi}({zhi_elem_str_eng})"
-        pillars_elements_str_eng.append(pillar_str_eng)
+def _build_pillar_strings(contributions=PILLAR_CONTRIBUTIONS):
+    """
+    PILLAR_STRINGS[柱位序号][甲子序号] = (pillarsElements 中文, 英文)
+    """
+    return tuple(
+        tuple(contributions[pos[0]][gz][1:] for gz in JIAZI) for pos in PILLAR_POSITIONS
+    )
 
 
-    elements_score_eng = {f"{cn} {ELEMENT_TRANSLATION[cn]}": val 
-          for cn, val in elements_score.items()}
-    
+def _build_jiazi_elements(branch_hidden_stems=BRANCH_HIDDEN_STEMS):
+    """
+    JIAZI_ELEMENTS[甲子序号] -> 按 ELEMENTS 顺序的五行分量：天干 1.0，地支按藏干权重
+    """
+    table = []
+    for gz in JIAZI:
+        vector = [0.0] * len(ELEMENTS)
+        vector[ELEMENT_INDEX[STEM_TO_ELEMENT[gz[0]]]] += 1.0
+        for hidden_gan, weight in branch_hidden_stems[gz[1]]:
+            vector[ELEMENT_INDEX[STEM_TO_ELEMENT[hidden_gan]]] += weight
+        table.append(tuple(vector))
+    return tuple(table)
 
-    # 根据月令调整五行得分
-    #month_branch = pillars["月柱 Month Pillar"][1]  # 月柱地支
-    month_branch = pillars["月柱 Month Pillar"][1]  # 月柱地支
-    season_state = SEASON_TABLE[month_branch]  # 获取当月旺衰状态表
-    adjusted_score = {}
-    state_record = {}   # 记录每个五行的状态
-    for elem, score in elements_score.items():
-        state = season_state[elem]             # 该五行在月令的状态
-        state_record[elem] = state
-
-        weight = STATE_WEIGHTS[state]    # 状态对应的修正系数 "旺": 1.3, "相": 1.15, "余": 1.05, "休": 1.0, "囚": 0.85, "死": 0.7
-        adjusted_score[elem] = round(score * weight, 3)
- 
-    adjusted_score_eng = {f"{cn} {ELEMENT_TRANSLATION[cn]}": val 
-          for cn, val in adjusted_score.items()}
-    
-    state_record_eng = {
-    ELEMENT_TRANSLATION[elem]: STATE_TRANSLATION[state]
-    for elem, state in state_record.items()}
 
+def _build_season_states(state_weights=STATE_WEIGHTS):
+    """
+    SEASON_STATES[月支序号] = (各五行的月令状态, 修正系数, 状态英文)，按 ELEMENTS 顺序。
+    STATE_TRANSLATION 没有的状态（辰月木的 "余"）英文为 None，score_elements 照原样抛 KeyError。
+    """
+    table = []
+    for zhi in BRANCHES:
+        states = tuple(SEASON_TABLE[zhi][elem] for elem in ELEMENTS)
+        weights = tuple(state_weights[state] for state in states)
+        states_eng = tuple(STATE_TRANSLATION.get(state) for state in states)
+        table.append((states, weights, None if None in states_eng else states_eng))
+    return tuple(table)
 
-    
-    #explanation = []
-    #explanation.append(
-    #f"八字的五行（天干+地支）为: " + ", ".join(pillars_elements_str) + "。"
-    #f"根据月令（月柱地支）对应的五行状态为: "
-    #+ " ".join([f"{k}={v}" for k, v in state_record.items()]) + "。"
-    #)
 
+PILLAR_INCREMENTS = _build_pillar_increments()
+PILLAR_STRINGS = _build_pillar_strings()
+JIAZI_ELEMENTS = _build_jiazi_elements()
+SEASON_STATES = _build_season_states()
+# 身强阈值：助力 > 克泄 × STRENGTH_RATIO 为身强
+STRENGTH_RATIO = 1.5
 
 
-    #score_explanation = []
-    #score_explanation.append(
-    #f"在五行强弱的具体分布上，未经过月令调整的五行得分为: "
-    #+ " ".join([f"{k} = {round(v, 2)}" for k, v in elements_score.items()]) + "。"
-    #f"而经过月令调整后，五行得分变为: "
-    #+ " ".join([f"{k} = {round(v, 2)}" for k, v in adjusted_score.items()]) + "。"
-    #f"这一调整反映了月令对五行力量的修正，使整体格局更贴近实际情况。"
-    #)
+# ---------------------------------------------------------------------------
+# 打分方案（scoring profile）：柱位权重、月令修正系数、地支藏干和身强阈值可以按方案配置，
+# 加载时编译成与上面相同结构的查表（PILLAR_INCREMENTS / PILLAR_STRINGS / SEASON_STATES / HIDDEN_TEN_GODS），
+# 分析步骤只查所用方案的表。DEFAULT_PROFILE 直接使用上面的模块常量。
+# 方案的注册、从配置文件加载和热更新见 bazi_profiles.py；这里只保存当前生效的方案表（整体替换）。
+# ---------------------------------------------------------------------------
 
-    #fiveElement_exp = "\n".join(explanation)
-    #fiveElement_score_exp = "\n".join(score_explanation)
+PROFILE_SETTINGS = ("position_weights", "state_weights", "branch_hidden_stems", "strength_ratio")
+DEFAULT_PROFILE_NAME = "default"
 
-    result = {
-        "fiveElementsScore": elements_score,
-        "fiveElementsScore_eng": elements_score_eng,
-        "fiveElementsScore_adjusted": adjusted_score, 
-        "fiveElementsScore_adjusted_eng": adjusted_score_eng,
-        "fiveElementsState": state_record,
-        "fiveElementsState_eng": state_record_eng,
-        "pillarsElements": pillars_elements_str,
-        "pillarsElements_eng": pillars_elements_str_eng
-        #"fiveElement_explanation": fiveElement_exp,
-        #"fiveElement_score_explanation": fiveElement_score_exp
 
-    }
-    return result
+def _number(value, what):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{what} must be a number, got {value!r}")
+    return float(value)
 
-def judge_strength(dayMaster, fiveElementsScore_adjusted, fiveElementsState):
-    dayElement = STEM_TO_ELEMENT[dayMaster]
-    dayElement_eng = ELEMENT_TRANSLATION[dayElement]
 
-    # 日主状态
-    dayElement_state = fiveElementsState[dayElement]
-    dayElement_state_eng = STATE_TRANSLATION[dayElement_state]
-    
-    #dayElement_score = STATE_SCORE[dayElement_state]
-    
-    # 力量分数
-    same_score   = fiveElementsScore_adjusted[dayElement]        # 比劫 (同我)  属木的话看木
-    helper_score = fiveElementsScore_adjusted[MOTHER[dayElement]]# 印星 (生我) 属木的话看水
-    leak_score   = fiveElementsScore_adjusted[GENERATE[dayElement]] # 食伤 (我生) 属木的话看火
-    drain_score  = fiveElementsScore_adjusted[OVERCOME[dayElement]] # 财星 (我克) 属木的话看土
-    enemy_score  = fiveElementsScore_adjusted[RESTRAIN[dayElement]]   # 官杀 (克我) 属木的话看金
-
-    stars_strength = {
-        "比劫": same_score,
-        "印星": helper_score,
-        "食伤": leak_score,
-        "财星": drain_score,
-        "官杀": enemy_score
-    }
+def _mapping(value, what):
+    if not isinstance(value, dict):
+        raise ValueError(f"{what} must be a JSON object")
+    return value
 
-    # 总结
-    power = round(same_score + helper_score, 3)
-    resistance = round(leak_score + drain_score + enemy_score,3)
-
-    explanation = []
-    explanation_eng = []
-    #explanation.append(f"日主五行为 {dayElement}, 状态为 {dayElement_state}")
-    explanation.append(f"比劫 = {same_score}")
-    explanation.append(f"印星 = {helper_score}")
-    explanation.append(f"助力合计 = {same_score} + {helper_score} = {power}")
-    explanation.append(f"食伤 = {leak_score}")
-    explanation.append(f"财星 = {drain_score}")
-    explanation.append(f"官杀 = {enemy_score}")
-    explanation.append(f"克泄合计 = {leak_score} + {drain_score} + {enemy_score} = {resistance}")
-
-    explanation_eng = []
-    explanation_eng.append(f"Stars of Peers (power of allies/competitors) = {same_score}")
-    explanation_eng.append(f"Stars of Resource (power of support/learning) = {helper_score}")
-    explanation_eng.append(f"Stars of Support in Total = {same_score} + {helper_score} = {power}")
-    explanation_eng.append(f"Stars of Output (power of creativity/expression) = {leak_score}")
-    explanation_eng.append(f"Stars of Wealth (power of money/resources) = {drain_score}")
-    explanation_eng.append(f"Stars of Authority (power of discipline/challenges) = {enemy_score}")
-    explanation_eng.append(f"Stars of Resistance in Total = {leak_score} + {drain_score} + {enemy_score} = {resistance}")
-
-
-
-    if power > resistance * 1.5:
-        strength = "身强"
-        explanation.append(f"因为 助力 {power} 明显大于 克泄 {resistance}，所以日主偏强。")
-        strength_eng = "Strong"
-        explanation_eng.append(f"Since Support Power {power} is significantly greater than Resistance Power {resistance}, the Day Master is considered Strong.")
-    elif resistance > power:
-        strength = "身弱"
-        strength_eng = "Weak"
-        explanation.append(f"因为 克泄 {resistance} 明显大于 助力 {power}，所以日主偏弱。")
-        explanation_eng.append(f"Since Resistance Power {resistance} is significantly greater than Support Power {power}, the Day Master is considered Weak.")
-    else:
-        strength = "中和"
-        strength_eng = "Neutral"
-        explanation.append(f"因为 助力 {power} 与 克泄 {resistance} 接近，所以日主中和。")
-        explanation_eng.append(f"Since Support Power {power} and Resistance Power {resistance} are close, the Day Master is considered Neutral.")
 
+def _profile_params(overrides):
+    """
+    方案配置（只写要改的部分）-> 完整参数。position_weights / state_weights 按键覆盖默认值，
+    branch_hidden_stems 按地支整项替换（[[藏干, 权重], ...]），strength_ratio 为身强阈值。
+    配置不合法时抛 ValueError
+    """
+    _mapping(overrides, "profile")
+    unknown = set(overrides) - set(PROFILE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown profile setting(s): {', '.join(sorted(unknown))}")
+
+    params = {}
+    for setting, defaults in (("position_weights", POSITION_WEIGHTS), ("state_weights", STATE_WEIGHTS)):
+        values = dict(defaults)
+        for key, value in _mapping(overrides.get(setting, {}), setting).items():
+            if key not in defaults:
+                raise ValueError(f"Unknown {setting} key {key!r}")
+            values[key] = _number(value, f"{setting}[{key!r}]")
+        params[setting] = values
+
+    hidden = {zhi: tuple(entries) for zhi, entries in BRANCH_HIDDEN_STEMS.items()}
+    for zhi, entries in _mapping(overrides.get("branch_hidden_stems", {}), "branch_hidden_stems").items():
+        if zhi not in hidden:
+            raise ValueError(f"Unknown branch {zhi!r} in branch_hidden_stems")
+        if not isinstance(entries, (list, tuple)) or not entries:
+            raise ValueError(f"branch_hidden_stems[{zhi!r}] must be a non-empty list")
+        parsed = []
+        for entry in entries:
+            if not isinstance(entry, (list, tuple)) or len(entry) != 2 or entry[0] not in STEM_TO_ELEMENT:
+                raise ValueError(f"branch_hidden_stems[{zhi!r}] entries must be [stem, weight], got {entry!r}")
+            parsed.append((entry[0], _number(entry[1], f"branch_hidden_stems[{zhi!r}] weight")))
+        hidden[zhi] = tuple(parsed)
+    params["branch_hidden_stems"] = hidden
+
+    ratio = _number(overrides.get("strength_ratio", STRENGTH_RATIO), "strength_ratio")
+    if ratio <= 0:
+        raise ValueError("strength_ratio must be positive")
+    params["strength_ratio"] = ratio
+    return params
+
+
+def _fingerprint(params):
+    # 参数的内容摘要：结果只取决于参数（与方案名无关），缓存按它分区
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+DEFAULT_PARAMS = _profile_params({})
+DEFAULT_FINGERPRINT = _fingerprint(DEFAULT_PARAMS)
+
+
+class ScoringProfile:
+    """
+    编译好的打分方案（只读，可以在线程、请求之间共享）。
+    fingerprint: 参数摘要；namespace: 缓存键里的分区（参数与内置默认相同时为 None，沿用原来的缓存键）
+    """
+    __slots__ = ("name", "params", "fingerprint", "namespace", "strength_ratio",
+                 "pillar_increments", "pillar_strings", "season_states", "hidden_ten_gods")
 
-    result = {"dayElement": dayElement, 
-              "dayElement_eng": dayElement_eng, 
-              "dayElement_state": dayElement_state, 
-              "dayElement_state_eng": dayElement_state_eng, 
-              "strength": strength, 
-              "strength_eng": strength_eng, 
-              "stars_strength": stars_strength, 
-              "strength_explanation": explanation,
-              "strength_explanation_eng": explanation_eng}
+    def __init__(self, name, params, pillar_increments, pillar_strings, season_states, hidden_ten_gods):
+        self.name = name
+        self.params = params
+        self.fingerprint = _fingerprint(params)
+        self.namespace = None if self.fingerprint == DEFAULT_FINGERPRINT else self.fingerprint
+        self.strength_ratio = params["strength_ratio"]
+        self.pillar_increments = pillar_increments
+        self.pillar_strings = pillar_strings
+        self.season_states = season_states
+        self.hidden_ten_gods = hidden_ten_gods
 
-    return result
+    def __repr__(self):
+        return f"ScoringProfile({self.name!r}, {self.fingerprint})"
 
-def get_ten_god(dayMaster, other_gan):
+    def __reduce__(self):
+        # 传给进程池时只带方案名和参数，worker 按指纹取出（或编译）同一套查表，不依赖 worker 自己加载的配置
+        return (_unpickle_profile, (self.name, self.params))
+
+
+def compile_profile(name, overrides=None):
     """
-    Return the ten-god (Chinese) name for 'other_gan' relative to 'dayMaster'.
-    Deterministic based on five-element relation and yin/yang.
-    用来计算十神的一个中间步骤，比对日干和其他天干的关系，根据阴阳和五行生克来决定。
+    方案名 + 配置 -> ScoringProfile（在加载时一次编译好全部查表）；配置不合法时抛 ValueError
     """
-    if dayMaster not in STEM_TO_ELEMENT or other_gan not in STEM_TO_ELEMENT:
-        return None  # invalid stems
+    params = _profile_params(overrides or {})
+    contributions = _build_pillar_contributions(params["position_weights"], params["branch_hidden_stems"])
+    return ScoringProfile(
+        name,
+        params,
+        _build_pillar_increments(contributions),
+        _build_pillar_strings(contributions),
+        _build_season_states(params["state_weights"]),
+        _build_hidden_ten_gods(params["branch_hidden_stems"]),
+    )
 
-    if dayMaster == other_gan:
-        # same exact stem: treat as same-element with same polarity => 比肩
-        # (if you want to mark the day pillar itself, you can return "日主" externally)
-        return "比肩"
 
-    day_elem = STEM_TO_ELEMENT[dayMaster]
-    other_elem = STEM_TO_ELEMENT[other_gan]
-    day_pol = STEM_POLARITY[dayMaster] # 日干阴阳
-    other_pol = STEM_POLARITY[other_gan] # 其他天干阴阳
+DEFAULT_PROFILE = ScoringProfile(
+    DEFAULT_PROFILE_NAME, DEFAULT_PARAMS, PILLAR_INCREMENTS, PILLAR_STRINGS, SEASON_STATES, HIDDEN_TEN_GODS)
 
-# Same element as Day Master
-    if other_elem == day_elem:
-        return "BiJian Star, Friend and Self (比肩)" if other_pol == day_pol else "JieCai Star, Rival (劫财)"
 
-# Day Master generates other element => Output Stars
-    if GENERATE[day_elem] == other_elem:
-        return "ShiShen Star, Artisan (食神)" if other_pol == day_pol else "ShangGuan Star, Performer (伤官)"
+@lru_cache(maxsize=32)
+def _compiled_profile(name, fingerprint, params_json):
+    # 反序列化得到的方案按 (方案名, 指纹) 只编译一次
+    if fingerprint == DEFAULT_FINGERPRINT and name == DEFAULT_PROFILE_NAME:
+        return DEFAULT_PROFILE
+    return compile_profile(name, json.loads(params_json))
 
-# Other element generates Day Master => Resource Stars
-    if GENERATE[other_elem] == day_elem:
-        return "PianYin Star, Unconventional Resource (偏印)" if other_pol == day_pol else "ZhengYin Star, Direct Resource (正印)"
 
-# Other element overcomes Day Master => Authority Stars
-    if OVERCOME[other_elem] == day_elem:
-        return "QiSha Star, Challenger (七杀)" if other_pol == day_pol else "ZhengGuan Star, Authority (正官)"
+def _unpickle_profile(name, params):
+    return _compiled_profile(name, _fingerprint(params), json.dumps(params, sort_keys=True, ensure_ascii=False))
 
-# Day Master overcomes other element => Wealth Stars
-    if OVERCOME[day_elem] == other_elem:
-        return "PianCai Star, Opportunity Wealth (偏财)" if other_pol == day_pol else "ZhengCai Star, Stable Wealth (正财)"
+# 当前生效的方案：(方案名 -> ScoringProfile, 默认方案名)。set_profiles 整体替换这个元组，
+# 读的一方只取一次引用，所以热更新是原子的；已经开始的请求继续用它取到的方案对象
+_profile_state = ({DEFAULT_PROFILE_NAME: DEFAULT_PROFILE}, DEFAULT_PROFILE_NAME)
 
-    # fallback (should not happen)
-    return None
 
+def get_profile(name=None):
+    """
+    方案名（None 为默认方案）-> ScoringProfile；未知方案抛 ValueError
+    """
+    profiles, default = _profile_state
+    profile = profiles.get(name or default)
+    if profile is None:
+        raise ValueError(f"Unknown profile {name!r}, expected one of {sorted(profiles)}")
+    return profile
 
-def compute_ten_gods(fourPillars, dayMaster, gender=None):
 
-    # 初始化 summary 统计表
-    tg_summary = {tg: 0 for tg in TEN_GODS_TRANSLATION.values()}
+def set_profiles(profiles, default=DEFAULT_PROFILE_NAME):
+    """
+    原子地替换全部方案（{方案名: ScoringProfile}）；default 必须是其中之一
+    """
+    global _profile_state
+    if default not in profiles:
+        raise ValueError(f"Default profile {default!r} is not defined")
+    _profile_state = (dict(profiles), default)
 
-    # 构造表格（两行四列）
-    tg_table = {
-        "年柱 Year Pillar": {"Stem (Top Symbol) 天干": "", "Branch (Bottom Symbol) 地支": ""},
-        "月柱 Month Pillar": {"Stem (Top Symbol) 天干": "", "Branch (Bottom Symbol) 地支": ""},
-        "日柱 Day Pillar": {"Stem (Top Symbol) 天干": "", "Branch (Bottom Symbol) 地支": ""},
-        "时柱 Hour Pillar": {"Stem (Top Symbol) 天干": "", "Branch (Bottom Symbol) 地支": ""},
-    }
 
-    ten_gods = {}
-    for pos, pillar in fourPillars.items():
-        gan, zhi = pillar[0], pillar[1] #天干和地支
+def profiles():
+    """
+    当前的 ({方案名: ScoringProfile}, 默认方案名)
+    """
+    return _profile_state
 
-        if pos == "日柱 Day Pillar":
-            if gender:
-                tg = f"元{gender} Day Master"
-            else:
-                tg = "日主 Day Master"
-        else:
-            tg = get_ten_god(dayMaster, gan)
 
-        # 更新统计（天干默认权重 1.0）
-        if tg in tg_summary:
-            tg_summary[tg] += 1.0
+def pillar_ids(fourPillars):
+    """
+    四柱 dict -> 按 PILLAR_POSITIONS 顺序的六十甲子序号
+    """
+    return tuple(JIAZI_INDEX[fourPillars[pos]] for pos in PILLAR_POSITIONS)
 
-        tg_table[pos]["Stem (Top Symbol) 天干"] = tg  # 天干行
 
-        # 地支藏干十神
-        hidden_list = [] #某一个柱下面的地支藏干列表
-        hidden_strs = [] #只记录十神 拼在一起 放在table的一个格子里
-        for hidden_gan, weight in BRANCH_HIDDEN_STEMS[zhi]: #每个柱有n个地支藏干（1-3个）权重不一
-            hidden_tg = get_ten_god(dayMaster, hidden_gan) #某一个柱下面的地支藏干的十神
-            hidden_list.append({
-                "hidden_gan": hidden_gan,
-                "ten_god": hidden_tg,
-                "weight": weight
-            })
-            hidden_strs.append(f"{hidden_tg}({weight})") 
+class ElementScores:
+    """
+    五行得分（five_elements 的紧凑结果）。raw / adjusted 按 ELEMENTS 顺序；
+    raw 里没得过分的五行保持整数 0，与原来 dict 的初值一致。
+    """
+    __slots__ = ("jiazi", "raw", "adjusted", "month", "profile")
+
+    def __init__(self, jiazi, raw, adjusted, month, profile=DEFAULT_PROFILE):
+        self.jiazi = jiazi
+        self.raw = raw
+        self.adjusted = adjusted
+        self.month = month  # 月支序号
+        self.profile = profile
+
+    def to_dict(self):
+        states, _, states_eng = self.profile.season_states[self.month]
+        strings = [self.profile.pillar_strings[p][j] for p, j in enumerate(self.jiazi)]
+        return {
+            "fiveElementsScore": dict(zip(ELEMENTS, self.raw)),
+            "fiveElementsScore_eng": dict(zip(ELEMENT_LABELS_ENG, self.raw)),
+            "fiveElementsScore_adjusted": dict(zip(ELEMENTS, self.adjusted)),
+            "fiveElementsScore_adjusted_eng": dict(zip(ELEMENT_LABELS_ENG, self.adjusted)),
+            "fiveElementsState": dict(zip(ELEMENTS, states)),
+            "fiveElementsState_eng": dict(zip(ELEMENT_NAMES_ENG, states_eng)),
+            "pillarsElements": [s for s, _ in strings],
+            "pillarsElements_eng": [s for _, s in strings],
+        }
+
+
+class StrengthScores:
+    """
+    日主强弱（judge_strength 的紧凑结果）；stars 按 STAR_NAMES 顺序
+    """
+    __slots__ = ("day_element", "stars", "power", "resistance", "strength")
+
+    def __init__(self, day_element, stars, power, resistance, strength):
+        self.day_element = day_element
+        self.stars = stars
+        self.power = power
+        self.resistance = resistance
+        self.strength = strength
+
+    def stars_strength(self):
+        return dict(zip(STAR_NAMES, self.stars))
+
+    def fields(self, dayElement_state, with_stars=False):
+        """
+        strength 分组的输出字段；with_stars 时与 judge_strength 原来的返回值相同（多一个 stars_strength）
+        """
+        dayElement = ELEMENTS[self.day_element]
+        same_score, helper_score, leak_score, drain_score, enemy_score = self.stars
+        power, resistance, strength = self.power, self.resistance, self.strength
+
+        explanation = []
+        #explanation.append(f"日主五行为 {dayElement}, 状态为 {dayElement_state}")
+        explanation.append(f"比劫 = {same_score}")
+        explanation.append(f"印星 = {helper_score}")
+        explanation.append(f"助力合计 = {same_score} + {helper_score} = {power}")
+        explanation.append(f"食伤 = {leak_score}")
+        explanation.append(f"财星 = {drain_score}")
+        explanation.append(f"官杀 = {enemy_score}")
+        explanation.append(f"克泄合计 = {leak_score} + {drain_score} + {enemy_score} = {resistance}")
+
+        explanation_eng = []
+        explanation_eng.append(f"Stars of Peers (power of allies/competitors) = {same_score}")
+        explanation_eng.append(f"Stars of Resource (power of support/learning) = {helper_score}")
+        explanation_eng.append(f"Stars of Support in Total = {same_score} + {helper_score} = {power}")
+        explanation_eng.append(f"Stars of Output (power of creativity/expression) = {leak_score}")
+        explanation_eng.append(f"Stars of Wealth (power of money/resources) = {drain_score}")
+        explanation_eng.append(f"Stars of Authority (power of discipline/challenges) = {enemy_score}")
+        explanation_eng.append(f"Stars of Resistance in Total = {leak_score} + {drain_score} + {enemy_score} = {resistance}")
+
+        if strength == "身强":
+            strength_eng = "Strong"
+            explanation.append(f"因为 助力 {power} 明显大于 克泄 {resistance}，所以日主偏强。")
+            explanation_eng.append(f"Since Support Power {power} is significantly greater than Resistance Power {resistance}, the Day Master is considered Strong.")
+        elif strength == "身弱":
+            strength_eng = "Weak"
+            explanation.append(f"因为 克泄 {resistance} 明显大于 助力 {power}，所以日主偏弱。")
+            explanation_eng.append(f"Since Resistance Power {resistance} is significantly greater than Support Power {power}, the Day Master is considered Weak.")
+        else:
+            strength_eng = "Neutral"
+            explanation.append(f"因为 助力 {power} 与 克泄 {resistance} 接近，所以日主中和。")
+            explanation_eng.append(f"Since Support Power {power} and Resistance Power {resistance} are close, the Day Master is considered Neutral.")
+
+        result = {"dayElement": dayElement,
+                  "dayElement_eng": ELEMENT_TRANSLATION[dayElement],
+                  "dayElement_state": dayElement_state,
+                  "dayElement_state_eng": STATE_TRANSLATION[dayElement_state],
+                  "strength": strength,
+                  "strength_eng": strength_eng}
+        if with_stars:
+            result["stars_strength"] = self.stars_strength()
+        result["strength_explanation"] = explanation
+        result["strength_explanation_eng"] = explanation_eng
+        return result
+
+    def to_dict(self, dayElement_state):
+        return self.fields(dayElement_state, with_stars=True)
+
+
+class TenGodsScores:
+    """
+    十神（compute_ten_gods 的紧凑结果）。stem_gods: 各柱天干十神（日柱为 None，输出时按性别写日主）；
+    hidden: 各柱 HIDDEN_TEN_GODS 表项（共享，不复制）；summary 按 TEN_GOD_NAMES 顺序
+    """
+    __slots__ = ("jiazi", "stem_gods", "hidden", "summary")
+
+    def __init__(self, jiazi, stem_gods, hidden, summary):
+        self.jiazi = jiazi
+        self.stem_gods = stem_gods
+        self.hidden = hidden
+        self.summary = summary
+
+    def _ten_gods(self, gender):
+        # (tenGods, 各柱天干十神)
+        day_master_label = f"元{gender} Day Master" if gender else "日主 Day Master"
+        stem_gods = [day_master_label if tg is None else tg for tg in self.stem_gods]
+        ten_gods = {}
+        for pos, j, tg, (hidden_entries, _) in zip(PILLAR_POSITIONS, self.jiazi, stem_gods, self.hidden):
+            ten_gods[pos] = {
+                "Stem (Top Symbol) 天干": JIAZI[j][0],
+                "Ten Gods on Top Stem": tg,
+                "Branch (Bottom Symbol) 地支": [
+                    {"hidden_gan": hidden_gan, "ten_god": hidden_tg, "weight": weight}
+                    for hidden_gan, hidden_tg, weight in hidden_entries
+                ],
+            }
+        return ten_gods, stem_gods
+
+    def fields(self, gender=None):
+        """
+        tenGods 分组的输出字段（tenGodsTable 直接生成 table_to_json 的 {"headers", "rows"} 形式）
+        """
+        ten_gods, stem_gods = self._ten_gods(gender)
+        return {
+            "tenGods": ten_gods,
+            "tenGodsTable": {
+                "headers": list(PILLAR_POSITIONS),
+                "rows": {
+                    "Stem (Top Symbol) 天干": stem_gods,
+                    "Branch (Bottom Symbol) 地支": [cell for _, cell in self.hidden],
+                },
+            },
+            "tenGodsSummary": dict(zip(TEN_GOD_NAMES, self.summary)),
+        }
+
+    def to_dict(self, gender=None):
+        """
+        compute_ten_gods 原来的返回值（表格按列存储: 柱 -> 行名 -> 值）
+        """
+        ten_gods, stem_gods = self._ten_gods(gender)
+        tg_table = {
+            pos: {"Stem (Top Symbol) 天干": tg, "Branch (Bottom Symbol) 地支": cell}
+            for pos, tg, (_, cell) in zip(PILLAR_POSITIONS, stem_gods, self.hidden)
+        }
+        return {
+            "tenGods": ten_gods,
+            "tenGodsTable": tg_table,
+            "tenGodsSummary": dict(zip(TEN_GOD_NAMES, self.summary))
+        }
+
+
+@timed("five_elements")
+def score_elements(jiazi, raw=None, adjusted=None, profile=DEFAULT_PROFILE):
+    """
+    五行得分。jiazi: 四柱甲子序号；raw / adjusted（按 ELEMENTS 顺序的列表）可以由
+    批量向量化计算（bazi_batch.score_charts）预先给出，此时跳过逐柱累加和月令调整。
+    profile: 打分方案（柱位权重、藏干、月令修正系数的查表）
+    """
+    month = jiazi[1] % 12  # 月支
+    states, weights, states_eng = profile.season_states[month]
+    if states_eng is None:
+        states_eng = [STATE_TRANSLATION[state] for state in states]  # 与原来一样抛 KeyError
+
+    if raw is None:
+        raw = [0, 0, 0, 0, 0]
+        for p, j in enumerate(jiazi):
+            # 天干 + 天干位置 + 地支藏干 × 地支位置，按原来的顺序逐项累加
+            for elem, inc in profile.pillar_increments[p][j]:
+                raw[elem] += inc
+    if adjusted is None:
+        adjusted = [round(score * weight, 3) for score, weight in zip(raw, weights)]
+    return ElementScores(jiazi, raw, adjusted, month, profile)
+
+
+@timed("judge_strength")
+def score_strength(day_master, adjusted, power=None, resistance=None, ratio=STRENGTH_RATIO):
+    """
+    日主强弱。day_master: 日干序号；adjusted: 按 ELEMENTS 顺序的月令调整后得分；
+    power / resistance 可以由批量向量化计算预先给出（与这里的 round 结果一致）。
+    ratio: 身强阈值（打分方案的 strength_ratio）
+    """
+    day_element = STEM_ELEMENTS[day_master]
+    stars = tuple(adjusted[elem] for elem in ELEMENT_RELATIONS[day_element])
+    if power is None:
+        power = round(stars[0] + stars[1], 3)
+    if resistance is None:
+        resistance = round(stars[2] + stars[3] + stars[4], 3)
+
+    if power > resistance * ratio:
+        strength = "身强"
+    elif resistance > power:
+        strength = "身弱"
+    else:
+        strength = "中和"
+    return StrengthScores(day_element, stars, power, resistance, strength)
 
 
-            # 更新统计
-            if hidden_tg in tg_summary:
-                tg_summary[hidden_tg] += weight
+@timed("compute_ten_gods")
+def score_ten_gods(jiazi, day_master, hidden_table=HIDDEN_TEN_GODS):
+    """
+    十神。day_master: 日干序号；hidden_table: 打分方案的藏干十神表
+    """
+    ten_god_row = TEN_GOD_MATRIX[STEMS[day_master]]
+    hidden_ten_gods = hidden_table[STEMS[day_master]]
+    summary = [0] * len(TEN_GOD_NAMES)
+    stem_gods = []
+    hidden = []
+    for p, j in enumerate(jiazi):
+        gan, zhi = JIAZI[j]
+        if p == DAY_PILLAR:
+            stem_gods.append(None)
+        else:
+            tg = ten_god_row[gan]
+            stem_gods.append(tg)
+            i = TEN_GOD_INDEX.get(tg)  # 与日干相同的天干是中文 "比肩"，不计入统计
+            if i is not None:
+                summary[i] += 1.0
+        entries = hidden_ten_gods[zhi]
+        hidden.append(entries)
+        for _, hidden_tg, weight in entries[0]:
+            i = TEN_GOD_INDEX.get(hidden_tg)
+            if i is not None:
+                summary[i] += weight
+    return TenGodsScores(jiazi, tuple(stem_gods), tuple(hidden), summary)
+
+
+def five_elements(pillars,day_master, elements_score=None, adjusted_score=None):
+    """
+    elements_score / adjusted_score 可以由批量向量化计算预先给出，
+    此时跳过逐柱累加和月令调整，只生成展示字段。
+    """
+    fe = score_elements(
+        pillar_ids(pillars),
+        None if elements_score is None else [elements_score[elem] for elem in ELEMENTS],
+        None if adjusted_score is None else [adjusted_score[elem] for elem in ELEMENTS],
+    )
+    return fe.to_dict()
 
-        ten_gods[pos] = {"Stem (Top Symbol) 天干": gan, "Ten Gods on Top Stem": tg, "Branch (Bottom Symbol) 地支": hidden_list} #举例：年柱的天干和对应的十神 和 地支藏干列表对应的十神
-        tg_table[pos]["Branch (Bottom Symbol) 地支"] = "; ".join(hidden_strs)  # 地支行
 
-    # 转换为 DataFrame 方便展示
-    tg_table_df = pd.DataFrame(tg_table)
+def judge_strength(dayMaster, fiveElementsScore_adjusted, fiveElementsState, power=None, resistance=None):
+    """
+    power / resistance 可以由批量向量化计算预先给出（与这里的 round 结果一致）。
+    """
+    adjusted = [fiveElementsScore_adjusted[elem] for elem in ELEMENTS]
+    strength = score_strength(STEM_INDEX[dayMaster], adjusted, power, resistance)
+    return strength.to_dict(fiveElementsState[STEM_TO_ELEMENT[dayMaster]])
 
 
-    # 保存统计结果
-    result = {
-        "tenGods": ten_gods,
-        "tenGodsTable": tg_table_df,
-        "tenGodsSummary": tg_summary
-    }
+def get_ten_god(dayMaster, other_gan):
+    """
+    Return the ten-god (Chinese) name for 'other_gan' relative to 'dayMaster'.
+    查表版本：结果来自 TEN_GOD_MATRIX（由 _ten_god_by_rule 在模块加载时生成）。
+    """
+    row = TEN_GOD_MATRIX.get(dayMaster)
+    if row is None:
+        return None  # invalid stems
+    return row.get(other_gan)
 
-    return result
 
+def compute_ten_gods(fourPillars, dayMaster, gender=None):
+    # 表格按列存储: 柱 -> 行名 -> 值，需要 DataFrame 时用 table_to_dataframe
+    return score_ten_gods(pillar_ids(fourPillars), STEM_INDEX[dayMaster]).to_dict(gender)
+
+
+@timed("suggest_five_elem")
 def suggest_five_elem(dayMaster, strength, stars_strength, fiveElementsScore_adjusted):
     """
     纯五行角度的喜用神推荐
@@ -644,90 +1122,31 @@ def elem_to_stem(elem):
     把五行元素映射到对应的天干（阳+阴）。
     返回一个 list，例如 木 -> ["甲", "乙"]
     """
-    return [gan for gan, e in STEM_TO_ELEMENT.items() if e == elem]
+    return list(ELEMENT_STEMS.get(elem, ()))
 
 
+@timed("ten_god_advice")
 def ten_god_advice(dayMaster, favored_elems, unfavored_elems):
     """
     把五行喜忌翻译成十神喜忌 + 人事建议
     支持一个五行对应多个十神（阴阳干）
     """
 
-    favorable_map = {
-        "比肩": "代表自我、兄弟、伙伴。喜比肩时，多合作、结交志同道合的人，可以增强自信和行动力",
-        "劫财": "代表朋友、同伴、竞争。喜劫财时，朋友能带来帮助和资源共享",
-        "正印": "代表学习、贵人、保护。喜正印时，应多学习、提升学识，并依靠贵人支持",
-        "偏印": "代表灵感、创造、直觉。喜偏印时，有助于发展创造力、灵性与直觉",
-        "食神": "代表才华、子女、表达。喜食神时，应多发挥才华，注重表达与分享",
-        "伤官": "代表创造力、叛逆、表现。喜伤官时，可以勇于创新与表达自我",
-        "正财": "代表财富、责任、配偶。喜正财时，宜脚踏实地、注重理财和责任",
-        "偏财": "代表机会、变通、人脉。喜偏财时，应抓住机会、灵活变通，注重人脉关系",
-        "正官": "代表事业、责任、纪律。喜正官时，守纪律、重责任，有助于事业发展",
-        "七杀": "代表挑战、竞争、魄力。喜七杀时，敢于挑战、果断有魄力，有助于开拓事业"
-    }
-
-    unfavorable_map = {
-        "比肩": "忌比肩时，容易固执，与人对抗，需避免争强好胜",
-        "劫财": "忌劫财时，易生竞争与冲突，需要学会分享与设立界限",
-        "正印": "忌正印时，过于依赖他人，缺乏独立，需保持自主",
-        "偏印": "忌偏印时，容易不切实际或精神不安定，应脚踏实地",
-        "食神": "忌食神时，易懒散、贪图享乐，应自律",
-        "伤官": "忌伤官时，易冲动叛逆，与权威对抗，需控制情绪",
-        "正财": "忌正财时，可能过于物质或劳累，应适度理财并平衡生活",
-        "偏财": "忌偏财时，易投机取巧、感情不稳，应谨慎理财与感情",
-        "正官": "忌正官时，容易受束缚或压力过大，应学会调适与放松",
-        "七杀": "忌七杀时，过度压力或冲动冒险，需谨慎行事"
-    }
-
-    favorable_map_eng = {
-    "BiJian Star, Friend and Self (比肩)": "Represents self, siblings, and partners. When favorable, BiJian encourages cooperation and connecting with like-minded people, boosting confidence and initiative.",
-    "JieCai Star, Rival (劫财)": "Represents friends, companions, and competition. When favorable, JieCai means friends can bring help and share resources.",
-    "ZhengYin Star, Direct Resource (正印)": "Represents learning, mentors, and protection. When favorable, ZhengYin suggests focusing on study, knowledge growth, and support from benefactors.",
-    "PianYin Star, Unconventional Resource (偏印)": "Represents inspiration, creativity, and intuition. When favorable, PianYin enhances imagination, spirituality, and intuitive insight.",
-    "ShiShen Star, Artisan (食神)": "Represents talent, children, and expression. When favorable, ShiShen encourages showcasing talents and sharing with others.",
-    "ShangGuan Star, Performer (伤官)": "Represents creativity, rebellion, and performance. When favorable, ShangGuan brings courage to innovate and express oneself boldly.",
-    "ZhengCai Star, Stable Wealth (正财)": "Represents wealth, responsibility, and spouse. When favorable, ZhengCai emphasizes diligence, financial management, and responsibility.",
-    "PianCai Star, Opportunity Wealth (偏财)": "Represents opportunity, adaptability, and connections. When favorable, PianCai encourages seizing opportunities, flexibility, and building networks.",
-    "ZhengGuan Star, Authority (正官)": "Represents career, responsibility, and discipline. When favorable, ZhengGuan supports following rules, taking responsibility, and career advancement.",
-    "QiSha Star, Challenger (七杀)": "Represents challenges, competition, and drive. When favorable, QiSha brings courage, decisiveness, and the power to pioneer new paths."
-    }
-
-    unfavorable_map_eng = {
-    "BiJian Star, Friend and Self (比肩)": "When unfavorable, BiJian may cause stubbornness and conflict with others; avoid being overly competitive.",
-    "JieCai Star, Rival (劫财)": "When unfavorable, JieCai can bring rivalry and conflict; learn to share and set healthy boundaries.",
-    "ZhengYin Star, Direct Resource (正印)": "When unfavorable, ZhengYin may cause over-reliance on others and lack of independence; maintain autonomy.",
-    "PianYin Star, Unconventional Resource (偏印)": "When unfavorable, PianYin may lead to unrealistic thinking or mental instability; stay grounded.",
-    "ShiShen Star, Artisan (食神)": "When unfavorable, ShiShen may cause laziness and indulgence in pleasure; practice self-discipline.",
-    "ShangGuan Star, Performer (伤官)": "When unfavorable, ShangGuan may cause impulsiveness, rebellion, and conflict with authority; control emotions.",
-    "ZhengCai Star, Stable Wealth (正财)": "When unfavorable, ZhengCai may lead to materialism or overwork; manage finances wisely and seek balance.",
-    "PianCai Star, Opportunity Wealth (偏财)": "When unfavorable, PianCai may cause opportunism and unstable relationships; be cautious in money and love matters.",
-    "ZhengGuan Star, Authority (正官)": "When unfavorable, ZhengGuan may bring restrictions or excessive pressure; learn to adjust and relax.",
-    "QiSha Star, Challenger (七杀)": "When unfavorable, QiSha may cause excessive stress or reckless risk-taking; act with caution."
-    }
-
-
-
     advice = []
     advice_eng = []
-    
+    advice_lines = ADVICE_LINES[dayMaster]
 
     # 喜神部分
     for elem in favored_elems:
-        for gan in elem_to_stem(elem):
-            tg = get_ten_god(dayMaster, gan)
-            if tg and tg in favorable_map_eng:
-                reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
-                advice.append(f"喜{reverse_key}：{favorable_map[reverse_key]}")
-                advice_eng.append(f"Favorable {tg}: {favorable_map_eng[tg]}")
+        for line, line_eng in advice_lines[elem][0]:
+            advice.append(line)
+            advice_eng.append(line_eng)
 
     # 忌神部分
     for elem in unfavored_elems:
-        for gan in elem_to_stem(elem):
-            tg = get_ten_god(dayMaster, gan)
-            if tg and tg in unfavorable_map_eng:
-                reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
-                advice.append(f"忌{reverse_key}：{unfavorable_map[reverse_key]}")
-                advice_eng.append(f"Unfavorable {tg}: {unfavorable_map_eng[tg]}")
+        for line, line_eng in advice_lines[elem][1]:
+            advice.append(line)
+            advice_eng.append(line_eng)
 
     result = {
         "advice":advice, 
@@ -740,7 +1159,40 @@ def ten_god_advice(dayMaster, favored_elems, unfavored_elems):
 
 
 
-def dataframe_to_json(df: pd.DataFrame):
+@timed("table_to_json")
+def table_to_json(table):
+    """
+    把按列存储的表格（柱 -> 行名 -> 值）转成 {"headers", "rows"}，
+    输出与 dataframe_to_json(pd.DataFrame(table)) 相同。
+    """
+    # headers = column names
+    headers = list(table)
+
+    # extract rows: each row label (like 天干/地支) -> list of values
+    rows = {}
+    if headers:
+        for idx in table[headers[0]]:
+            rows[idx] = [table[col][idx] for col in headers]
+
+    return {
+        "headers": headers,
+        "rows": rows
+    }
+
+
+def table_to_dataframe(table):
+    """
+    可选导出: 把十神表格转成 pandas DataFrame（需要安装 pandas）。
+    pandas is imported lazily so it stays off the request hot path.
+    """
+    try:
+        import pandas as pd
+    except ImportError as exc:
+        raise ImportError("table_to_dataframe requires pandas: pip install pandas") from exc
+    return pd.DataFrame(table)
+
+
+def dataframe_to_json(df):
     # headers = column names
     headers = df.columns.tolist()
     
@@ -753,36 +1205,341 @@ def dataframe_to_json(df: pd.DataFrame):
         "headers": headers,
         "rows": rows
     }
-def generate_summary(data):
+
+
+class LRUCache:
     """
-    生成八字综合分析的自然语言段落
-    输入: data (包含出生信息)
-    输出: 段落总结 (str) + 打印十神分布表
+    线程安全的 LRU 缓存，带命中/未命中计数。
+    Bounded in-process cache with least-recently-used eviction.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # 淘汰最久未使用的命盘
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# 命盘缓存（惰性 Chart）：五行、强弱、十神、喜忌、建议只取决于四柱 + 性别
+# BAZI_CACHE_SIZE=0 disables caching
+SUMMARY_CACHE = LRUCache(int(os.environ.get("BAZI_CACHE_SIZE", "10000")))
+
+
+def chart_key(fourPillars, gender, profile=None):
+    """
+    缓存键：(年柱, 月柱, 日柱, 时柱), 性别；非默认参数的打分方案再加上参数摘要（各方案的缓存互不干扰）
     """
+    if profile is None or profile.namespace is None:
+        return (tuple(fourPillars.values()), gender)
+    return (tuple(fourPillars.values()), gender, profile.namespace)
+
+
+# 可选输出字段：按分析步骤分组（fields 可以写组名，也可以写单个字段名）
+FIELD_GROUPS = {
+    "fiveElements": (
+        "fiveElementsScore", "fiveElementsScore_eng",
+        "fiveElementsScore_adjusted", "fiveElementsScore_adjusted_eng",
+        "fiveElementsState", "fiveElementsState_eng",
+        "pillarsElements", "pillarsElements_eng",
+    ),
+    "strength": (
+        "dayElement", "dayElement_eng",
+        "dayElement_state", "dayElement_state_eng",
+        "strength", "strength_eng",
+        "strength_explanation", "strength_explanation_eng",
+    ),
+    "tenGods": ("tenGods", "tenGodsTable", "tenGodsSummary"),
+    "elementSuggestion": (
+        "favored_elements", "favored_elements_eng",
+        "unfavored_elements", "unfavored_elements_eng",
+        "element_suggestion", "element_suggestion_eng",
+    ),
+    "advice": ("tenGods_advice", "tenGods_advice_eng"),
+}
+# 每个分析步骤直接依赖的步骤（Chart 按需递归计算）: 强弱要五行得分，喜用神要五行和强弱，十神建议要喜用神
+STAGE_DEPENDENCIES = {
+    "fiveElements": (),
+    "strength": ("fiveElements",),
+    "tenGods": (),
+    "elementSuggestion": ("fiveElements", "strength"),
+    "advice": ("elementSuggestion",),
+}
+RESULT_KEYS = ("bazi",) + tuple(key for keys in FIELD_GROUPS.values() for key in keys)
+FIELD_TO_GROUP = {key: group for group, keys in FIELD_GROUPS.items() for key in keys}
+LANGS = ("zh", "en", "both")
+
 
+def resolve_fields(fields=None, lang=None):
+    """
+    请求里的 fields / lang -> 输出字段（保持 generate_summary 的原有顺序，"bazi" 总是包含）
+    fields 为空表示全部字段；lang: "zh" 只要中文字段，"en" 有英文版的字段只要 *_eng，"both"（默认）都要。
+    组名优先于同名字段（"strength"、"tenGods" 指整组）。未知的字段名或语言抛 ValueError。
+    """
+    return _resolve_fields(tuple(fields or ()), lang or "both")
 
-    # Step 1: 计算八字、五行、十神
-    bazi = calc_bazi(data)
-    fe = five_elements(bazi["fourPillars"], bazi["dayMaster"])
-    strength = judge_strength(
-        bazi["dayMaster"],
-        fe["fiveElementsScore_adjusted"],
-        fe["fiveElementsState"]
+
+@lru_cache(maxsize=256)
+def _resolve_fields(fields, lang):
+    if lang not in LANGS:
+        raise ValueError(f"Unknown lang {lang!r}, expected one of {LANGS}")
+
+    if not fields:
+        wanted = set(RESULT_KEYS)
+    else:
+        wanted = {"bazi"}
+        for field in fields:
+            if field in FIELD_GROUPS:
+                wanted.update(FIELD_GROUPS[field])
+            elif field in FIELD_TO_GROUP or field == "bazi":
+                wanted.add(field)
+                wanted.add(field + "_eng" if field + "_eng" in FIELD_TO_GROUP else field)
+            else:
+                raise ValueError(f"Unknown field {field!r}")
+
+    if lang == "zh":
+        wanted = {key for key in wanted if not key.endswith("_eng")}
+    elif lang == "en":
+        wanted = {key for key in wanted if key + "_eng" not in FIELD_TO_GROUP}
+
+    return tuple(key for key in RESULT_KEYS if key in wanted)
+
+
+# 各分析步骤: (chart, *依赖步骤的结果) -> 该步骤的输出（五行、强弱、十神是紧凑对象）
+def _stage_five_elements(chart):
+    return score_elements(
+        chart.jiazi,
+        chart.scores.get("elements_score"),
+        chart.scores.get("adjusted_score"),
+        chart.profile
+    )
+
+
+def _stage_strength(chart, fe):
+    return score_strength(
+        chart.day_master,
+        fe.adjusted,
+        chart.scores.get("power"),
+        chart.scores.get("resistance"),
+        chart.profile.strength_ratio
     )
-    ten_gods = compute_ten_gods(bazi["fourPillars"], bazi["dayMaster"], data["gender"])
-    element_suggestion = suggest_five_elem(
-        bazi["dayMaster"],
-        strength["strength"],
-        strength["stars_strength"],
-        fe["fiveElementsScore_adjusted"]
+
+
+def _stage_ten_gods(chart):
+    return score_ten_gods(chart.jiazi, chart.day_master, chart.profile.hidden_ten_gods)
+
+
+def _stage_element_suggestion(chart, fe, strength):
+    return suggest_five_elem(
+        chart.dayMaster,
+        strength.strength,
+        strength.stars_strength(),
+        dict(zip(ELEMENTS, fe.adjusted))
     )
-    
-    advice = ten_god_advice(
-        bazi["dayMaster"],
+
+
+def _stage_advice(chart, element_suggestion):
+    return ten_god_advice(
+        chart.dayMaster,
         element_suggestion["favored"],
         element_suggestion["unfavored"]
     )
 
+
+STAGES = {
+    "fiveElements": _stage_five_elements,
+    "strength": _stage_strength,
+    "tenGods": _stage_ten_gods,
+    "elementSuggestion": _stage_element_suggestion,
+    "advice": _stage_advice,
+}
+
+
+# 各分组的输出字段: (chart, 步骤输出) -> {输出字段: 值}，只在输出时生成
+def _fields_five_elements(chart, fe):
+    return fe.to_dict()
+
+
+def _fields_strength(chart, strength):
+    states = chart.profile.season_states[chart.stage("fiveElements").month][0]
+    return strength.fields(states[strength.day_element])
+
+
+def _fields_ten_gods(chart, ten_gods):
+    return ten_gods.fields(chart.gender)
+
+
+def _fields_element_suggestion(chart, element_suggestion):
+    return {
+        "favored_elements": element_suggestion["favored"],
+        "favored_elements_eng": element_suggestion["favored_eng"],
+        "unfavored_elements": element_suggestion["unfavored"],
+        "unfavored_elements_eng": element_suggestion["unfavored_eng"],
+        "element_suggestion": element_suggestion["suggestion"],
+        "element_suggestion_eng": element_suggestion["suggestion_eng"],
+    }
+
+
+def _fields_advice(chart, advice):
+    return {
+        "tenGods_advice": advice["advice"],
+        "tenGods_advice_eng": advice["advice_eng"]
+    }
+
+
+GROUP_FIELDS = {
+    "fiveElements": _fields_five_elements,
+    "strength": _fields_strength,
+    "tenGods": _fields_ten_gods,
+    "elementSuggestion": _fields_element_suggestion,
+    "advice": _fields_advice,
+}
+
+
+class Chart:
+    """
+    惰性命盘：各分析步骤（五行、强弱、十神、喜用神、十神建议）第一次用到时才计算并记住，
+    依赖的步骤按 STAGE_DEPENDENCIES 自动先算。比如只要 favored_elements 时
+    只会算五行、强弱和喜用神，不会算十神和十神建议。
+    结果只取决于四柱和性别，整个 Chart 可以按命盘缓存；已算过的步骤之后的请求直接复用。
+    内部只记四柱的甲子序号和各步骤的紧凑结果，输出字段在 result / group 时才生成，缓存里的命盘占用小。
+    scores: 可选的预计算得分 {"elements_score", "adjusted_score", "power", "resistance"}，
+    得分为按 ELEMENTS 顺序的列表（批量接口使用），须按同一 profile 算出
+    profile: 打分方案（ScoringProfile，默认 DEFAULT_PROFILE）；不同方案的命盘按 chart_key 分开缓存
+    """
+    __slots__ = ("jiazi", "day_master", "gender", "scores", "profile", "_stages")
+
+    def __init__(self, fourPillars, dayMaster, gender, scores=None, profile=None):
+        self.jiazi = pillar_ids(fourPillars)
+        self.day_master = STEM_INDEX[dayMaster]
+        self.gender = gender
+        self.scores = scores or {}
+        self.profile = profile or DEFAULT_PROFILE
+        self._stages = {}  # 步骤名 -> 输出
+
+    @property
+    def fourPillars(self):
+        return dict(zip(PILLAR_POSITIONS, (JIAZI[j] for j in self.jiazi)))
+
+    @property
+    def dayMaster(self):
+        return STEMS[self.day_master]
+
+    def stage(self, name):
+        """
+        某个步骤的输出（如 "strength" -> score_strength 的 StrengthScores）
+        """
+        value = self._stages.get(name)
+        if value is None:
+            deps = [self.stage(dep) for dep in STAGE_DEPENDENCIES[name]]
+            value = self._stages[name] = STAGES[name](self, *deps)
+        return value
+
+    def group(self, name):
+        """
+        某个分组的全部输出字段（每次新生成）
+        """
+        return GROUP_FIELDS[name](self, self.stage(name))
+
+    def __getitem__(self, key):
+        if key == "bazi":
+            return self.fourPillars
+        return self.group(FIELD_TO_GROUP[key])[key]
+
+    def computed(self):
+        """
+        已经算过的步骤
+        """
+        return tuple(name for name in STAGES if name in self._stages)
+
+    def result(self, keys=RESULT_KEYS):
+        """
+        按字段顺序组装结果；keys 见 resolve_fields，默认全部字段（与 generate_summary 原来的输出相同）。
+        每个分组只生成一次。
+        """
+        result = {}
+        groups = {}
+        for key in keys:
+            if key == "bazi":
+                result[key] = self.fourPillars
+                continue
+            name = FIELD_TO_GROUP[key]
+            fields = groups.get(name)
+            if fields is None:
+                fields = groups[name] = self.group(name)
+            result[key] = fields[key]
+        return result
+
+
+@timed("analyze_chart")
+def analyze_chart(fourPillars, dayMaster, gender, scores=None, keys=RESULT_KEYS, profile=None):
+    """
+    calc_bazi 之后的全部分析步骤（五行、强弱、十神、喜用神、十神建议），不含 "bazi"。
+    等价于 Chart(...).result(keys)，立即计算所需步骤。
+    """
+    chart = Chart(fourPillars, dayMaster, gender, scores, profile)
+    return chart.result(tuple(key for key in keys if key != "bazi"))
+
+
+@timed("generate_summary")
+def generate_summary(data, bazi=None, profile=None):
+    """
+    生成八字综合分析的自然语言段落
+    输入: data (包含出生信息，可选 fields / lang 只返回部分字段，可选 profile 指定打分方案)；
+         bazi 可传入已算好的 calc_bazi 结果；profile 可传入调用方已取到的 ScoringProfile
+    输出: 段落总结 (str) + 打印十神分布表
+    注意: 返回结果中的嵌套对象与缓存共享，调用方不要修改。
+    """
+    fields, lang = data.get("fields"), data.get("lang")
+    keys = resolve_fields(fields, lang) if fields or lang else RESULT_KEYS
+    profile = profile or get_profile(data.get("profile"))
+
+    # Step 1: 排盘，取出（或新建）该命盘的惰性 Chart；同一命盘、同一方案的各步骤只计算一次
+    bazi = bazi or calc_bazi(data)
+    key = chart_key(bazi["fourPillars"], data["gender"], profile)
+    chart = SUMMARY_CACHE.get(key)
+    if chart is None:
+        chart = Chart(bazi["fourPillars"], bazi["dayMaster"], data["gender"], profile=profile)
+        SUMMARY_CACHE.put(key, chart)
+
     # Step 2: 组装自然语言段落 可以考虑AI引擎
     """ 
     你是一位专业八字命理分析师。请根据以下输入，生成一份约200字的八字综合分析总结，
@@ -809,44 +1566,29 @@ def generate_summary(data):
 
 
 
-    # 出生与八字结构
-    result = {
-        "bazi": bazi["fourPillars"],
-        #"bazi_info": bazi['bazi_explanation'],
-        "fiveElementsScore": fe["fiveElementsScore"], 
-        "fiveElementsScore_eng": fe["fiveElementsScore_eng"],
-        "fiveElementsScore_adjusted": fe["fiveElementsScore_adjusted"],
-        "fiveElementsScore_adjusted_eng": fe["fiveElementsScore_adjusted_eng"],
-        "fiveElementsState": fe["fiveElementsState"],
-        "fiveElementsState_eng": fe["fiveElementsState_eng"],
-        "pillarsElements": fe["pillarsElements"],
-        "pillarsElements_eng": fe["pillarsElements_eng"],
-
-        "dayElement": strength["dayElement"],
-        "dayElement_eng": strength["dayElement_eng"],
-        "dayElement_state":strength["dayElement_state"],
-        "dayElement_state_eng": strength["dayElement_state_eng"],
-        "strength" : strength['strength'], 
-        "strength_eng": strength["strength_eng"],
-        "strength_explanation": strength["strength_explanation"],
-        "strength_explanation_eng": strength["strength_explanation_eng"],
-
-        "tenGods": ten_gods["tenGods"],
-        "tenGodsTable": dataframe_to_json(ten_gods["tenGodsTable"]),
-        "tenGodsSummary": ten_gods["tenGodsSummary"],
-
-        "favored_elements": element_suggestion["favored"], 
-        "favored_elements_eng": element_suggestion["favored_eng"], 
-        "unfavored_elements": element_suggestion["unfavored"], 
-        "unfavored_elements_eng": element_suggestion["unfavored_eng"], 
-        "element_suggestion": element_suggestion["suggestion"], 
-        "element_suggestion_eng": element_suggestion["suggestion_eng"], 
-
-        "tenGods_advice": advice["advice"],
-        "tenGods_advice_eng": advice["advice_eng"]
-    }
+    # 出生与八字结构 + 所需字段（只计算这些字段依赖的步骤）
+    return chart.result(keys)
 
-    return result
 
+# 预热用的样例（覆盖不同年份和时区，确保 lunar_python 的年份缓存和 pytz 时区都已加载；
+# 1850 年超出干支历查表范围，走 lunar_python 回退）
+WARM_UP_SAMPLES = (
+    {"birth": "1990-05-17", "time": "08:30", "tz": "Asia/Shanghai", "gender": "男"},
+    {"birth": "2001-11-02", "time": "23:15", "tz": "America/New_York", "gender": "女"},
+    {"birth": "1850-03-01", "time": "12:00", "tz": "Asia/Shanghai", "gender": "男"},
+)
 
 
+def warm_up(samples=WARM_UP_SAMPLES):
+    """
+    预热当前进程：导入依赖、加载查表，并跑几次 generate_summary。
+    用于进程池 worker 的 initializer，返回成功跑完的样例数。
+    """
+    done = 0
+    for data in samples:
+        try:
+            generate_summary(data)
+        except Exception:
+            continue  # 预热失败不影响服务，真正的请求会再报错
+        done += 1
+    return done
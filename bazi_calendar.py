@@ -0,0 +1,280 @@
+"""
+快速干支历：由北京时间直接得到年、月、日、时四柱，不再为每个请求构造 lunar_python 的 Solar/Lunar 对象。
+
+与 lunar_python 的 getYearInGanZhi / getMonthInGanZhi / getDayInGanZhi / getTimeInGanZhi 结果一致:
+- 年柱: 以农历正月初一所在日期为界，查预计算表
+- 月柱: 以节（小寒、立春、惊蛰……大雪）所在日期为界，查预计算表
+- 日柱: 日序数取模 60
+- 时柱: 23:00–00:59 为子时，天干按五鼠遁；23 点以后用次日的日干起时干
+
+预计算表（bazi_calendar_data.py）覆盖 1900–2100 年，范围外返回 None，由调用方回退到 lunar_python。
+iter_pillar_indices 按日期区间逐日 / 逐时辰递推四柱（日柱逐日加一，年柱、月柱到换柱日期加一）。
+
+    python bazi_calendar.py build     # 用 lunar_python 重新生成 bazi_calendar_data.py
+    python bazi_calendar.py verify    # 逐小时与 lunar_python 对比
+"""
+import argparse
+import os
+import sys
+from bisect import bisect_right
+from datetime import date, timedelta
+
+STEMS = "甲乙丙丁戊己庚辛壬癸"
+BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+
+# 六十甲子：甲子、乙丑 …… 癸亥
+JIAZI = tuple(STEMS[i % 10] + BRANCHES[i % 12] for i in range(60))
+JIAZI_INDEX = {gz: i for i, gz in enumerate(JIAZI)}
+
+TABLE_FIRST_YEAR = 1900
+TABLE_LAST_YEAR = 2100
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bazi_calendar_data.py")
+
+try:
+    from bazi_calendar_data import (
+        DAY_OFFSET,
+        FIRST_ORDINAL,
+        LAST_ORDINAL,
+        MONTH_START_INDEX,
+        MONTH_START_ORDINALS,
+        YEAR_START_INDEX,
+        YEAR_START_ORDINALS,
+    )
+except ImportError:  # 还没有生成数据表（build 命令自身需要这样启动）
+    FIRST_ORDINAL = LAST_ORDINAL = None
+
+
+def jiazi_of(gan_index, zhi_index):
+    """
+    天干序号 + 地支序号 -> 六十甲子序号（两者奇偶必须相同）
+    """
+    return (6 * gan_index - 5 * zhi_index) % 60
+
+
+def in_range(year, month, day):
+    """
+    该日期是否在预计算表覆盖范围内
+    """
+    if FIRST_ORDINAL is None:
+        return False
+    ordinal = date(year, month, day).toordinal()
+    return FIRST_ORDINAL <= ordinal <= LAST_ORDINAL
+
+
+def year_index(ordinal):
+    return (YEAR_START_INDEX + bisect_right(YEAR_START_ORDINALS, ordinal) - 1) % 60
+
+
+def month_index(ordinal):
+    return (MONTH_START_INDEX + bisect_right(MONTH_START_ORDINALS, ordinal) - 1) % 60
+
+
+def day_index(ordinal):
+    return (ordinal + DAY_OFFSET) % 60
+
+
+def hour_zhi_index(hour):
+    # 23:00–00:59 子，01:00–02:59 丑 …… 21:00–22:59 亥
+    return (hour + 1) // 2 % 12
+
+
+def hour_index(day_idx, hour):
+    """
+    时柱甲子序号：五鼠遁，23 点（晚子时）用次日日干起时干
+    """
+    day_gan = day_idx % 10
+    if hour == 23:
+        day_gan = (day_gan + 1) % 10
+    zhi = hour_zhi_index(hour)
+    return jiazi_of((day_gan % 5 * 2 + zhi) % 10, zhi)
+
+
+def pillar_indices(year, month, day, hour):
+    """
+    北京时间 -> (年, 月, 日, 时) 六十甲子序号；超出预计算范围返回 None
+    """
+    if FIRST_ORDINAL is None:
+        return None
+    ordinal = date(year, month, day).toordinal()
+    if not FIRST_ORDINAL <= ordinal <= LAST_ORDINAL:
+        return None
+    day_idx = day_index(ordinal)
+    return (year_index(ordinal), month_index(ordinal), day_idx, hour_index(day_idx, hour))
+
+
+# 逐时辰扫描用的整点：00 点（早子时）、01、03 …… 21 点各时辰的起点，23 点（晚子时，时干按次日）
+SHICHEN_HOURS = (0,) + tuple(range(1, 24, 2))
+
+
+def iter_pillar_indices(first, last, hours=None):
+    """
+    北京时间日期区间 first..last（含两端）-> 逐日（给出 hours 时逐个整点）的
+    (date, hour, (年, 月, 日, 时) 甲子序号)，与逐个调用 pillar_indices 的结果相同。
+    只在开头查一次表，之后日柱逐日加一、年柱和月柱走到下一个换柱日期时加一。
+    hours 为空时 hour 和时柱为 None。超出预计算范围抛 ValueError。
+    """
+    if FIRST_ORDINAL is None:
+        raise ValueError("GanZhi calendar table is not built")
+    start, end = first.toordinal(), last.toordinal()
+    if not (FIRST_ORDINAL <= start and end <= LAST_ORDINAL):
+        raise ValueError(f"Date range must be within {TABLE_FIRST_YEAR}-01-01..{TABLE_LAST_YEAR}-12-31")
+
+    y_pos = bisect_right(YEAR_START_ORDINALS, start) - 1
+    m_pos = bisect_right(MONTH_START_ORDINALS, start) - 1
+    y_idx = (YEAR_START_INDEX + y_pos) % 60
+    m_idx = (MONTH_START_INDEX + m_pos) % 60
+    next_year = YEAR_START_ORDINALS[y_pos + 1] if y_pos + 1 < len(YEAR_START_ORDINALS) else None
+    next_month = MONTH_START_ORDINALS[m_pos + 1] if m_pos + 1 < len(MONTH_START_ORDINALS) else None
+    d_idx = day_index(start)
+    day = first
+    for ordinal in range(start, end + 1):
+        if ordinal == next_year:
+            y_pos += 1
+            y_idx = (y_idx + 1) % 60
+            next_year = YEAR_START_ORDINALS[y_pos + 1] if y_pos + 1 < len(YEAR_START_ORDINALS) else None
+        if ordinal == next_month:
+            m_pos += 1
+            m_idx = (m_idx + 1) % 60
+            next_month = MONTH_START_ORDINALS[m_pos + 1] if m_pos + 1 < len(MONTH_START_ORDINALS) else None
+        if hours:
+            for hour in hours:
+                yield day, hour, (y_idx, m_idx, d_idx, hour_index(d_idx, hour))
+        else:
+            yield day, None, (y_idx, m_idx, d_idx, None)
+        d_idx = (d_idx + 1) % 60
+        day += timedelta(days=1)
+
+
+def four_pillars(year, month, day, hour):
+    """
+    北京时间 -> (年柱, 月柱, 日柱, 时柱) 干支字符串；超出预计算范围返回 None
+    """
+    indices = pillar_indices(year, month, day, hour)
+    if indices is None:
+        return None
+    return tuple(JIAZI[i] for i in indices)
+
+
+def _lunar_pillars(year, month, day, hour, minute=0):
+    from lunar_python import Solar
+
+    lunar = Solar.fromYmdHms(year, month, day, hour, minute, 0).getLunar()
+    return (
+        lunar.getYearInGanZhi(),
+        lunar.getMonthInGanZhi(),
+        lunar.getDayInGanZhi(),
+        lunar.getTimeInGanZhi(),
+    )
+
+
+def _format_tuple(values, per_line=10):
+    lines = []
+    for i in range(0, len(values), per_line):
+        lines.append("    " + ", ".join(str(v) for v in values[i:i + per_line]) + ",")
+    return "(\n" + "\n".join(lines) + "\n)"
+
+
+def build(path=DATA_FILE):
+    """
+    用 lunar_python 逐日（中午 12 点）计算年柱和月柱，记录每次换柱的日期，生成 bazi_calendar_data.py
+    """
+    first = date(TABLE_FIRST_YEAR, 1, 1)
+    last = date(TABLE_LAST_YEAR, 12, 31)
+
+    year_starts, month_starts = [], []
+    first_year_idx = first_month_idx = day_offset = None
+    prev_year = prev_month = None
+    d = first
+    while d <= last:
+        y, m, dd, _ = _lunar_pillars(d.year, d.month, d.day, 12)
+        y_idx, m_idx, d_idx = JIAZI_INDEX[y], JIAZI_INDEX[m], JIAZI_INDEX[dd]
+        if day_offset is None:
+            day_offset = (d_idx - d.toordinal()) % 60
+        if (d.toordinal() + day_offset) % 60 != d_idx:
+            raise RuntimeError(f"day pillar is not a 60-day cycle at {d}")
+        if y_idx != prev_year:
+            if prev_year is None:
+                first_year_idx = y_idx
+            elif y_idx != (prev_year + 1) % 60:
+                raise RuntimeError(f"year pillar jumped from {JIAZI[prev_year]} to {y} at {d}")
+            year_starts.append(d.toordinal())
+            prev_year = y_idx
+        if m_idx != prev_month:
+            if prev_month is None:
+                first_month_idx = m_idx
+            elif m_idx != (prev_month + 1) % 60:
+                raise RuntimeError(f"month pillar jumped from {JIAZI[prev_month]} to {m} at {d}")
+            month_starts.append(d.toordinal())
+            prev_month = m_idx
+        d += timedelta(days=1)
+
+    content = f'''"""
+干支历预计算表，由 `python bazi_calendar.py build` 根据 lunar_python 生成，请勿手动修改。
+日期均为 date.toordinal()（北京时间）。覆盖 {first} 至 {last}。
+"""
+
+FIRST_ORDINAL = {first.toordinal()}
+LAST_ORDINAL = {last.toordinal()}
+
+# 日柱甲子序号 = (日期序数 + DAY_OFFSET) % 60
+DAY_OFFSET = {day_offset}
+
+# 年柱换柱日期（正月初一），第一项对应的年柱甲子序号为 YEAR_START_INDEX，之后逐项加一
+YEAR_START_INDEX = {first_year_idx}
+YEAR_START_ORDINALS = {_format_tuple(year_starts)}
+
+# 月柱换柱日期（节），第一项对应的月柱甲子序号为 MONTH_START_INDEX，之后逐项加一
+MONTH_START_INDEX = {first_month_idx}
+MONTH_START_ORDINALS = {_format_tuple(month_starts)}
+'''
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return len(year_starts), len(month_starts)
+
+
+def verify(first_year=TABLE_FIRST_YEAR, last_year=TABLE_LAST_YEAR, step_hours=1, out=sys.stdout):
+    """
+    逐小时与 lunar_python 对比，返回不一致的数量
+    """
+    mismatches = 0
+    checked = 0
+    d = date(first_year, 1, 1)
+    last = date(last_year, 12, 31)
+    while d <= last:
+        for hour in range(0, 24, step_hours):
+            expected = _lunar_pillars(d.year, d.month, d.day, hour)
+            got = four_pillars(d.year, d.month, d.day, hour)
+            checked += 1
+            if got != expected:
+                mismatches += 1
+                if mismatches <= 20:
+                    out.write(f"{d} {hour:02d}:00 expected {expected} got {got}\n")
+        if d.month == 12 and d.day == 31:
+            out.write(f"{d.year}: checked {checked}, mismatches {mismatches}\n")
+            out.flush()
+        d += timedelta(days=1)
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GanZhi calendar table tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="regenerate bazi_calendar_data.py from lunar_python")
+    ver = sub.add_parser("verify", help="compare every hour against lunar_python")
+    ver.add_argument("--first-year", type=int, default=TABLE_FIRST_YEAR)
+    ver.add_argument("--last-year", type=int, default=TABLE_LAST_YEAR)
+    ver.add_argument("--step-hours", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        years, months = build()
+        print(f"wrote {DATA_FILE}: {years} year starts, {months} month starts")
+    else:
+        mismatches = verify(args.first_year, args.last_year, args.step_hours)
+        print(f"mismatches: {mismatches}")
+        sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
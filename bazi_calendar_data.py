@@ -0,0 +1,283 @@
+"""
+干支历预计算表，由 `python bazi_calendar.py build` 根据 lunar_python 生成，请勿手动修改。
+日期均为 date.toordinal()（北京时间）。覆盖 1900-01-01 至 2100-12-31。
+"""
+
+FIRST_ORDINAL = 693596
+LAST_ORDINAL = 767009
+
+# 日柱甲子序号 = (日期序数 + DAY_OFFSET) % 60
+DAY_OFFSET = 14
+
+# 年柱换柱日期（正月初一），第一项对应的年柱甲子序号为 YEAR_START_INDEX，之后逐项加一
+YEAR_START_INDEX = 35
+YEAR_START_ORDINALS = (
+    693596, 693626, 694010, 694364, 694719, 695102, 695456, 695811, 696195, 696549,
+    696904, 697288, 697642, 698026, 698380, 698734, 699118, 699472, 699827, 700211,
+    700566, 700950, 701304, 701658, 702042, 702396, 702750, 703135, 703489, 703844,
+    704228, 704582, 704965, 705319, 705674, 706058, 706413, 706767, 707151, 707505,
+    707889, 708243, 708597, 708981, 709336, 709690, 710075, 710429, 710783, 711167,
+    711521, 711905, 712259, 712614, 712998, 713352, 713707, 714091, 714445, 714828,
+    715183, 715537, 715921, 716276, 716630, 717014, 717369, 717722, 718106, 718461,
+    718845, 719199, 719554, 719938, 720292, 720646, 721030, 721384, 721768, 722122,
+    722477, 722861, 723216, 723570, 723954, 724308, 724692, 725046, 725400, 725784,
+    726139, 726494, 726878, 727232, 727586, 727969, 728324, 728708, 729062, 729417,
+    729801, 730155, 730509, 730893, 731247, 731602, 731986, 732340, 732725, 733079,
+    733433, 733817, 734171, 734525, 734909, 735264, 735648, 736002, 736357, 736741,
+    737095, 737449, 737833, 738187, 738542, 738926, 739280, 739664, 740018, 740372,
+    740756, 741111, 741465, 741849, 742204, 742588, 742942, 743296, 743680, 744034,
+    744388, 744772, 745127, 745482, 745866, 746220, 746604, 746958, 747312, 747696,
+    748050, 748405, 748789, 749144, 749528, 749882, 750236, 750619, 750974, 751328,
+    751712, 752067, 752421, 752805, 753159, 753543, 753897, 754252, 754636, 754990,
+    755345, 755729, 756083, 756467, 756821, 757175, 757559, 757914, 758268, 758652,
+    759007, 759361, 759745, 760099, 760483, 760837, 761192, 761576, 761930, 762285,
+    762668, 763022, 763406, 763760, 764115, 764499, 764854, 765208, 765592, 765946,
+    766300, 766684,
+)
+
+# 月柱换柱日期（节），第一项对应的月柱甲子序号为 MONTH_START_INDEX，之后逐项加一
+MONTH_START_INDEX = 12
+MONTH_START_ORDINALS = (
+    693596, 693601, 693630, 693660, 693690, 693721, 693752, 693783, 693815, 693846,
+    693877, 693907, 693936, 693966, 693995, 694025, 694055, 694086, 694117, 694149,
+    694180, 694211, 694242, 694272, 694302, 694331, 694361, 694390, 694421, 694451,
+    694483, 694514, 694545, 694576, 694607, 694637, 694667, 694696, 694726, 694756,
+    694786, 694817, 694848, 694879, 694911, 694942, 694972, 695002, 695032, 695062,
+    695091, 695121, 695151, 695182, 695213, 695244, 695276, 695307, 695338, 695368,
+    695397, 695427, 695456, 695486, 695516, 695547, 695578, 695610, 695641, 695672,
+    695703, 695733, 695763, 695792, 695822, 695851, 695882, 695912, 695943, 695975,
+    696006, 696037, 696068, 696098, 696128, 696157, 696187, 696217, 696247, 696278,
+    696309, 696340, 696372, 696403, 696433, 696463, 696493, 696523, 696552, 696582,
+    696612, 696643, 696674, 696705, 696737, 696768, 696799, 696829, 696858, 696888,
+    696917, 696947, 696977, 697008, 697039, 697071, 697102, 697133, 697164, 697194,
+    697224, 697253, 697283, 697312, 697343, 697373, 697404, 697436, 697467, 697498,
+    697529, 697559, 697589, 697618, 697648, 697678, 697708, 697739, 697770, 697801,
+    697833, 697864, 697894, 697924, 697954, 697984, 698013, 698043, 698073, 698104,
+    698135, 698166, 698198, 698229, 698260, 698290, 698319, 698349, 698378, 698408,
+    698438, 698469, 698500, 698532, 698563, 698594, 698625, 698655, 698685, 698714,
+    698743, 698773, 698803, 698834, 698865, 698897, 698928, 698959, 698990, 699020,
+    699050, 699079, 699109, 699138, 699169, 699199, 699231, 699262, 699293, 699325,
+    699355, 699385, 699415, 699444, 699474, 699504, 699534, 699565, 699596, 699627,
+    699659, 699690, 699720, 699751, 699780, 699810, 699839, 699869, 699899, 699930,
+    699961, 699993, 700024, 700055, 700086, 700116, 700146, 700175, 700204, 700234,
+    700264, 700295, 700326, 700358, 700389, 700420, 700451, 700481, 700511, 700540,
+    700570, 700599, 700630, 700660, 700692, 700723, 700754, 700786, 700816, 700846,
+    700876, 700905, 700935, 700965, 700995, 701026, 701057, 701088, 701120, 701151,
+    701181, 701212, 701241, 701271, 701300, 701330, 701360, 701391, 701422, 701454,
+    701485, 701516, 701547, 701577, 701606, 701636, 701665, 701695, 701725, 701756,
+    701787, 701819, 701850, 701881, 701912, 701942, 701972, 702001, 702031, 702060,
+    702091, 702121, 702153, 702184, 702215, 702247, 702277, 702307, 702337, 702366,
+    702396, 702426, 702456, 702487, 702518, 702549, 702581, 702612, 702642, 702673,
+    702702, 702732, 702761, 702791, 702821, 702852, 702883, 702915, 702946, 702977,
+    703008, 703038, 703067, 703097, 703126, 703156, 703186, 703217, 703248, 703280,
+    703311, 703342, 703373, 703403, 703433, 703462, 703492, 703521, 703552, 703582,
+    703614, 703645, 703676, 703708, 703738, 703768, 703798, 703827, 703857, 703887,
+    703917, 703948, 703979, 704010, 704042, 704073, 704103, 704133, 704163, 704193,
+    704222, 704252, 704282, 704313, 704344, 704375, 704407, 704438, 704469, 704499,
+    704528, 704558, 704587, 704617, 704647, 704678, 704709, 704741, 704772, 704803,
+    704834, 704864, 704894, 704923, 704953, 704982, 705013, 705043, 705075, 705106,
+    705137, 705168, 705199, 705229, 705259, 705288, 705318, 705348, 705378, 705409,
+    705440, 705471, 705503, 705534, 705564, 705594, 705624, 705654, 705683, 705713,
+    705743, 705774, 705805, 705836, 705868, 705899, 705930, 705960, 705989, 706019,
+    706048, 706078, 706108, 706139, 706170, 706202, 706233, 706264, 706295, 706325,
+    706355, 706384, 706414, 706443, 706474, 706504, 706535, 706567, 706598, 706629,
+    706660, 706690, 706720, 706749, 706779, 706809, 706839, 706870, 706901, 706932,
+    706964, 706995, 707025, 707055, 707085, 707115, 707144, 707174, 707204, 707235,
+    707266, 707297, 707329, 707360, 707391, 707421, 707450, 707480, 707509, 707539,
+    707569, 707600, 707631, 707663, 707694, 707725, 707756, 707786, 707816, 707845,
+    707875, 707904, 707935, 707965, 707996, 708028, 708059, 708090, 708121, 708151,
+    708181, 708210, 708240, 708270, 708300, 708331, 708362, 708393, 708425, 708456,
+    708486, 708516, 708546, 708576, 708605, 708635, 708665, 708696, 708727, 708758,
+    708790, 708821, 708852, 708882, 708911, 708941, 708970, 709000, 709030, 709061,
+    709092, 709124, 709155, 709186, 709217, 709247, 709277, 709306, 709336, 709365,
+    709396, 709426, 709457, 709489, 709520, 709551, 709582, 709612, 709642, 709671,
+    709701, 709731, 709761, 709791, 709823, 709854, 709886, 709917, 709947, 709977,
+    710007, 710037, 710066, 710096, 710126, 710157, 710188, 710219, 710251, 710282,
+    710312, 710343, 710372, 710402, 710431, 710461, 710491, 710522, 710553, 710585,
+    710616, 710647, 710678, 710708, 710738, 710767, 710796, 710826, 710856, 710887,
+    710918, 710950, 710981, 711012, 711043, 711073, 711103, 711132, 711162, 711191,
+    711222, 711252, 711284, 711315, 711346, 711378, 711408, 711438, 711468, 711497,
+    711527, 711557, 711587, 711618, 711649, 711680, 711712, 711743, 711773, 711804,
+    711833, 711863, 711892, 711922, 711952, 711983, 712014, 712046, 712077, 712108,
+    712139, 712169, 712199, 712228, 712257, 712287, 712317, 712348, 712379, 712411,
+    712442, 712473, 712504, 712534, 712564, 712593, 712623, 712652, 712683, 712713,
+    712745, 712776, 712807, 712839, 712869, 712899, 712929, 712958, 712988, 713018,
+    713048, 713079, 713110, 713141, 713173, 713204, 713234, 713265, 713294, 713324,
+    713353, 713383, 713413, 713444, 713475, 713507, 713538, 713569, 713600, 713630,
+    713659, 713689, 713718, 713748, 713778, 713809, 713840, 713872, 713903, 713934,
+    713965, 713995, 714025, 714054, 714084, 714113, 714144, 714174, 714206, 714237,
+    714268, 714300, 714330, 714360, 714390, 714419, 714449, 714479, 714509, 714540,
+    714571, 714602, 714634, 714665, 714695, 714726, 714755, 714785, 714814, 714844,
+    714874, 714905, 714936, 714967, 714999, 715030, 715061, 715091, 715120, 715150,
+    715179, 715209, 715239, 715270, 715301, 715333, 715364, 715395, 715426, 715456,
+    715486, 715515, 715545, 715574, 715605, 715635, 715667, 715698, 715729, 715760,
+    715791, 715821, 715851, 715880, 715910, 715940, 715970, 716001, 716032, 716063,
+    716095, 716126, 716156, 716186, 716216, 716246, 716275, 716305, 716335, 716366,
+    716397, 716428, 716460, 716491, 716522, 716552, 716581, 716611, 716640, 716670,
+    716700, 716731, 716762, 716794, 716825, 716856, 716887, 716917, 716947, 716976,
+    717006, 717035, 717066, 717096, 717128, 717159, 717190, 717221, 717252, 717282,
+    717312, 717341, 717371, 717401, 717431, 717462, 717493, 717524, 717556, 717587,
+    717617, 717647, 717677, 717707, 717736, 717766, 717796, 717827, 717858, 717889,
+    717921, 717952, 717983, 718013, 718042, 718072, 718101, 718131, 718161, 718192,
+    718223, 718255, 718286, 718317, 718348, 718378, 718408, 718437, 718467, 718496,
+    718527, 718557, 718588, 718620, 718651, 718682, 718713, 718743, 718773, 718802,
+    718832, 718862, 718892, 718923, 718954, 718985, 719017, 719048, 719078, 719108,
+    719138, 719168, 719197, 719227, 719257, 719288, 719319, 719350, 719382, 719413,
+    719444, 719474, 719503, 719533, 719562, 719592, 719622, 719653, 719684, 719716,
+    719747, 719778, 719809, 719839, 719869, 719898, 719928, 719957, 719988, 720018,
+    720049, 720081, 720112, 720143, 720174, 720204, 720234, 720263, 720293, 720323,
+    720353, 720383, 720415, 720446, 720478, 720509, 720539, 720569, 720599, 720629,
+    720658, 720688, 720718, 720749, 720780, 720811, 720843, 720874, 720905, 720935,
+    720964, 720994, 721023, 721053, 721083, 721114, 721145, 721177, 721208, 721239,
+    721270, 721300, 721330, 721359, 721389, 721418, 721448, 721479, 721510, 721542,
+    721573, 721604, 721635, 721665, 721695, 721724, 721754, 721784, 721814, 721844,
+    721876, 721907, 721938, 721970, 722000, 722030, 722060, 722090, 722119, 722149,
+    722179, 722210, 722241, 722272, 722304, 722335, 722365, 722396, 722425, 722455,
+    722484, 722514, 722544, 722575, 722606, 722638, 722669, 722700, 722731, 722761,
+    722791, 722820, 722850, 722879, 722909, 722940, 722971, 723003, 723034, 723065,
+    723096, 723126, 723156, 723185, 723215, 723245, 723275, 723305, 723337, 723368,
+    723399, 723431, 723461, 723491, 723521, 723551, 723580, 723610, 723640, 723671,
+    723702, 723733, 723765, 723796, 723826, 723857, 723886, 723916, 723945, 723975,
+    724005, 724036, 724067, 724099, 724130, 724161, 724192, 724222, 724252, 724281,
+    724310, 724340, 724370, 724401, 724432, 724464, 724495, 724526, 724557, 724587,
+    724617, 724646, 724676, 724705, 724736, 724766, 724798, 724829, 724860, 724892,
+    724922, 724952, 724982, 725011, 725041, 725071, 725101, 725132, 725163, 725194,
+    725226, 725257, 725287, 725318, 725347, 725377, 725406, 725436, 725466, 725497,
+    725528, 725559, 725591, 725622, 725653, 725683, 725712, 725742, 725771, 725801,
+    725831, 725862, 725893, 725925, 725956, 725987, 726018, 726048, 726078, 726107,
+    726137, 726166, 726197, 726227, 726259, 726290, 726321, 726352, 726383, 726413,
+    726443, 726472, 726502, 726532, 726562, 726593, 726624, 726655, 726687, 726718,
+    726748, 726779, 726808, 726838, 726867, 726897, 726927, 726958, 726989, 727020,
+    727052, 727083, 727114, 727144, 727173, 727203, 727232, 727262, 727292, 727323,
+    727354, 727386, 727417, 727448, 727479, 727509, 727539, 727568, 727598, 727627,
+    727658, 727688, 727720, 727751, 727782, 727813, 727844, 727874, 727904, 727933,
+    727963, 727993, 728023, 728054, 728085, 728116, 728148, 728179, 728209, 728239,
+    728269, 728299, 728328, 728358, 728388, 728419, 728450, 728481, 728513, 728544,
+    728575, 728605, 728634, 728664, 728693, 728723, 728753, 728784, 728815, 728847,
+    728878, 728909, 728940, 728970, 729000, 729029, 729059, 729088, 729119, 729149,
+    729180, 729212, 729243, 729274, 729305, 729335, 729365, 729394, 729424, 729454,
+    729484, 729515, 729546, 729577, 729609, 729640, 729670, 729700, 729730, 729760,
+    729789, 729819, 729849, 729880, 729911, 729942, 729974, 730005, 730036, 730066,
+    730095, 730125, 730154, 730184, 730214, 730245, 730276, 730308, 730339, 730370,
+    730401, 730431, 730461, 730490, 730520, 730549, 730580, 730610, 730641, 730673,
+    730704, 730735, 730766, 730796, 730826, 730855, 730885, 730915, 730945, 730976,
+    731007, 731038, 731070, 731101, 731131, 731161, 731191, 731221, 731250, 731280,
+    731310, 731341, 731372, 731403, 731435, 731466, 731497, 731527, 731556, 731586,
+    731615, 731645, 731675, 731706, 731737, 731769, 731800, 731831, 731862, 731892,
+    731922, 731951, 731981, 732010, 732041, 732071, 732102, 732134, 732165, 732196,
+    732227, 732257, 732287, 732316, 732346, 732376, 732406, 732436, 732468, 732499,
+    732530, 732562, 732592, 732622, 732652, 732682, 732711, 732741, 732771, 732802,
+    732833, 732864, 732896, 732927, 732958, 732988, 733017, 733047, 733076, 733106,
+    733136, 733167, 733198, 733230, 733261, 733292, 733323, 733353, 733383, 733412,
+    733442, 733471, 733501, 733532, 733563, 733595, 733626, 733657, 733688, 733718,
+    733748, 733777, 733807, 733837, 733867, 733897, 733929, 733960, 733991, 734023,
+    734053, 734083, 734113, 734143, 734172, 734202, 734232, 734263, 734294, 734325,
+    734357, 734388, 734418, 734449, 734478, 734508, 734537, 734567, 734597, 734628,
+    734659, 734691, 734722, 734753, 734784, 734814, 734844, 734873, 734903, 734932,
+    734962, 734993, 735024, 735056, 735087, 735118, 735149, 735179, 735209, 735238,
+    735268, 735298, 735328, 735358, 735390, 735421, 735452, 735484, 735514, 735544,
+    735574, 735604, 735633, 735663, 735693, 735724, 735755, 735786, 735818, 735849,
+    735879, 735910, 735939, 735969, 735998, 736028, 736058, 736089, 736120, 736152,
+    736183, 736214, 736245, 736275, 736305, 736334, 736363, 736393, 736423, 736454,
+    736485, 736517, 736548, 736579, 736610, 736640, 736670, 736699, 736729, 736758,
+    736789, 736819, 736851, 736882, 736913, 736945, 736975, 737005, 737035, 737064,
+    737094, 737124, 737154, 737185, 737216, 737247, 737279, 737310, 737340, 737371,
+    737400, 737430, 737459, 737489, 737519, 737550, 737581, 737612, 737644, 737675,
+    737706, 737736, 737766, 737795, 737824, 737854, 737884, 737915, 737946, 737978,
+    738009, 738040, 738071, 738101, 738131, 738160, 738190, 738219, 738250, 738280,
+    738312, 738343, 738374, 738405, 738436, 738466, 738496, 738525, 738555, 738585,
+    738615, 738646, 738677, 738708, 738740, 738771, 738801, 738832, 738861, 738891,
+    738920, 738950, 738980, 739011, 739042, 739073, 739105, 739136, 739167, 739197,
+    739226, 739256, 739285, 739315, 739345, 739376, 739407, 739439, 739470, 739501,
+    739532, 739562, 739592, 739621, 739651, 739680, 739711, 739741, 739772, 739804,
+    739835, 739866, 739897, 739927, 739957, 739986, 740016, 740046, 740076, 740107,
+    740138, 740169, 740201, 740232, 740262, 740292, 740322, 740352, 740381, 740411,
+    740441, 740472, 740503, 740534, 740566, 740597, 740628, 740658, 740687, 740717,
+    740746, 740776, 740806, 740837, 740868, 740900, 740931, 740962, 740993, 741023,
+    741053, 741082, 741112, 741141, 741172, 741202, 741233, 741265, 741296, 741327,
+    741358, 741388, 741418, 741447, 741477, 741507, 741537, 741568, 741599, 741630,
+    741662, 741693, 741723, 741753, 741783, 741813, 741842, 741872, 741902, 741933,
+    741964, 741995, 742027, 742058, 742089, 742119, 742148, 742178, 742207, 742237,
+    742267, 742298, 742329, 742361, 742392, 742423, 742454, 742484, 742514, 742543,
+    742573, 742602, 742633, 742663, 742694, 742726, 742757, 742788, 742819, 742849,
+    742879, 742908, 742938, 742968, 742998, 743028, 743060, 743091, 743122, 743154,
+    743184, 743214, 743244, 743274, 743303, 743333, 743363, 743394, 743425, 743456,
+    743488, 743519, 743550, 743580, 743609, 743639, 743668, 743698, 743728, 743759,
+    743790, 743822, 743853, 743884, 743915, 743945, 743975, 744004, 744034, 744063,
+    744094, 744124, 744155, 744187, 744218, 744249, 744280, 744310, 744340, 744369,
+    744399, 744429, 744459, 744489, 744521, 744552, 744583, 744615, 744645, 744675,
+    744705, 744735, 744764, 744794, 744824, 744855, 744886, 744917, 744949, 744980,
+    745011, 745041, 745070, 745100, 745129, 745159, 745189, 745220, 745251, 745283,
+    745314, 745345, 745376, 745406, 745436, 745465, 745495, 745524, 745554, 745585,
+    745616, 745648, 745679, 745710, 745741, 745771, 745801, 745830, 745860, 745890,
+    745920, 745950, 745982, 746013, 746044, 746076, 746106, 746136, 746166, 746196,
+    746225, 746255, 746285, 746316, 746347, 746378, 746410, 746441, 746471, 746502,
+    746531, 746561, 746590, 746620, 746650, 746681, 746712, 746744, 746775, 746806,
+    746837, 746867, 746897, 746926, 746956, 746985, 747015, 747046, 747077, 747109,
+    747140, 747171, 747202, 747232, 747262, 747291, 747321, 747351, 747381, 747411,
+    747443, 747474, 747505, 747537, 747567, 747597, 747627, 747657, 747686, 747716,
+    747746, 747777, 747808, 747839, 747871, 747902, 747932, 747963, 747992, 748022,
+    748051, 748081, 748111, 748142, 748173, 748204, 748236, 748267, 748298, 748328,
+    748358, 748387, 748416, 748446, 748476, 748507, 748538, 748570, 748601, 748632,
+    748663, 748693, 748723, 748752, 748782, 748811, 748842, 748872, 748904, 748935,
+    748966, 748997, 749028, 749058, 749088, 749117, 749147, 749177, 749207, 749238,
+    749269, 749300, 749332, 749363, 749393, 749424, 749453, 749483, 749512, 749542,
+    749572, 749603, 749634, 749665, 749697, 749728, 749759, 749789, 749819, 749848,
+    749877, 749907, 749937, 749968, 749999, 750031, 750062, 750093, 750124, 750154,
+    750184, 750213, 750243, 750272, 750303, 750333, 750364, 750396, 750427, 750458,
+    750489, 750519, 750549, 750578, 750608, 750638, 750668, 750699, 750730, 750761,
+    750793, 750824, 750854, 750885, 750914, 750944, 750973, 751003, 751033, 751064,
+    751095, 751126, 751158, 751189, 751220, 751250, 751279, 751309, 751338, 751368,
+    751398, 751429, 751460, 751492, 751523, 751554, 751585, 751615, 751645, 751674,
+    751704, 751733, 751764, 751794, 751825, 751857, 751888, 751919, 751950, 751980,
+    752010, 752039, 752069, 752099, 752129, 752160, 752191, 752222, 752254, 752285,
+    752315, 752345, 752375, 752405, 752434, 752464, 752494, 752525, 752556, 752587,
+    752619, 752650, 752681, 752711, 752740, 752770, 752799, 752829, 752859, 752890,
+    752921, 752953, 752984, 753015, 753046, 753076, 753106, 753135, 753165, 753194,
+    753225, 753255, 753286, 753318, 753349, 753380, 753411, 753441, 753471, 753500,
+    753530, 753560, 753590, 753621, 753652, 753683, 753715, 753746, 753776, 753806,
+    753836, 753866, 753895, 753925, 753955, 753986, 754017, 754048, 754080, 754111,
+    754142, 754172, 754201, 754231, 754260, 754290, 754320, 754351, 754382, 754414,
+    754445, 754476, 754507, 754537, 754567, 754596, 754626, 754655, 754686, 754716,
+    754747, 754779, 754810, 754841, 754872, 754902, 754932, 754961, 754991, 755021,
+    755051, 755081, 755113, 755144, 755175, 755207, 755237, 755267, 755297, 755327,
+    755356, 755386, 755416, 755447, 755478, 755509, 755541, 755572, 755603, 755633,
+    755662, 755692, 755721, 755751, 755781, 755812, 755843, 755875, 755906, 755937,
+    755968, 755998, 756028, 756057, 756087, 756116, 756147, 756177, 756208, 756240,
+    756271, 756302, 756333, 756363, 756393, 756422, 756452, 756482, 756512, 756542,
+    756574, 756605, 756636, 756668, 756698, 756728, 756758, 756788, 756817, 756847,
+    756877, 756908, 756939, 756970, 757002, 757033, 757063, 757094, 757123, 757153,
+    757182, 757212, 757242, 757273, 757304, 757336, 757367, 757398, 757429, 757459,
+    757489, 757518, 757548, 757577, 757607, 757638, 757669, 757701, 757732, 757763,
+    757794, 757824, 757854, 757883, 757913, 757943, 757973, 758003, 758035, 758066,
+    758097, 758129, 758159, 758189, 758219, 758249, 758278, 758308, 758338, 758369,
+    758400, 758431, 758463, 758494, 758524, 758555, 758584, 758614, 758643, 758673,
+    758703, 758734, 758765, 758796, 758828, 758859, 758890, 758920, 758950, 758979,
+    759009, 759038, 759068, 759099, 759130, 759162, 759193, 759224, 759255, 759285,
+    759315, 759344, 759374, 759404, 759434, 759464, 759496, 759527, 759558, 759590,
+    759620, 759650, 759680, 759710, 759739, 759769, 759799, 759830, 759861, 759892,
+    759924, 759955, 759985, 760016, 760045, 760075, 760104, 760134, 760164, 760195,
+    760226, 760257, 760289, 760320, 760351, 760381, 760411, 760440, 760469, 760499,
+    760529, 760560, 760591, 760623, 760654, 760685, 760716, 760746, 760776, 760805,
+    760835, 760864, 760895, 760925, 760957, 760988, 761019, 761050, 761081, 761111,
+    761141, 761170, 761200, 761230, 761260, 761291, 761322, 761353, 761385, 761416,
+    761446, 761477, 761506, 761536, 761565, 761595, 761625, 761656, 761687, 761718,
+    761750, 761781, 761812, 761842, 761872, 761901, 761930, 761960, 761990, 762021,
+    762052, 762084, 762115, 762146, 762177, 762207, 762237, 762266, 762296, 762325,
+    762356, 762386, 762417, 762449, 762480, 762511, 762542, 762572, 762602, 762631,
+    762661, 762691, 762721, 762752, 762783, 762814, 762846, 762877, 762907, 762938,
+    762967, 762997, 763026, 763056, 763086, 763117, 763148, 763179, 763211, 763242,
+    763273, 763303, 763332, 763362, 763391, 763421, 763451, 763482, 763513, 763545,
+    763576, 763607, 763638, 763668, 763698, 763727, 763757, 763786, 763817, 763847,
+    763878, 763910, 763941, 763972, 764003, 764033, 764063, 764092, 764122, 764152,
+    764182, 764213, 764244, 764275, 764307, 764338, 764368, 764398, 764428, 764458,
+    764487, 764517, 764547, 764578, 764609, 764640, 764672, 764703, 764734, 764764,
+    764793, 764823, 764852, 764882, 764912, 764943, 764974, 765006, 765037, 765068,
+    765099, 765129, 765159, 765188, 765218, 765247, 765278, 765308, 765339, 765371,
+    765402, 765433, 765464, 765494, 765524, 765553, 765583, 765613, 765643, 765674,
+    765705, 765736, 765767, 765799, 765829, 765859, 765889, 765919, 765948, 765978,
+    766008, 766039, 766070, 766101, 766133, 766164, 766195, 766225, 766254, 766284,
+    766313, 766343, 766373, 766404, 766435, 766467, 766498, 766529, 766560, 766590,
+    766620, 766649, 766679, 766708, 766739, 766769, 766800, 766832, 766863, 766894,
+    766925, 766955, 766985,
+)
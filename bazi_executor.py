@@ -0,0 +1,137 @@
+"""
+generate_summary 的执行后端。
+
+- thread（默认）: 交给 Starlette 的线程池，和原来的同步接口行为一致
+- process: 预热过的进程池，绕开 GIL，让 lunar_python / 五行计算真正并行
+
+BAZI_EXECUTOR=process 选择进程池，BAZI_WORKERS 设置进程数（默认 CPU 核数）。
+run_summary_json 先在事件循环里查 REQUEST_CACHE，命中时两种后端都不用；未命中的请求先过准入控制
+（bazi_admission，名额满且队列满 / 等待超时抛 Overloaded）再交给后端。
+time 缺省的请求走未知时辰模式（bazi_hours，一次算出生当天的 13-14 个时辰段）。
+打分方案在主进程里按请求解析一次，连同请求一起交给后端（进程池 worker 收到的是方案参数，按指纹编译、缓存查表），
+请求缓存的键和实际计算用的是同一个方案，热更新时 worker 不会用旧方案算出结果再存到新方案的键下。
+warm_up_service 在服务报告就绪前预热导入、查表、时区和编码路径。
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+from bazi_admission import ADMISSION
+from bazi_calculator import WARM_UP_SAMPLES, generate_summary, get_profile, warm_up
+from bazi_hours import hour_summaries_json
+from bazi_json import REQUEST_CACHE, request_key, summary_json
+from bazi_timezone import prime_zones
+
+EXECUTOR_MODES = ("thread", "process")
+EXECUTOR_MODE = os.environ.get("BAZI_EXECUTOR", "thread").lower()
+EXECUTOR_WORKERS = int(os.environ.get("BAZI_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_process_pool = None
+
+
+def _ping(_=None):
+    return os.getpid()
+
+
+def _warm_up_worker():
+    # worker 的 initializer：与主进程相同的查表和时区预热
+    warm_up()
+    prime_zones()
+
+
+def create_executor(mode, workers):
+    """
+    创建执行器；进程池用 spawn 启动（不 fork 正在运行事件循环的进程），
+    每个 worker 启动时先执行 warm_up 并预热常用时区。
+    """
+    if mode == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up_worker,
+        )
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bazi", initializer=_warm_up_worker)
+    raise ValueError(f"Unknown executor mode {mode!r}, expected one of {EXECUTOR_MODES}")
+
+
+def prestart(executor, workers):
+    """
+    让所有 worker 在接收请求前启动并完成预热，返回 worker 的进程号
+    """
+    return sorted(set(executor.map(_ping, range(workers * 2))))
+
+
+def warm_up_service(samples=WARM_UP_SAMPLES):
+    """
+    服务级预热（在主进程里执行）：导入 lunar_python、加载各种查表并跑样例（warm_up），
+    预先构造常用时区（prime_zones），再把样例走一遍 summary_json（JSON 编码、命盘库）。
+    返回 {"samples": 成功的样例数, "zones": 预热的时区数}
+    """
+    done = warm_up(samples)
+    zones = prime_zones()
+    for data in samples:
+        try:
+            summary_json(data)
+        except Exception:
+            continue  # 同 warm_up：失败的样例留给真正的请求报错
+    return {"samples": done, "zones": zones}
+
+
+def start_executor(mode=None, workers=None):
+    """
+    服务启动时调用；thread 模式下什么也不用做
+    """
+    global _process_pool
+    mode = mode or EXECUTOR_MODE
+    workers = workers or EXECUTOR_WORKERS
+    if mode not in EXECUTOR_MODES:
+        raise ValueError(f"Unknown executor mode {mode!r}, expected one of {EXECUTOR_MODES}")
+    if mode == "process" and _process_pool is None:
+        _process_pool = create_executor(mode, workers)
+        prestart(_process_pool, workers)
+    return mode
+
+
+def shutdown_executor():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+
+async def run_summary(data, profile=None):
+    """
+    在当前配置的后端上执行 generate_summary；profile 缺省时按 data["profile"] 在主进程里解析
+    """
+    profile = profile or get_profile(data.get("profile"))
+    if _process_pool is not None:
+        return await asyncio.get_running_loop().run_in_executor(_process_pool, generate_summary, data, None, profile)
+    return await run_in_threadpool(generate_summary, data, None, profile)
+
+
+async def run_summary_json(data, profile=None):
+    """
+    同 run_summary，但直接返回编码好的 JSON 字节串（进程池只需回传 bytes）。
+    REQUEST_CACHE 命中时在事件循环里直接返回，不占线程池或进程池，也不受准入控制限制；
+    否则先取得计算名额（ADMISSION.acquire，过载时抛 bazi_admission.Overloaded）
+    """
+    profile = profile or get_profile(data.get("profile"))
+    key = request_key(data, profile)
+    body = REQUEST_CACHE.get(key)
+    if body is not None:
+        return body
+    func = summary_json if data.get("time") else hour_summaries_json
+    await ADMISSION.acquire()
+    try:
+        if _process_pool is not None:
+            body = await asyncio.get_running_loop().run_in_executor(_process_pool, func, data, profile)
+        else:
+            body = await run_in_threadpool(func, data, profile)
+    finally:
+        ADMISSION.release()
+    REQUEST_CACHE.put(key, body)
+    return body
@@ -0,0 +1,292 @@
+"""
+列式导出：把大批命盘的分析结果写成 Arrow（IPC 文件）或 Parquet，给数据分析直接读，
+不用再把 /bazi 的嵌套 JSON 逐条展平。
+
+- 输入是 NDJSON（每行一个 BaziInput，可带 id / request_id），按 batch_size 行一块走批量流水线
+  （bazi_batch.batch_charts：整批换算北京时间、按命盘去重、向量化打分）
+- 每块直接从 Chart 的紧凑步骤结果（ElementScores / StrengthScores / TenGodsScores / 喜用神）
+  填进按列的 NumPy 数组，一个不同的命盘只取一次值，再按行号展开；不生成逐行的结果 dict
+- 每块是一个固定大小的 RecordBatch（最后一块可以不满），Parquet 每块一个 row group
+- 需要 pyarrow（可选依赖，只有导出用到）: pip install pyarrow
+
+列（英文列名，五行按 ELEMENTS 顺序 wood / fire / earth / metal / water）:
+    line, id, request_id, gender                      行号（从 1 起）与回传字段
+    year_pillar … hour_pillar, day_master             字典编码的干支
+    score_<五行>, adjusted_<五行>                      五行得分、月令调整后得分（float64）
+    state_<五行>                                      月令状态（字典编码：旺相余休囚死）
+    strength, power, resistance                       日主强弱（字典编码：身强 / 身弱 / 中和）与助力、克泄合计
+    ten_god_<拼音>                                    十神分布权重（tenGodsSummary，float64）
+    favored_<五行>, unfavored_<五行>                   是否为喜用 / 忌五行（bool）
+    error                                             出错时的错误信息，其他列按出错的步骤置空
+
+    python bazi_export.py users.jsonl -o charts.parquet [--batch-size 65536]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from bazi_batch import ECHO_FIELDS, STRENGTH_CODES, batch_charts, parse_record
+from bazi_calculator import (
+    ELEMENT_INDEX,
+    ELEMENT_TRANSLATION,
+    ELEMENTS,
+    JIAZI,
+    PILLAR_POSITIONS,
+    SEASON_STATES,
+    STATE_WEIGHTS,
+    STEMS,
+    TEN_GOD_NAMES,
+)
+
+EXPORT_BATCH_SIZE = int(os.environ.get("BAZI_EXPORT_BATCH", "65536"))
+EXPORT_FORMATS = ("parquet", "arrow")
+
+ELEMENT_NAMES = tuple(ELEMENT_TRANSLATION[elem] for elem in ELEMENTS)
+# tenGodsSummary 的键是英文全称（"BiJian Star, Friend and Self (比肩)"），列名取拼音
+TEN_GOD_COLUMNS = tuple("ten_god_" + name.split()[0].lower() for name in TEN_GOD_NAMES)
+PILLAR_COLUMNS = ("year_pillar", "month_pillar", "day_pillar", "hour_pillar")
+STATE_NAMES = tuple(STATE_WEIGHTS)
+STATE_CODES = {state: i for i, state in enumerate(STATE_NAMES)}
+STRENGTH_INDEX = {strength: i for i, strength in enumerate(STRENGTH_CODES)}
+
+
+def _error_message(exc):
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _chart_values(charts):
+    """
+    不同命盘的步骤结果 -> 按命盘排列的数组（多一行全空的哨兵，给排盘就出错的记录用）
+    """
+    u = len(charts) + 1
+    values = {
+        "pillars": np.zeros((u, len(PILLAR_POSITIONS)), dtype=np.int8),
+        "day_master": np.zeros(u, dtype=np.int8),
+        "score": np.zeros((u, len(ELEMENTS))),
+        "adjusted": np.zeros((u, len(ELEMENTS))),
+        "state": np.zeros((u, len(ELEMENTS)), dtype=np.int8),
+        "strength": np.zeros(u, dtype=np.int8),
+        "power": np.zeros(u),
+        "resistance": np.zeros(u),
+        "ten_gods": np.zeros((u, len(TEN_GOD_NAMES))),
+        "favored": np.zeros((u, len(ELEMENTS)), dtype=bool),
+        "unfavored": np.zeros((u, len(ELEMENTS)), dtype=bool),
+    }
+    # 各步骤是否成功（决定对应列的有效位）
+    ok = {name: np.zeros(u, dtype=bool) for name in ("chart", "fiveElements", "strength", "tenGods", "suggestion")}
+    errors = [None] * u
+
+    for k, chart in enumerate(charts):
+        values["pillars"][k] = chart.jiazi
+        values["day_master"][k] = chart.day_master
+        ok["chart"][k] = True
+        try:
+            fe = chart.stage("fiveElements")
+            values["score"][k] = fe.raw
+            values["adjusted"][k] = fe.adjusted
+            values["state"][k] = [STATE_CODES[state] for state in SEASON_STATES[fe.month][0]]
+            ok["fiveElements"][k] = True
+            strength = chart.stage("strength")
+            values["strength"][k] = STRENGTH_INDEX[strength.strength]
+            values["power"][k] = strength.power
+            values["resistance"][k] = strength.resistance
+            ok["strength"][k] = True
+            suggestion = chart.stage("elementSuggestion")
+            for elem in suggestion["favored"]:
+                values["favored"][k, ELEMENT_INDEX[elem]] = True
+            for elem in suggestion["unfavored"]:
+                values["unfavored"][k, ELEMENT_INDEX[elem]] = True
+            ok["suggestion"][k] = True
+        except Exception as exc:  # 与 /bazi 相同的错误，后面的步骤置空
+            errors[k] = _error_message(exc)
+        try:
+            values["ten_gods"][k] = chart.stage("tenGods").summary
+            ok["tenGods"][k] = True
+        except Exception as exc:
+            errors[k] = errors[k] or _error_message(exc)
+    return values, ok, errors
+
+
+def export_columns(records, lines=None, errors=None):
+    """
+    一块 BaziInput 字典 -> {列名: (NumPy 数组或列表, 有效掩码或 None)}，列顺序即导出顺序。
+    records 中解析失败的行可以为 None，错误信息放在 errors[序号]；lines 为各记录的行号（默认从 1 起）
+    """
+    n = len(records)
+    charts, chart_errors = batch_charts([record or {} for record in records])
+    chart_errors.update(errors or {})
+
+    values, ok, errors_by_chart = _chart_values([chart for chart, _ in charts.values()])
+    row_chart = np.full(n, len(charts), dtype=np.intp)  # 默认指向哨兵
+    for k, (_, indices) in enumerate(charts.values()):
+        row_chart[indices] = k
+    valid = {name: mask[row_chart] for name, mask in ok.items()}
+    row_errors = [chart_errors.get(i) or errors_by_chart[k] for i, k in enumerate(row_chart.tolist())]
+
+    columns = {"line": (np.arange(1, n + 1) if lines is None else np.asarray(lines, dtype=np.int64), None)}
+    for field in ECHO_FIELDS:
+        columns[field] = ([
+            None if record is None or record.get(field) is None else str(record[field])
+            for record in records
+        ], None)
+    columns["gender"] = ([None if record is None else record.get("gender") for record in records], None)
+
+    pillars = values["pillars"][row_chart]
+    for p, name in enumerate(PILLAR_COLUMNS):
+        columns[name] = (pillars[:, p], valid["chart"])
+    columns["day_master"] = (values["day_master"][row_chart], valid["chart"])
+    for prefix, key, stage in (("score_", "score", "fiveElements"),
+                               ("adjusted_", "adjusted", "fiveElements"),
+                               ("state_", "state", "fiveElements")):
+        matrix = values[key][row_chart]
+        for e, elem in enumerate(ELEMENT_NAMES):
+            columns[prefix + elem] = (matrix[:, e], valid[stage])
+    for key in ("strength", "power", "resistance"):
+        columns[key] = (values[key][row_chart], valid["strength"])
+    matrix = values["ten_gods"][row_chart]
+    for t, name in enumerate(TEN_GOD_COLUMNS):
+        columns[name] = (matrix[:, t], valid["tenGods"])
+    for key in ("favored", "unfavored"):
+        matrix = values[key][row_chart]
+        for e, elem in enumerate(ELEMENT_NAMES):
+            columns[f"{key}_{elem}"] = (matrix[:, e], valid["suggestion"])
+    columns["error"] = (row_errors, None)
+    return columns
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def export_schema():
+    """
+    导出文件的 Arrow schema；字典编码列的字典固定（所有块相同，IPC 文件格式要求）
+    """
+    pa = _pyarrow()
+    code = pa.dictionary(pa.int8(), pa.string())
+    fields = [pa.field("line", pa.int64(), nullable=False)]
+    fields += [pa.field(field, pa.string()) for field in ECHO_FIELDS]
+    fields.append(pa.field("gender", pa.string()))
+    fields += [pa.field(name, code) for name in PILLAR_COLUMNS + ("day_master",)]
+    fields += [pa.field("score_" + elem, pa.float64()) for elem in ELEMENT_NAMES]
+    fields += [pa.field("adjusted_" + elem, pa.float64()) for elem in ELEMENT_NAMES]
+    fields += [pa.field("state_" + elem, code) for elem in ELEMENT_NAMES]
+    fields += [pa.field("strength", code), pa.field("power", pa.float64()), pa.field("resistance", pa.float64())]
+    fields += [pa.field(name, pa.float64()) for name in TEN_GOD_COLUMNS]
+    fields += [pa.field(f"{key}_{elem}", pa.bool_()) for key in ("favored", "unfavored") for elem in ELEMENT_NAMES]
+    fields.append(pa.field("error", pa.string()))
+    return pa.schema(fields)
+
+
+def _dictionaries():
+    pa = _pyarrow()
+    jiazi, stems = pa.array(JIAZI), pa.array(list(STEMS))
+    states, strengths = pa.array(STATE_NAMES), pa.array(STRENGTH_CODES)
+    table = {name: jiazi for name in PILLAR_COLUMNS}
+    table["day_master"] = stems
+    table.update({"state_" + elem: states for elem in ELEMENT_NAMES})
+    table["strength"] = strengths
+    return table
+
+
+def record_batch(columns, schema=None):
+    """
+    export_columns 的结果 -> pyarrow.RecordBatch（数值列直接从 NumPy 数组转换）
+    """
+    pa = _pyarrow()
+    schema = schema or export_schema()
+    dictionaries = _dictionaries()
+    arrays = []
+    for field in schema:
+        data, valid = columns[field.name]
+        mask = None if valid is None else ~valid
+        if pa.types.is_dictionary(field.type):
+            indices = pa.array(data, type=pa.int8(), mask=mask)
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionaries[field.name]))
+        else:
+            arrays.append(pa.array(data, type=field.type, mask=mask))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_record_batches(lines, batch_size=EXPORT_BATCH_SIZE):
+    """
+    NDJSON 行 -> 每块 batch_size 行的 RecordBatch（空行跳过，行号仍按原文件计）。
+    解析失败的行照样输出一行，只有 line 和 error。
+    """
+    schema = export_schema()
+    records, line_numbers, errors = [], [], {}
+
+    def flush():
+        batch = record_batch(export_columns(records, line_numbers, errors), schema)
+        records.clear()
+        line_numbers.clear()
+        errors.clear()
+        return batch
+
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = parse_record(line)
+        except ValueError as exc:
+            errors[len(records)] = _error_message(exc)
+            record = None
+        records.append(record)
+        line_numbers.append(line_no)
+        if len(records) >= batch_size:
+            yield flush()
+    if records:
+        yield flush()
+
+
+def write_export(lines, path, fmt=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    NDJSON 行 -> Parquet / Arrow IPC 文件，逐块写出（内存只和 batch_size 有关）。
+    fmt 缺省时按扩展名判断（.parquet 为 Parquet，其余为 Arrow）。返回写出的行数。
+    """
+    pa = _pyarrow()
+    fmt = fmt or ("parquet" if path.endswith(".parquet") else "arrow")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {EXPORT_FORMATS}")
+    schema = export_schema()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    rows = 0
+    try:
+        for batch in iter_record_batches(lines, batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export chart analysis as typed Arrow / Parquet columns")
+    parser.add_argument("input", help="NDJSON file with one BaziInput per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", required=True, help="output file (.parquet or .arrow)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="default: from the output extension")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows per record batch")
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        rows = write_export(src, args.output, args.format, args.batch_size)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"wrote {args.output}: {rows} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+未知出生时辰：time 缺省时，一次给出出生当天所有可能的时辰各自的排盘和分析。
+
+- 时辰按北京时间划分（排盘用的是北京时间）：当地的出生日期（00:00 到次日 00:00）换算成北京时间，
+  列出与它重叠的每个北京时辰段。一个北京日期分成早子时 00:00-00:59、丑时 01:00 …… 亥时 21:00-22:59
+  和晚子时 23:00-23:59（晚子时的时干按次日起，日柱仍是当天，与次日的早子时是不同的命盘），
+  所以时区与北京相同时是 13 段；时区与北京相差不是整两小时时，当地这一天横跨两个北京日期（两个日柱），
+  首尾两段只覆盖一部分，最多 14 段
+- 年、月、日柱每个北京日期只查一次干支历，时柱由日干 + 时辰直接推出；超出查表范围时逐个回退到 calc_bazi
+- 每段再换算回当地时间：birth / time 为该段在出生日期内的当地起点（有秒数时进到下一分钟），
+  range 为当地时段（含两端）；每段的结果与用它的 birth / time 调用 /bazi 相同
+- 前三柱的五行原始得分每个日柱只累加一次，各时辰只再加上时柱；命盘照常进 SUMMARY_CACHE，与 /bazi 共用
+- day_pillars: 按日柱分组的当地时段；common_fields: 所有时辰结果完全相同的字段（与出生时辰无关，可以放心展示）
+
+    python bazi_hours.py natal.json     # natal.json 里不写 time
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, time, timedelta
+
+from bazi_calculator import (
+    DAY_PILLAR,
+    PILLAR_POSITIONS,
+    RESULT_KEYS,
+    SUMMARY_CACHE,
+    Chart,
+    bazi_from_ganzhi,
+    calc_bazi,
+    chart_key,
+    get_profile,
+    pillar_ids,
+    resolve_fields,
+)
+from bazi_calendar import BRANCHES, JIAZI, hour_index, pillar_indices
+from bazi_json import dumps
+from bazi_metrics import timed
+from bazi_timezone import BEIJING_TZ_NAME, get_zone, localize, to_beijing
+
+# 一个北京日期内的时辰段: (时辰, 起点整点, 终点整点)
+BEIJING_SLOTS = (
+    (("早子", 0, 1),)
+    + tuple((BRANCHES[i], 2 * i - 1, 2 * i + 1) for i in range(1, 12))
+    + (("晚子", 23, 24),)
+)
+HOUR_PILLAR = 3
+
+
+def _to_local(moment, zone):
+    # 带时区的时刻 -> 当地时间（naive），有秒数时进到下一分钟（能写成 HH:MM）
+    local = moment.astimezone(zone).replace(tzinfo=None)
+    if local.second or local.microsecond:
+        local = local.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    return local
+
+
+def hour_slots(birth, tz_str):
+    """
+    出生日期 + 时区名 -> 与当地这一天重叠的北京时辰段 [(时辰, 当地起点, 当地终点（含）), ...]，按时间顺序。
+    起点 / 终点截在出生日期之内
+    """
+    year, month, day = map(int, birth.split("-"))
+    zone = get_zone(tz_str)
+    midnight = datetime(year, month, day)
+    first = to_beijing(midnight, tz_str)
+    last = to_beijing(midnight + timedelta(days=1), tz_str)
+
+    slots = []
+    bj_day = first.date()
+    while bj_day <= last.date():
+        base = datetime.combine(bj_day, time())
+        for name, start_hour, end_hour in BEIJING_SLOTS:
+            start = localize(base + timedelta(hours=start_hour), BEIJING_TZ_NAME)
+            end = localize(base + timedelta(hours=end_hour), BEIJING_TZ_NAME)
+            if end <= first or start >= last:
+                continue
+            local_start = _to_local(max(start, first), zone)
+            local_end = _to_local(min(end, last) - timedelta(minutes=1), zone)
+            if local_start <= local_end:  # 不足一分钟的段（整秒偏移的历史时区）跳过
+                slots.append((name, local_start, local_end))
+        bj_day += timedelta(days=1)
+    return slots
+
+
+def hour_charts(data, slots=None):
+    """
+    BaziInput 字典（time 缺省）-> 各时辰段当地起点的 calc_bazi 结果，与 hour_slots 的顺序相同。
+    北京时间按日期分组，年、月、日柱每个日期只查一次干支历
+    """
+    tz_str = data["tz"]
+    slots = slots or hour_slots(data["birth"], tz_str)
+
+    days = {}  # 北京日期 -> 该日的四柱序号（查表范围外为 None）
+    charts = []
+    for _, start, _ in slots:
+        dt_bj = to_beijing(start, tz_str)  # 与 /bazi 用同一个当地时刻换算，结果一致
+        bj_date = dt_bj.date()
+        if bj_date not in days:
+            days[bj_date] = pillar_indices(dt_bj.year, dt_bj.month, dt_bj.day, 0)
+        indices = days[bj_date]
+        if indices is None:
+            charts.append(calc_bazi(data, dt_bj))
+            continue
+        ganzhi = tuple(JIAZI[j] for j in indices[:HOUR_PILLAR]) + (JIAZI[hour_index(indices[2], dt_bj.hour)],)
+        charts.append(bazi_from_ganzhi(tz_str, dt_bj, ganzhi))
+    return charts
+
+
+def _partial_scores(jiazi, increments):
+    # 年、月、日三柱的五行原始得分，累加顺序与 score_elements 相同（时柱最后加）
+    raw = [0, 0, 0, 0, 0]
+    for p, j in enumerate(jiazi[:HOUR_PILLAR]):
+        for elem, inc in increments[p][j]:
+            raw[elem] += inc
+    return raw
+
+
+def _chart(bazi, gender, profile, partials):
+    # 取出（或新建）该命盘的 Chart；新建时五行原始得分由共用的前三柱得分加上时柱得到
+    key = chart_key(bazi["fourPillars"], gender, profile)
+    chart = SUMMARY_CACHE.get(key)
+    if chart is None:
+        increments = profile.pillar_increments
+        jiazi = pillar_ids(bazi["fourPillars"])
+        partial = partials.get(jiazi[:HOUR_PILLAR])
+        if partial is None:
+            partial = partials[jiazi[:HOUR_PILLAR]] = _partial_scores(jiazi, increments)
+        raw = list(partial)
+        for elem, inc in increments[HOUR_PILLAR][jiazi[HOUR_PILLAR]]:
+            raw[elem] += inc
+        chart = Chart(bazi["fourPillars"], bazi["dayMaster"], gender, {"elements_score": raw}, profile)
+        SUMMARY_CACHE.put(key, chart)
+    return chart
+
+
+@timed("hour_summaries")
+def hour_summaries(data, profile=None):
+    """
+    BaziInput 字典（time 缺省，可带 fields / lang / profile）-> {"common_fields", "day_pillars", "variants"}:
+    - variants: 按时间顺序的 {"shichen", "day_pillar", "birth", "time", "range", "result"}：birth / time 为该段
+      在出生日期内的当地起点，range 为当地时段，result 与用 birth / time 调用 generate_summary 相同；
+      某个时辰出错时该项为 "error"，不影响其他时辰
+    - day_pillars: 按日柱分组的 {"day_pillar", "range", "shichen"}（当地时段和其中的时辰）
+    - common_fields: 所有成功的时辰里取值都相同的字段（按 result 的字段顺序）
+    profile 为调用方已解析的打分方案（缺省时按 data["profile"] 解析）。
+    注意: result 中的嵌套对象与缓存共享，调用方不要修改。
+    """
+    fields, lang = data.get("fields"), data.get("lang")
+    keys = resolve_fields(fields, lang) if fields or lang else RESULT_KEYS
+    gender = data["gender"]
+    profile = profile or get_profile(data.get("profile"))
+
+    slots = hour_slots(data["birth"], data["tz"])
+    partials = {}
+    variants = []
+    for (name, start, end), bazi in zip(slots, hour_charts(data, slots)):
+        variant = {
+            "shichen": name,
+            "day_pillar": bazi["fourPillars"][PILLAR_POSITIONS[DAY_PILLAR]],
+            "birth": start.strftime("%Y-%m-%d"),
+            "time": start.strftime("%H:%M"),
+            "range": f"{start:%H:%M}-{end:%H:%M}",
+        }
+        try:
+            variant["result"] = _chart(bazi, gender, profile, partials).result(keys)
+        except Exception as exc:  # 与批量接口相同，单个时辰出错只在该项返回 error
+            variant["error"] = f"{type(exc).__name__}: {exc}"
+        variants.append(variant)
+
+    results = [variant["result"] for variant in variants if "result" in variant]
+    common = [
+        key for key in keys
+        if results and all(result[key] == results[0][key] for result in results[1:])
+    ]
+    day_pillars = []
+    for variant, (_, start, end) in zip(variants, slots):
+        if not day_pillars or day_pillars[-1]["day_pillar"] != variant["day_pillar"]:
+            day_pillars.append({"day_pillar": variant["day_pillar"], "start": start, "shichen": []})
+        group = day_pillars[-1]
+        group["range"] = f"{group['start']:%H:%M}-{end:%H:%M}"
+        group["shichen"].append(variant["shichen"])
+    day_pillars = [
+        {"day_pillar": group["day_pillar"], "range": group["range"], "shichen": group["shichen"]}
+        for group in day_pillars
+    ]
+    return {"common_fields": common, "day_pillars": day_pillars, "variants": variants}
+
+
+def hour_summaries_json(data, profile=None):
+    """
+    hour_summaries -> JSON 字节串（进程池只需回传 bytes）
+    """
+    return dumps(hour_summaries(data, profile))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a chart with unknown birth hour (all 12 shichen)")
+    parser.add_argument("natal", help="JSON file with birth, tz, gender and no time ('-' for stdin)")
+    args = parser.parse_args(argv)
+    if args.natal == "-":
+        natal = json.load(sys.stdin)
+    else:
+        with open(args.natal, encoding="utf-8") as f:
+            natal = json.load(f)
+    json.dump(hour_summaries(natal), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+响应 JSON 编码。
+
+FastAPI 默认对每个响应先跑 jsonable_encoder 再 json.dumps，而 /bazi 的结果里大部分是固定文本
+（十神建议、各种 *_eng 字段）。这里:
+
+- dumps: 有 orjson 时用 orjson，否则退回标准库 json；输出与 FastAPI JSONResponse 完全相同
+  （UTF-8、不转义中文、紧凑分隔符）。datetime / date 显式转成 ISO 8601 字符串
+- 十神建议的每一行在导入时预先编码成 JSON 字节串（ADVICE_FRAGMENTS），标准库编码时直接拼接
+- summary_json: 同一命盘（四柱 + 性别 + fields / lang）的整段响应字节缓存在 RESPONSE_CACHE，命中时不再编码；
+  RESPONSE_CACHE 的后端由 BAZI_CACHE_BACKEND 选择（见 bazi_cache.py，可以在多个 worker 之间共享），
+  同一命盘同时到达的请求只计算一次；
+  配置了预计算命盘库（BAZI_STORE，见 bazi_store.py）时直接从库里拼出响应（库里只有默认打分参数的结果，
+  其他打分方案照常计算，缓存键带方案指纹）
+- REQUEST_CACHE: 按原始请求字段（出生日期、时间、时区、性别、fields / lang、打分方案指纹）缓存响应字节，
+  不用换算北京时间就能命中；异步接口在事件循环里直接查，命中时不占线程池
+"""
+import json
+import os
+from datetime import date, datetime
+
+from bazi_cache import make_cache
+from bazi_calculator import (
+    ADVICE_LINES,
+    ELEMENTS,
+    STEMS,
+    LRUCache,
+    calc_bazi,
+    chart_key,
+    generate_summary,
+    get_profile,
+    resolve_fields,
+)
+from bazi_metrics import timed
+
+try:
+    import orjson
+except ImportError:  # orjson 是可选依赖
+    orjson = None
+
+# 与 ADVICE_LINES 对应，最后两个字段由 encode_summary 用预编码片段拼接
+ADVICE_FIELDS = ("tenGods_advice", "tenGods_advice_eng")
+
+# 整段响应字节缓存，大小与命盘结果缓存相同（BAZI_CACHE_SIZE=0 关闭），后端见 bazi_cache.make_cache
+RESPONSE_CACHE = make_cache()
+# 请求缓存在事件循环里查，始终是进程内 LRU（不能做 I/O）
+REQUEST_CACHE = LRUCache(int(os.environ.get("BAZI_CACHE_SIZE", "10000")))
+
+
+def request_key(data, profile=None):
+    """
+    请求字段 -> REQUEST_CACHE 的键（同一命盘的不同写法各占一项，最终仍共用 RESPONSE_CACHE）。
+    打分方案用指纹而不是名字，方案热更新后旧的响应自然不再命中；profile 应与实际计算用的方案相同，
+    缺省时按 data["profile"] 解析（方案不存在时抛 ValueError）
+    """
+    profile = profile or get_profile(data.get("profile"))
+    return (data["birth"], data.get("time"), data["tz"], data["gender"],
+            tuple(data.get("fields") or ()), data.get("lang"), profile.fingerprint)
+
+
+def _default(obj):
+    # calc_bazi 的 beijing_tz 等时间字段
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """
+    对象 -> JSON 字节串（紧凑格式，中文不转义）
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def _build_advice_fragments():
+    """
+    ADVICE_FRAGMENTS[日干][五行] = (喜的中文, 喜的英文, 忌的中文, 忌的英文)，每项是预编码的 JSON 字符串列表
+    """
+    table = {}
+    for dm in STEMS:
+        table[dm] = {}
+        for elem in ELEMENTS:
+            favorable, unfavorable = ADVICE_LINES[dm][elem]
+            table[dm][elem] = (
+                tuple(dumps(zh) for zh, _ in favorable),
+                tuple(dumps(en) for _, en in favorable),
+                tuple(dumps(zh) for zh, _ in unfavorable),
+                tuple(dumps(en) for _, en in unfavorable),
+            )
+    return table
+
+
+ADVICE_FRAGMENTS = _build_advice_fragments()
+
+
+def _advice_json(day_master, favored, unfavored):
+    # 与 ten_god_advice 相同的顺序：先喜后忌
+    fragments = ADVICE_FRAGMENTS[day_master]
+    zh, en = [], []
+    for elem in favored:
+        zh.extend(fragments[elem][0])
+        en.extend(fragments[elem][1])
+    for elem in unfavored:
+        zh.extend(fragments[elem][2])
+        en.extend(fragments[elem][3])
+    return b"[" + b",".join(zh) + b"]", b"[" + b",".join(en) + b"]"
+
+
+@timed("encode_summary")
+def encode_summary(result):
+    """
+    generate_summary 的结果 -> JSON 字节串，与 json.dumps 的输出逐字节相同。
+    没有 orjson 时十神建议用预编码片段拼接，其余字段交给 dumps（只选了建议、没有喜忌五行字段的结果
+    拼不出来，整体编码）；orjson 编码这些字符串比复制字典再拼接还快，直接整体编码。
+    """
+    if (orjson is not None or list(result)[-2:] != list(ADVICE_FIELDS)
+            or "favored_elements" not in result or "unfavored_elements" not in result):
+        return dumps(result)
+    day_master = result["bazi"]["日柱 Day Pillar"][0]
+    advice, advice_eng = _advice_json(day_master, result["favored_elements"], result["unfavored_elements"])
+    head = dumps({k: v for k, v in result.items() if k not in ADVICE_FIELDS})
+    return b"".join((
+        head[:-1],
+        b',"tenGods_advice":', advice,
+        b',"tenGods_advice_eng":', advice_eng,
+        b"}",
+    ))
+
+
+def summary_json(data, profile=None):
+    """
+    generate_summary + encode_summary；同一命盘、同样 fields / lang 的响应字节直接从缓存返回，
+    命盘库里有的命盘不再计算。profile 为调用方已解析的打分方案（缺省时按 data["profile"] 解析）
+    """
+    from bazi_store import get_store  # bazi_store 依赖本模块的 dumps
+
+    profile = profile or get_profile(data.get("profile"))
+    bazi = calc_bazi(data)
+    key = (chart_key(bazi["fourPillars"], data["gender"], profile), tuple(data.get("fields") or ()), data.get("lang"))
+
+    def compute():
+        store = get_store() if profile.namespace is None else None
+        if store is not None:
+            body = store.summary_json(
+                bazi["fourPillars"], data["gender"], resolve_fields(data.get("fields"), data.get("lang")))
+            if body is not None:
+                return body
+        return encode_summary(generate_summary(data, bazi, profile))
+
+    return RESPONSE_CACHE.get_or_compute(key, compute)
@@ -0,0 +1,186 @@
+"""
+大运（十年一柱）与流年：由本命盘一次算出一生的时间线。
+
+- 大运方向: 年干为阳且男命、或年干为阴且女命顺排，其余逆排；大运从月柱起逐柱前进 / 后退
+- 起运岁数: 出生到下一个节（顺排）或上一个节（逆排）的天数，三天折一年、一天折四个月。
+  节的日期取自干支历预计算表（bazi_calendar），只精确到日（出生时刻按一天中的比例计），
+  所以只支持 1900–2100 年出生的命盘
+- 流年: 公历年份的年柱（1984 为甲子）
+- 打分: 每年的流年柱 + 当时的大运柱的五行分量（天干 1.0，地支按藏干权重），
+  喜用五行 +1、忌五行 -1（suggest_five_elem）加权求和；elements 为本命五行（月令调整后）加上这两柱。
+  本命盘按请求的打分方案（profile）计算，流年 / 大运柱的分量固定用内置权重
+
+全部年份用 NumPy 一次算完；整条时间线按命盘 + 出生日期缓存（TIMELINE_CACHE）。
+
+    python bazi_luck.py natal.json --years 100
+"""
+import argparse
+import json
+import os
+import sys
+from bisect import bisect_right
+
+import numpy as np
+
+import bazi_calendar
+from bazi_calculator import (
+    ELEMENT_INDEX,
+    ELEMENTS,
+    JIAZI,
+    JIAZI_ELEMENTS,
+    JIAZI_INDEX,
+    LRUCache,
+    calc_bazi,
+    generate_summary,
+    get_profile,
+)
+
+LUCK_YEARS = int(os.environ.get("BAZI_LUCK_YEARS", "100"))
+LUCK_MAX_YEARS = 150
+# 男命 +1、女命 -1（与年干阴阳一起决定顺逆）
+LUCK_GENDERS = {"男": 1, "male": 1, "m": 1, "女": -1, "female": -1, "f": -1}
+
+TIMELINE_CACHE = LRUCache(int(os.environ.get("BAZI_CACHE_SIZE", "10000")))
+
+ELEMENT_MATRIX = np.array(JIAZI_ELEMENTS)  # (60, 5)
+TIMELINE_FIELDS = ["fiveElementsScore_adjusted", "favored_elements", "unfavored_elements"]
+
+
+def luck_direction(year_pillar, gender):
+    """
+    年柱 + 性别 -> 1（顺排）或 -1（逆排）；性别不是男 / 女时抛 ValueError
+    """
+    sex = LUCK_GENDERS.get(str(gender).strip().lower())
+    if sex is None:
+        raise ValueError(f"Luck pillars need gender 男 or 女, got {gender!r}")
+    yang = JIAZI_INDEX[year_pillar] % 2 == 0  # 甲丙戊庚壬为阳干
+    return 1 if (sex == 1) == yang else -1
+
+
+def start_age_months(dt_bj, direction):
+    """
+    北京时间出生时刻 + 顺逆 -> 起运时的月龄（三天一年，一天四个月，四舍五入到月）
+    """
+    table = bazi_calendar.MONTH_START_ORDINALS
+    if table is None or not bazi_calendar.in_range(dt_bj.year, dt_bj.month, dt_bj.day):
+        raise ValueError(
+            f"Luck pillars need a birth date within {bazi_calendar.TABLE_FIRST_YEAR}"
+            f"–{bazi_calendar.TABLE_LAST_YEAR}")
+    moment = dt_bj.toordinal() + (dt_bj.hour * 60 + dt_bj.minute) / 1440
+    pos = bisect_right(table, dt_bj.toordinal()) - 1
+    if direction > 0:
+        if pos + 1 >= len(table):
+            raise ValueError("No solar term after the birth date in the calendar table")
+        days = table[pos + 1] - moment
+    else:
+        days = moment - table[pos]
+    return round(days * 4)
+
+
+def luck_pillars(month_pillar, direction, count):
+    """
+    月柱 + 顺逆 -> 前 count 步大运的干支
+    """
+    start = JIAZI_INDEX[month_pillar]
+    return [JIAZI[(start + direction * step) % 60] for step in range(1, count + 1)]
+
+
+def _timeline(bazi, gender, profile, years):
+    dt_bj = bazi["beijing_tz"]
+    pillars = bazi["fourPillars"]
+    year_pillar, month_pillar = pillars["年柱 Year Pillar"], pillars["月柱 Month Pillar"]
+    direction = luck_direction(year_pillar, gender)
+    months = start_age_months(dt_bj, direction)
+    start_year = dt_bj.year + (dt_bj.month - 1 + months) // 12
+
+    natal = generate_summary({"gender": gender, "fields": TIMELINE_FIELDS, "lang": "zh"}, bazi, profile)
+    natal_scores = np.array([natal["fiveElementsScore_adjusted"][elem] for elem in ELEMENTS], dtype=float)
+    pref = np.zeros(len(ELEMENTS))
+    for elem in natal["favored_elements"]:
+        pref[ELEMENT_INDEX[elem]] += 1
+    for elem in natal["unfavored_elements"]:
+        pref[ELEMENT_INDEX[elem]] -= 1
+
+    # 全部年份一起算：流年柱、所在大运、两柱五行之和、喜忌得分
+    calendar_years = np.arange(dt_bj.year, dt_bj.year + years)
+    annual_idx = (calendar_years - 4) % 60
+    step = (calendar_years - start_year) // 10  # 第几步大运（从 0 起），起运前为负
+    has_luck = step >= 0
+    luck_count = int(step[-1]) + 1 if has_luck.any() else 0
+    luck_idx = (JIAZI_INDEX[month_pillar] + direction * (step + 1)) % 60
+    contrib = ELEMENT_MATRIX[annual_idx] + np.where(has_luck[:, None], ELEMENT_MATRIX[luck_idx], 0.0)
+    # 这些值只是一位小数的权重与已取三位小数的本命得分相加，不会恰好落在舍入的中点，np.round 与 round 结果相同；
+    # 加 0.0 把 -0.0 变成 0.0
+    totals = np.round(natal_scores + contrib, 3) + 0.0
+    scores = np.round(contrib @ pref, 3) + 0.0
+    luck_scores = (np.round(ELEMENT_MATRIX @ pref, 3) + 0.0).tolist()  # 每个干支单独的得分，供大运列表使用
+
+    luck = []
+    for k, pillar in enumerate(luck_pillars(month_pillar, direction, luck_count)):
+        luck.append({
+            "step": k + 1,
+            "pillar": pillar,
+            "start_year": start_year + 10 * k,
+            "end_year": start_year + 10 * k + 9,
+            "start_age": start_year + 10 * k - dt_bj.year,
+            "score": luck_scores[JIAZI_INDEX[pillar]],
+        })
+
+    annual = []
+    for year, a_idx, lucky, l_idx, row, score in zip(
+            calendar_years.tolist(), annual_idx.tolist(), has_luck.tolist(), luck_idx.tolist(),
+            totals.tolist(), scores.tolist()):
+        annual.append({
+            "year": year,
+            "age": year - dt_bj.year,
+            "pillar": JIAZI[a_idx],
+            "luck_pillar": JIAZI[l_idx] if lucky else None,
+            "elements": dict(zip(ELEMENTS, row)),
+            "score": score,
+        })
+
+    return {
+        "bazi": pillars,
+        "favored_elements": natal["favored_elements"],
+        "unfavored_elements": natal["unfavored_elements"],
+        "direction": "forward" if direction > 0 else "backward",
+        "start_age": {"years": months // 12, "months": months % 12},
+        "luck_pillars": luck,
+        "annual": annual,
+    }
+
+
+def timeline(data, years=LUCK_YEARS):
+    """
+    BaziInput 字典 -> 一生的大运 + 流年时间线（years 个流年，从出生年起）。
+    结果按 (四柱, 性别, 北京时间出生时刻, years, 打分方案指纹) 缓存，调用方不要修改。
+    """
+    if not 1 <= years <= LUCK_MAX_YEARS:
+        raise ValueError(f"years must be between 1 and {LUCK_MAX_YEARS}")
+    profile = get_profile(data.get("profile"))
+    bazi = calc_bazi(data)
+    key = (tuple(bazi["fourPillars"].values()), data["gender"], bazi["beijing_tz"].isoformat(), years,
+           profile.fingerprint)
+    result = TIMELINE_CACHE.get(key)
+    if result is None:
+        result = _timeline(bazi, data["gender"], profile, years)
+        TIMELINE_CACHE.put(key, result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Luck pillars and annual flow for one chart")
+    parser.add_argument("natal", help="JSON file with birth, time, tz, gender ('-' for stdin)")
+    parser.add_argument("--years", type=int, default=LUCK_YEARS)
+    args = parser.parse_args(argv)
+    if args.natal == "-":
+        natal = json.load(sys.stdin)
+    else:
+        with open(args.natal, encoding="utf-8") as f:
+            natal = json.load(f)
+    json.dump(timeline(natal, args.years), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
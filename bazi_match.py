@@ -0,0 +1,192 @@
+"""
+合盘（配对）打分：一个用户对一批候选人，按五行互补程度排序。
+
+每个命盘预先算成特征向量（MatchIndex），打分只是一次矩阵乘法 + top-k，不再逐对跑 generate_summary:
+- share (5,): 月令调整后的五行得分占比（fiveElementsScore_adjusted / 总分）
+- pref (5,): 喜用五行 +1、忌五行 -1（来自 suggest_five_elem 的 favored / unfavored）
+
+    given(a, b)    = share_b · pref_a    # b 的五行补到 a 的喜用神上有多少（减去犯 a 忌神的部分）
+    received(a, b) = share_a · pref_b
+    score(a, b)    = given + received   # 对称
+
+    python bazi_match.py build candidates.jsonl -o pool.npz      # 每行一个带 id 的 BaziInput
+    python bazi_match.py query pool.npz user.json --top-k 10
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from bazi_batch import batch_summaries, parse_record
+from bazi_calculator import ELEMENT_INDEX, ELEMENTS
+
+# 建索引时每个命盘要的字段（只算到喜用神这一步）
+MATCH_FIELDS = ["fiveElementsScore_adjusted", "favored_elements", "unfavored_elements"]
+MATCH_TOP_K = int(os.environ.get("BAZI_MATCH_TOP_K", "10"))
+# 请求里直接给出的候选人最多多少个
+MATCH_MAX_CANDIDATES = int(os.environ.get("BAZI_MATCH_MAX", "10000"))
+
+
+def chart_features(result):
+    """
+    generate_summary（至少包含 MATCH_FIELDS）的结果 -> (share, pref) 两个长度 5 的列表
+    """
+    scores = result["fiveElementsScore_adjusted"]
+    total = sum(scores[elem] for elem in ELEMENTS)
+    share = [scores[elem] / total if total else 0.0 for elem in ELEMENTS]
+    pref = [0.0] * len(ELEMENTS)
+    for elem in result["favored_elements"]:
+        pref[ELEMENT_INDEX[elem]] += 1
+    for elem in result["unfavored_elements"]:
+        pref[ELEMENT_INDEX[elem]] -= 1
+    return share, pref
+
+
+def features(records):
+    """
+    BaziInput 字典列表 -> (成功的输入序号, share (M, 5), pref (M, 5), 错误列表 [{"index", "error"}])
+    整批走 batch_summaries（按命盘去重、向量化打分、共用命盘缓存）
+    """
+    batch = batch_summaries([
+        {**record, "fields": MATCH_FIELDS, "lang": "zh"} for record in records
+    ])
+    rows, shares, prefs, errors = [], [], [], []
+    for item in batch["results"]:
+        if "error" in item:
+            errors.append(item)
+            continue
+        share, pref = chart_features(item["result"])
+        rows.append(item["index"])
+        shares.append(share)
+        prefs.append(pref)
+    shape = (len(rows), len(ELEMENTS))
+    return rows, np.array(shares).reshape(shape), np.array(prefs).reshape(shape), errors
+
+
+def _record_id(record, index):
+    record_id = record.get("id")
+    return str(index if record_id is None else record_id)
+
+
+class MatchIndex:
+    """
+    候选人特征索引：ids (N,)、share (N, 5)、pref (N, 5)。
+    可以保存为 .npz（save / load），服务启动时由 BAZI_MATCH_INDEX 载入。
+    """
+
+    def __init__(self, ids=(), share=None, pref=None):
+        self.ids = list(ids)
+        self.share = share if share is not None else np.zeros((0, len(ELEMENTS)))
+        self.pref = pref if pref is not None else np.zeros((0, len(ELEMENTS)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, records):
+        """
+        候选人记录（BaziInput 字典，可带 "id"，默认为输入序号）-> (索引, 错误列表)；
+        排盘出错的候选人不进索引
+        """
+        rows, share, pref, errors = features(records)
+        for item in errors:
+            item["id"] = _record_id(records[item["index"]], item["index"])
+        return cls([_record_id(records[i], i) for i in rows], share, pref), errors
+
+    def save(self, path):
+        np.savez(path, ids=np.array(self.ids, dtype=str), share=self.share, pref=self.pref)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"].tolist(), data["share"], data["pref"])
+
+    def query(self, share, pref, top_k=MATCH_TOP_K, exclude=None):
+        """
+        一个用户的 (share, pref) 对全部候选人打分，返回得分最高的 top_k 个
+        [{"id", "score", "given", "received"}]，同分按索引顺序。exclude: 不参与排序的 id（如用户自己）
+        """
+        given = self.share @ np.asarray(pref, dtype=float)
+        received = self.pref @ np.asarray(share, dtype=float)
+        scores = given + received
+        candidates = len(scores)
+        if exclude is not None:
+            excluded = np.array(self.ids) == str(exclude)
+            scores = np.where(excluded, -np.inf, scores)
+            candidates -= int(excluded.sum())
+        k = min(top_k, candidates)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.lexsort((top, -scores[top]))][:k]
+        return [
+            {
+                "id": self.ids[i],
+                "score": round(float(scores[i]), 3),
+                "given": round(float(given[i]), 3),
+                "received": round(float(received[i]), 3),
+            }
+            for i in top.tolist()
+        ]
+
+
+def match(user, index, top_k=MATCH_TOP_K):
+    """
+    用户（BaziInput 字典）对索引里的候选人打分；用户排盘出错时抛 ValueError
+    """
+    _, share, pref, errors = features([user])
+    if errors:
+        raise ValueError(errors[0]["error"])
+    return index.query(share[0], pref[0], top_k, exclude=user.get("id"))
+
+
+_index = None
+
+
+def get_index():
+    """
+    BAZI_MATCH_INDEX 指向的候选人索引（第一次调用时载入）；未配置时返回 None
+    """
+    global _index
+    path = os.environ.get("BAZI_MATCH_INDEX")
+    if _index is None and path:
+        _index = MatchIndex.load(path)
+    return _index
+
+
+def _read_records(path):
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(parse_record(line))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compatibility matching against a candidate index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build a candidate index from NDJSON BaziInput records")
+    build.add_argument("input")
+    build.add_argument("-o", "--output", required=True)
+    query = sub.add_parser("query", help="score one user (JSON file) against an index")
+    query.add_argument("index")
+    query.add_argument("user")
+    query.add_argument("--top-k", type=int, default=MATCH_TOP_K)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index, errors = MatchIndex.build(_read_records(args.input))
+        index.save(args.output)
+        print(f"wrote {args.output}: {len(index)} candidates, {len(errors)} errors")
+    else:
+        with open(args.user, encoding="utf-8") as f:
+            user = json.load(f)
+        for row in match(user, MatchIndex.load(args.index), args.top_k):
+            sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+可选的性能指标：各分析步骤的耗时直方图、错误计数、HTTP 请求耗时、缓存命中率和准入控制的队列状态，
+以 Prometheus 文本格式从 GET /metrics 输出。
+
+BAZI_METRICS=1 开启。关闭时 timed 装饰器原样返回被装饰的函数，热路径上没有任何额外开销；
+/metrics 仍然可用，只输出缓存统计和准入控制状态。
+
+注意：BAZI_EXECUTOR=process 时分析步骤在 worker 进程里执行，步骤直方图只统计本进程，
+HTTP 请求耗时和缓存统计不受影响。
+"""
+import functools
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+METRICS_ENABLED = os.environ.get("BAZI_METRICS", "0").lower() in ("1", "true", "yes", "on")
+
+# 直方图分桶（秒）：单个步骤通常在几十微秒，整个请求在毫秒级
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    按标签计数（线程安全）
+    """
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    按标签统计的累积直方图（线程安全），格式与 Prometheus client 相同
+    """
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # 标签值 -> [各桶计数..., 总和, 总数]
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, seconds):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series[-1] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, inf)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "bazi_stage_duration_seconds", "Time spent in each analysis stage.", ("stage",))
+STAGE_ERRORS = Counter(
+    "bazi_stage_errors_total", "Exceptions raised by each analysis stage.", ("stage",))
+HTTP_SECONDS = Histogram(
+    "bazi_http_request_duration_seconds", "HTTP request latency, including the response body.",
+    ("method", "path"))
+HTTP_REQUESTS = Counter(
+    "bazi_http_requests_total", "HTTP requests by route and status code.", ("method", "path", "status"))
+
+REGISTRY = [STAGE_SECONDS, STAGE_ERRORS, HTTP_SECONDS, HTTP_REQUESTS]
+
+
+def observe(stage, seconds):
+    STAGE_SECONDS.observe((stage,), seconds)
+
+
+def timed(stage):
+    """
+    装饰器：记录函数耗时到 bazi_stage_duration_seconds{stage=...}，异常计入 bazi_stage_errors_total。
+    指标未开启时原样返回函数。
+    """
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+        labels = (stage,)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                STAGE_ERRORS.inc(stage)
+                raise
+            finally:
+                STAGE_SECONDS.observe(labels, perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class MetricsMiddleware:
+    """
+    纯 ASGI 中间件：按路由模板统计请求耗时和状态码（不包装 receive，流式接口不受影响）
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_SECONDS.observe((scope["method"], path), perf_counter() - start)
+            HTTP_REQUESTS.inc(scope["method"], path, str(status[0]))
+
+
+def _cache_lines(caches):
+    lines = []
+    metrics = (
+        ("bazi_cache_hits_total", "counter", "Cache hits.", "hits"),
+        ("bazi_cache_misses_total", "counter", "Cache misses.", "misses"),
+        ("bazi_cache_entries", "gauge", "Entries currently cached.", "size"),
+        ("bazi_cache_capacity", "gauge", "Maximum cache entries.", "maxsize"),
+        ("bazi_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start.", "hit_rate"),
+    )
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    for metric, kind, documentation, field in metrics:
+        lines.append(f"# HELP {metric} {documentation}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in stats.items():
+            lines.append(f"{metric}{_format_labels(('cache',), (name,))} {_format_value(values[field])}")
+    return lines
+
+
+def _admission_lines(admission):
+    stats = admission.stats()
+    lines = []
+    metrics = (
+        ("bazi_admission_inflight", "gauge", "Requests currently computing.", "inflight"),
+        ("bazi_admission_queue_depth", "gauge", "Requests waiting for a computation slot.", "queue_depth"),
+        ("bazi_admission_max_inflight", "gauge", "Computation slot limit (0 = unlimited).", "max_inflight"),
+        ("bazi_admission_queue_capacity", "gauge", "Wait queue capacity.", "queue_size"),
+        ("bazi_admission_admitted_total", "counter", "Requests admitted for computation.", "admitted"),
+        ("bazi_admission_queued_total", "counter", "Requests that had to wait for a slot.", "queued"),
+    )
+    for metric, kind, documentation, field in metrics:
+        lines.append(f"# HELP {metric} {documentation}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {_format_value(stats[field])}")
+    lines.append("# HELP bazi_admission_shed_total Requests rejected with 503 by admission control.")
+    lines.append("# TYPE bazi_admission_shed_total counter")
+    for reason, value in stats["shed"].items():
+        lines.append(f"bazi_admission_shed_total{_format_labels(('reason',), (reason,))} {_format_value(value)}")
+    return lines
+
+
+def render_prometheus(caches=None, admission=None):
+    """
+    全部指标的 Prometheus 文本；caches: {名称: 带 stats() 的缓存对象}；admission: 准入控制（AdmissionController）
+    """
+    lines = []
+    if METRICS_ENABLED:
+        for metric in REGISTRY:
+            lines.extend(metric.render())
+    if caches:
+        lines.extend(_cache_lines(caches))
+    if admission is not None:
+        lines.extend(_admission_lines(admission))
+    return "\n".join(lines) + "\n"
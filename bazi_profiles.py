@@ -0,0 +1,180 @@
+"""
+打分方案（scoring profile）的配置文件加载与热更新。
+
+柱位权重（POSITION_WEIGHTS）、月令修正系数（STATE_WEIGHTS）、地支藏干（BRANCH_HIDDEN_STEMS）和
+身强阈值（1.5）可以按方案配置，请求用 "profile" 字段选择方案（不写为默认方案）。
+
+- BAZI_PROFILES: 方案配置文件（JSON），不配置时只有内置的 "default" 方案:
+
+    {
+      "default_profile": "default",
+      "profiles": {
+        "classic": {},
+        "strong-month": {
+          "position_weights": {"月支": 1.5},
+          "state_weights": {"旺": 1.5},
+          "branch_hidden_stems": {"辰": [["戊", 0.6], ["乙", 0.3], ["癸", 0.1]]},
+          "strength_ratio": 1.3
+        }
+      }
+    }
+
+  每个方案只写要改的部分，其余沿用内置值（见 bazi_calculator._profile_params）；
+  没有定义 "default" 时内置的 "default" 方案始终可用
+- BAZI_PROFILES_POLL: 检查配置文件修改时间的间隔秒数（默认 5；0 关闭热更新）
+
+加载时每个方案编译成一套查表（compile_profile），再整体替换当前生效的方案（set_profiles），
+已经在计算的请求继续用它开始时取到的方案。新配置不合法时保留原来的方案，错误记在 STATUS 里（GET /profiles）。
+缓存键带方案的参数指纹：参数与内置默认相同的方案沿用原来的缓存，改过参数的方案各占一个分区，
+同名方案改了参数后旧的缓存项不会再命中。
+只有主进程加载并监视配置文件：BAZI_EXECUTOR=process 时请求在主进程里取到方案，连同方案参数一起交给 worker。
+
+    python bazi_profiles.py check profiles.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from bazi_calculator import DEFAULT_PROFILE, DEFAULT_PROFILE_NAME, compile_profile, profiles, set_profiles
+
+PROFILES_PATH = os.environ.get("BAZI_PROFILES")
+PROFILES_POLL = float(os.environ.get("BAZI_PROFILES_POLL", "5"))
+
+# 最近一次加载的结果：配置文件、最近检查过的修改时间、最近一次成功加载的时间和错误（成功时为 None）
+STATUS = {"path": PROFILES_PATH, "mtime": None, "loaded_at": None, "error": None}
+
+_lock = threading.Lock()
+_watcher = None
+_stop = threading.Event()
+
+
+def load_profiles(path):
+    """
+    读取并编译方案配置文件 -> ({方案名: ScoringProfile}, 默认方案名)；文件或配置不合法时抛 ValueError
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Cannot read profiles from {path}: {exc}") from exc
+    if not isinstance(config, dict) or not isinstance(config.get("profiles", {}), dict):
+        raise ValueError(f"{path}: expected {{\"profiles\": {{name: settings}}, \"default_profile\": name}}")
+
+    compiled = {DEFAULT_PROFILE_NAME: DEFAULT_PROFILE}
+    for name, overrides in config.get("profiles", {}).items():
+        try:
+            compiled[name] = compile_profile(name, overrides)
+        except ValueError as exc:
+            raise ValueError(f"Profile {name!r}: {exc}") from exc
+    default = config.get("default_profile", DEFAULT_PROFILE_NAME)
+    if default not in compiled:
+        raise ValueError(f"Default profile {default!r} is not defined")
+    return compiled, default
+
+
+def reload_profiles(path=None):
+    """
+    重新加载方案配置并原子地替换当前方案；成功返回 True。
+    失败时保留原来的方案，返回 False，错误记在 STATUS["error"]
+    """
+    path = path or PROFILES_PATH
+    if not path:
+        return False
+    with _lock:
+        mtime = None
+        try:
+            mtime = os.stat(path).st_mtime
+            compiled, default = load_profiles(path)
+            set_profiles(compiled, default)
+        except (OSError, ValueError) as exc:
+            # 记下这次的修改时间：文件再次修改后才重试，不在每次轮询时重复报错
+            STATUS.update(path=path, mtime=mtime or STATUS["mtime"], error=str(exc))
+            print(f"bazi_profiles: keeping current profiles, {exc}", file=sys.stderr)
+            return False
+        STATUS.update(path=path, mtime=mtime, loaded_at=time.time(), error=None)
+        return True
+
+
+def _watch(path, interval):
+    # 定时检查配置文件的修改时间，变了就重新加载
+    while not _stop.wait(interval):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if mtime != STATUS["mtime"]:
+            reload_profiles(path)
+
+
+def init_profiles():
+    """
+    加载 BAZI_PROFILES（没有配置时什么也不做），并启动热更新线程（BAZI_PROFILES_POLL > 0 时）。
+    配置文件有问题时抛 ValueError（服务启动即失败）；可以重复调用，只加载、启动一次
+    """
+    global _watcher
+    if not PROFILES_PATH:
+        return
+    with _lock:
+        if STATUS["loaded_at"] is not None:
+            return
+        compiled, default = load_profiles(PROFILES_PATH)
+        set_profiles(compiled, default)
+        STATUS.update(mtime=os.stat(PROFILES_PATH).st_mtime, loaded_at=time.time(), error=None)
+        if PROFILES_POLL > 0:
+            _stop.clear()
+            _watcher = threading.Thread(
+                target=_watch, args=(PROFILES_PATH, PROFILES_POLL), name="bazi-profiles", daemon=True)
+            _watcher.start()
+
+
+def stop_watcher():
+    """
+    停止热更新线程（服务关闭时调用）
+    """
+    global _watcher
+    _stop.set()
+    if _watcher is not None:
+        _watcher.join()
+        _watcher = None
+
+
+def profile_info():
+    """
+    当前方案列表（GET /profiles）: 默认方案名、各方案的参数指纹和完整参数、最近一次加载的状态
+    """
+    compiled, default = profiles()
+    return {
+        "default_profile": default,
+        "profiles": {
+            name: {"fingerprint": profile.fingerprint, "params": profile.params}
+            for name, profile in compiled.items()
+        },
+        "status": dict(STATUS),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("check", help="validate a profiles file and print the compiled profiles")
+    c.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "check":
+        try:
+            compiled, default = load_profiles(args.path)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        for name, profile in compiled.items():
+            marker = " (default)" if name == default else ""
+            print(f"{name}{marker}: fingerprint {profile.fingerprint}"
+                  f"{'' if profile.namespace else ', same as built-in'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
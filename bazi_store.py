@@ -0,0 +1,335 @@
+"""
+离线预计算命盘库：把每个合法四柱组合的分析结果（generate_summary 去掉 calc_bazi 部分）
+预先编码成 JSON，压缩后存进一个二进制文件；服务端用 mmap 打开，查表、解压即可返回，不再计算。
+多个 uvicorn worker 打开同一个文件时共享操作系统的页缓存。
+
+    python bazi_store.py build -o bazi_store.bin                  # 1900–2100 年出现过的全部四柱
+    python bazi_store.py build -o small.bin --first-year 1980 --last-year 1990
+    python bazi_store.py info bazi_store.bin
+
+BAZI_STORE=bazi_store.bin 启用。查不到的命盘（范围外的日期、分析会报错的命盘）照常计算。
+
+性别只出现在十神里日柱的 "元{性别} Day Master"（性别为空时是 "日主 Day Master"），
+所以库里按四柱存一份，用占位符代替性别，返回时再替换。
+
+每个命盘存一段 ',"fiveElementsScore":{...},"fiveElementsScore_eng":...' 形式的 JSON，
+用 raw deflate 单独压缩；各命盘的文本高度相似，压缩时共用一个预置字典（zdict，取自样例命盘），
+每个命盘压缩后只有几百字节，解压一次约几十微秒。另存每个字段在解压后文本中的起止，
+fields / lang 只要部分字段时直接切片拼接。
+
+文件格式（小端）:
+    8 字节 MAGIC，4 字节头部长度，JSON 头部（字段、各段偏移、构建信息）
+    chart_ids      uint32[命盘数]              四柱甲子序号压成一个整数，升序
+    blob_offsets   uint64[命盘数 + 1]          压缩数据在 blob_pool 里的起止
+    key_offsets    uint16[命盘数 × (字段数 + 1)]  各字段在解压后文本里的起止
+    zdict          bytes                       压缩用的预置字典
+    blob_pool      bytes                       各命盘的压缩数据
+"""
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+
+from bazi_calculator import JIAZI, JIAZI_INDEX, PILLAR_POSITIONS, RESULT_KEYS, Chart
+from bazi_json import dumps
+
+MAGIC = b"BAZISTO1"
+STORE_PATH = os.environ.get("BAZI_STORE", "")
+
+# 库里存的字段（"bazi" 由四柱现场生成）
+STORE_KEYS = RESULT_KEYS[1:]
+
+# 性别占位符：编码后是 "\u0000"
+GENDER_PLACEHOLDER = "\x00"
+PLACEHOLDER_DAY_MASTER = dumps(f"元{GENDER_PLACEHOLDER} Day Master")[1:-1]
+EMPTY_GENDER_DAY_MASTER = dumps("日主 Day Master")[1:-1]
+
+# raw deflate（不带 zlib 头尾）；预置字典最多用 32 KB
+WBITS = -15
+ZDICT_SIZE = 32768
+ZDICT_SAMPLES = 16
+COMPRESS_LEVEL = 9
+
+SECTIONS = (
+    ("chart_ids", "I"),
+    ("blob_offsets", "Q"),
+    ("key_offsets", "H"),
+    ("zdict", "B"),
+    ("blob_pool", "B"),
+)
+
+
+def pack_chart_id(indices):
+    """
+    (年, 月, 日, 时) 甲子序号 -> 一个整数（60 进制）
+    """
+    y, m, d, h = indices
+    return ((y * 60 + m) * 60 + d) * 60 + h
+
+
+def chart_id_of(fourPillars):
+    try:
+        return pack_chart_id([JIAZI_INDEX[fourPillars[pos]] for pos in PILLAR_POSITIONS])
+    except KeyError:
+        return None
+
+
+def valid_pillar_indices(first_year=None, last_year=None):
+    """
+    干支历覆盖范围内（或指定年份内）实际出现过的全部 (年, 月, 日, 时) 甲子序号组合，升序
+    每天 13 种时柱：12 个时辰，加上 23 点用次日日干起的晚子时
+    """
+    from datetime import date
+
+    import bazi_calendar as cal
+
+    first = cal.FIRST_ORDINAL if first_year is None else max(cal.FIRST_ORDINAL, date(first_year, 1, 1).toordinal())
+    last = cal.LAST_ORDINAL if last_year is None else min(cal.LAST_ORDINAL, date(last_year, 12, 31).toordinal())
+    combos = set()
+    for ordinal in range(first, last + 1):
+        y, m, d = cal.year_index(ordinal), cal.month_index(ordinal), cal.day_index(ordinal)
+        for hour in range(0, 24, 2):
+            combos.add((y, m, d, cal.hour_index(d, hour)))
+        combos.add((y, m, d, cal.hour_index(d, 23)))
+    return sorted(combos, key=pack_chart_id)
+
+
+def encode_chart(indices):
+    """
+    甲子序号 -> (',"key":value,...' 形式的 JSON, 各字段起止)；分析报错时返回 None
+    """
+    fourPillars = dict(zip(PILLAR_POSITIONS, (JIAZI[i] for i in indices)))
+    chart = Chart(fourPillars, fourPillars["日柱 Day Pillar"][0], GENDER_PLACEHOLDER)
+    try:
+        result = chart.result(STORE_KEYS)
+    except Exception:
+        return None  # 会报错的命盘不入库，服务时照常计算（并报同样的错）
+    parts = [b',"' + key.encode("utf-8") + b'":' + dumps(result[key]) for key in STORE_KEYS]
+    bounds = [0]
+    for part in parts:
+        bounds.append(bounds[-1] + len(part))
+    return b"".join(parts), bounds
+
+
+def build_zdict(combos, samples=ZDICT_SAMPLES):
+    """
+    从均匀分布的样例命盘拼出预置字典（靠后的内容压缩时引用距离最近，效果最好）
+    """
+    chunks = []
+    step = max(1, len(combos) // samples)
+    for indices in combos[::step]:
+        encoded = encode_chart(indices)
+        if encoded is not None:
+            chunks.append(encoded[0])
+    return b"".join(chunks)[-ZDICT_SIZE:]
+
+
+def build(path, first_year=None, last_year=None, out=sys.stderr):
+    """
+    预计算并写出命盘库，返回 (命盘数, 跳过的命盘数)
+    """
+    combos = valid_pillar_indices(first_year, last_year)
+    zdict = build_zdict(combos)
+    chart_ids = array("I")
+    blob_offsets = array("Q", [0])
+    key_offsets = array("H")
+    skipped = 0
+    start = time.time()
+
+    pool_path = path + ".pool.tmp"
+    with open(pool_path, "wb") as pool:
+        for n, indices in enumerate(combos, 1):
+            encoded = encode_chart(indices)
+            if encoded is None:
+                skipped += 1
+                continue
+            body, bounds = encoded
+            if bounds[-1] > 0xFFFF:
+                raise ValueError(f"chart {indices} encodes to {bounds[-1]} bytes, too long for the store")
+            compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, WBITS, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+            blob = compressor.compress(body) + compressor.flush()
+            pool.write(blob)
+            chart_ids.append(pack_chart_id(indices))
+            blob_offsets.append(blob_offsets[-1] + len(blob))
+            key_offsets.extend(bounds)
+            if n % 50000 == 0:
+                out.write(f"{n}/{len(combos)} charts, {blob_offsets[-1]} bytes, {time.time() - start:.0f}s\n")
+                out.flush()
+
+    sections = {
+        "chart_ids": chart_ids.tobytes(),
+        "blob_offsets": blob_offsets.tobytes(),
+        "key_offsets": key_offsets.tobytes(),
+        "zdict": zdict,
+    }
+    header = {
+        "keys": list(STORE_KEYS),
+        "charts": len(chart_ids),
+        "first_year": first_year,
+        "last_year": last_year,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sections": {},
+    }
+    lengths = {name: len(data) for name, data in sections.items()}
+    lengths["blob_pool"] = blob_offsets[-1]
+    # 头部长度会影响各段偏移：先算一遍，再留出余量固定下来
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    offset = _align(len(MAGIC) + 4 + len(header_bytes) + 256)
+    for name, _ in SECTIONS:
+        header["sections"][name] = [offset, lengths[name]]
+        offset = _align(offset + lengths[name])
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, _ in SECTIONS:
+            f.write(b"\0" * (header["sections"][name][0] - f.tell()))
+            if name == "blob_pool":
+                with open(pool_path, "rb") as pool:
+                    shutil.copyfileobj(pool, f)
+            else:
+                f.write(sections[name])
+    os.remove(pool_path)
+    os.replace(tmp, path)  # 原子替换，正在读旧文件的进程不受影响
+    return len(chart_ids), skipped
+
+
+def _align(offset, to=8):
+    return (offset + to - 1) // to * to
+
+
+class ChartStore:
+    """
+    只读 mmap 命盘库（线程安全：每次查询用独立的解压对象）
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a bazi chart store")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+        if tuple(self.header["keys"]) != STORE_KEYS:
+            raise ValueError(f"{path} was built for different result fields, rebuild it")
+
+        view = memoryview(self._mm)
+        for name, fmt in SECTIONS:
+            offset, length = self.header["sections"][name]
+            setattr(self, "_" + name, view[offset:offset + length].cast(fmt))
+        self._zdict = bytes(self._zdict)
+        self._key_index = {key: i for i, key in enumerate(STORE_KEYS)}
+        self._stride = len(STORE_KEYS) + 1
+
+    def __len__(self):
+        return len(self._chart_ids)
+
+    def __contains__(self, fourPillars):
+        return self._row(fourPillars) is not None
+
+    def close(self):
+        for name, _ in SECTIONS:
+            attr = getattr(self, "_" + name)
+            if isinstance(attr, memoryview):
+                attr.release()
+        self._mm.close()
+
+    def _row(self, fourPillars):
+        chart_id = chart_id_of(fourPillars)
+        if chart_id is None:
+            return None
+        i = bisect_left(self._chart_ids, chart_id)
+        if i == len(self._chart_ids) or self._chart_ids[i] != chart_id:
+            return None
+        return i
+
+    def _body(self, row):
+        decompressor = zlib.decompressobj(WBITS, zdict=self._zdict)
+        return decompressor.decompress(self._blob_pool[self._blob_offsets[row]:self._blob_offsets[row + 1]])
+
+    def summary_json(self, fourPillars, gender, keys=RESULT_KEYS):
+        """
+        命盘在库里时返回 generate_summary 的 JSON 字节串（keys 见 resolve_fields），否则返回 None
+        """
+        row = self._row(fourPillars)
+        if row is None:
+            return None
+        body = self._body(row)
+        if tuple(keys) != RESULT_KEYS:
+            bounds = self._key_offsets[row * self._stride:(row + 1) * self._stride]
+            body = b"".join(
+                body[bounds[i]:bounds[i + 1]] for i in (self._key_index[key] for key in keys if key != "bazi"))
+        if "bazi" in keys:
+            body = b'{"bazi":' + dumps(fourPillars) + body + b"}"
+        else:
+            body = b"{" + body[1:] + b"}"
+        if gender:
+            return body.replace(PLACEHOLDER_DAY_MASTER, dumps(f"元{gender} Day Master")[1:-1])
+        return body.replace(PLACEHOLDER_DAY_MASTER, EMPTY_GENDER_DAY_MASTER)
+
+    def info(self):
+        return {
+            "path": self.path,
+            "file_bytes": os.path.getsize(self.path),
+            "charts": len(self),
+            "first_year": self.header["first_year"],
+            "last_year": self.header["last_year"],
+            "built_at": self.header["built_at"],
+            "section_bytes": {name: self.header["sections"][name][1] for name, _ in SECTIONS},
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    BAZI_STORE 指定的命盘库（进程内只打开一次）；没有配置时返回 None
+    """
+    global _store
+    if not STORE_PATH:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ChartStore(STORE_PATH)
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precomputed chart store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="precompute every valid chart into a store file")
+    b.add_argument("-o", "--output", required=True)
+    b.add_argument("--first-year", type=int)
+    b.add_argument("--last-year", type=int)
+    i = sub.add_parser("info", help="print store statistics")
+    i.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.time()
+        charts, skipped = build(args.output, args.first_year, args.last_year)
+        info = ChartStore(args.output).info()
+        print(json.dumps({"skipped": skipped, "seconds": round(time.time() - start, 1), **info},
+                         indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(ChartStore(args.path).info(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+日期区间扫描：给定一个本命盘和一段日期，逐日（或逐时辰）给出流日 / 流时的干支和五行，
+并按本命盘的喜用神 / 忌神打分，用于「本月哪些日子适合你」。
+
+- 四柱由 bazi_calendar.iter_pillar_indices 递推生成，不为每一天构造 lunar_python 的 Solar 对象
+- 每个干支的五行（天干 1.0，地支按藏干权重）查 bazi_calculator.JIAZI_ELEMENTS，逐期只做查表和加法
+- 喜用神 / 忌神来自 suggest_five_elem（与 /bazi 的 favored_elements / unfavored_elements 相同）
+- 日期按干支历的日历日期（北京时间）理解，不做时区换算；本命盘照常按 tz 排盘
+
+    python bazi_sweep.py natal.json --start 2025-03-01 --end 2025-03-31 [--step hour] -o days.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from bazi_calculator import ELEMENT_INDEX, ELEMENTS, JIAZI, JIAZI_ELEMENTS, generate_summary
+from bazi_calendar import SHICHEN_HOURS, TABLE_FIRST_YEAR, TABLE_LAST_YEAR, in_range, iter_pillar_indices
+from bazi_json import dumps
+
+SWEEP_STEPS = ("day", "hour")
+# 单次扫描最多的期数（逐时辰每天 13 期）
+SWEEP_MAX_PERIODS = int(os.environ.get("BAZI_SWEEP_MAX", "100000"))
+# 流式输出时每次编码多少期
+SWEEP_CHUNK_SIZE = int(os.environ.get("BAZI_STREAM_CHUNK", "512"))
+
+
+def parse_range(start, end, step="day"):
+    """
+    "YYYY-MM-DD" 起止日期（含两端）+ 步长 -> (first, last, hours)；不合法时抛 ValueError
+    """
+    if step not in SWEEP_STEPS:
+        raise ValueError(f"Unknown step {step!r}, expected one of {SWEEP_STEPS}")
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    if last < first:
+        raise ValueError("end must not be before start")
+    if not (in_range(first.year, first.month, first.day) and in_range(last.year, last.month, last.day)):
+        raise ValueError(f"Date range must be within {TABLE_FIRST_YEAR}-01-01..{TABLE_LAST_YEAR}-12-31")
+    return first, last, SHICHEN_HOURS if step == "hour" else None
+
+
+def period_count(first, last, hours):
+    return (last.toordinal() - first.toordinal() + 1) * (len(hours) if hours else 1)
+
+
+def natal_elements(natal):
+    """
+    本命盘 -> (喜用五行列表, 忌五行列表)，走 generate_summary 的命盘缓存，只算到喜用神这一步
+    """
+    summary = generate_summary({
+        **natal,
+        "fields": ["favored_elements", "unfavored_elements"],
+        "lang": "zh",
+    })
+    return summary["favored_elements"], summary["unfavored_elements"]
+
+
+def iter_periods(first, last, hours, favored, unfavored):
+    """
+    逐期输出 {"date", ["hour"], "pillars", "elements", "score"}:
+    - pillars: 年、月、日（、时）柱干支
+    - elements: 该期各柱五行分量之和
+    - score: 喜用五行分量之和减去忌五行分量之和（同时出现在两边的五行相互抵消）
+    """
+    weights = [0] * len(ELEMENTS)
+    for elem in favored:
+        weights[ELEMENT_INDEX[elem]] += 1
+    for elem in unfavored:
+        weights[ELEMENT_INDEX[elem]] -= 1
+    pillar_scores = tuple(sum(w * x for w, x in zip(weights, vector)) for vector in JIAZI_ELEMENTS)
+
+    for day, hour, indices in iter_pillar_indices(first, last, hours):
+        if hour is None:
+            indices = indices[:3]
+        totals = [0.0] * len(ELEMENTS)
+        score = 0.0
+        for j in indices:
+            for k, x in enumerate(JIAZI_ELEMENTS[j]):
+                totals[k] += x
+            score += pillar_scores[j]
+        period = {"date": day.isoformat()}
+        if hour is not None:
+            period["hour"] = hour
+        period["pillars"] = [JIAZI[j] for j in indices]
+        period["elements"] = {elem: round(x, 3) for elem, x in zip(ELEMENTS, totals)}
+        period["score"] = round(score, 3)
+        yield period
+
+
+def sweep(natal, start, end, step="day"):
+    """
+    本命盘（BaziInput 的 birth / time / tz / gender）+ 日期区间 -> 逐期结果的生成器。
+    区间和本命盘在调用时就校验、排盘（出错直接抛异常），逐期结果在迭代时才生成。
+    """
+    first, last, hours = parse_range(start, end, step)
+    if period_count(first, last, hours) > SWEEP_MAX_PERIODS:
+        raise ValueError(f"At most {SWEEP_MAX_PERIODS} periods per sweep")
+    favored, unfavored = natal_elements(natal)
+    return iter_periods(first, last, hours, favored, unfavored)
+
+
+def iter_ndjson(periods, chunk_size=SWEEP_CHUNK_SIZE):
+    """
+    逐期结果 -> NDJSON 字节块（每块最多 chunk_size 行）
+    """
+    chunk = []
+    for period in periods:
+        chunk.append(dumps(period))
+        if len(chunk) >= chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every day / hour in a date range against a natal chart")
+    parser.add_argument("natal", help="JSON file with birth, time, tz, gender ('-' for stdin)")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--step", choices=SWEEP_STEPS, default="day")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default stdout)")
+    args = parser.parse_args(argv)
+
+    if args.natal == "-":
+        natal = json.load(sys.stdin)
+    else:
+        with open(args.natal, encoding="utf-8") as f:
+            natal = json.load(f)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for block in iter_ndjson(sweep(natal, args.start, args.end, args.step)):
+            out.write(block)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
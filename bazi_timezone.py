@@ -0,0 +1,216 @@
+"""
+时区解析与北京时间换算。
+
+- 时区对象只构造一次（按名称缓存），合法时区名在第一次校验时一次性载入 zone_index()
+  （pytz 逐个检查时区文件要几十毫秒，不放在导入路径上；服务预热时会先载入）
+- pytz 后端（默认）: 把每个时区的换算表编译成「UTC 秒数 -> 偏移」，远离夏令时切换点的时间
+  直接查表换算，靠近切换点（重复或不存在的本地时间）时仍交给 pytz.localize，结果与
+  localize(...).astimezone(...) 完全一致
+- zoneinfo 后端: BAZI_TZ_BACKEND=zoneinfo，使用标准库 zoneinfo（系统 tzdata），
+  重复 / 不存在的本地时间按 pytz 的 is_dst=False 规则选择
+- to_beijing_many: 批量换算，按时区分组后用 NumPy 一次查表
+- prime_zones: 服务启动时预先构造常用时区对象和换算表（BAZI_WARM_ZONES）
+"""
+import os
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pytz
+
+TZ_BACKENDS = ("pytz", "zoneinfo")
+TZ_BACKEND = os.environ.get("BAZI_TZ_BACKEND", "pytz").lower()
+if TZ_BACKEND not in TZ_BACKENDS:
+    raise ValueError(f"Unknown BAZI_TZ_BACKEND {TZ_BACKEND!r}, expected one of {TZ_BACKENDS}")
+
+BEIJING_TZ_NAME = "Asia/Shanghai"
+
+
+# 启动时预热的时区：逗号分隔的时区名，"all" 表示全部（约 600 个，多花一两秒启动时间）
+DEFAULT_WARM_ZONES = (
+    BEIJING_TZ_NAME, "Asia/Hong_Kong", "Asia/Taipei", "Asia/Singapore",
+    "America/New_York", "America/Los_Angeles", "Europe/London", "UTC",
+)
+WARM_ZONES = os.environ.get("BAZI_WARM_ZONES", ",".join(DEFAULT_WARM_ZONES))
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+SECOND = timedelta(seconds=1)
+
+# 本地时间离切换点至少这么远（秒）才走查表；所有 UTC 偏移都小于一天，
+# 两天的余量保证 pytz.localize 的前后一天探测落在同一个区间
+SAFE_MARGIN = 2 * 86400
+
+
+def local_seconds(dt):
+    """
+    naive datetime -> 相对 1970-01-01 的秒数（不涉及时区）
+    """
+    return (dt.toordinal() - EPOCH_ORDINAL) * 86400 + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """
+    时区名 -> pytz 时区对象（缓存）；未知时区抛 pytz.UnknownTimeZoneError，与 pytz.timezone 相同
+    """
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=None)
+def zone_index():
+    """
+    合法时区名索引（pytz 自带的 tz 数据库）
+    """
+    return frozenset(pytz.all_timezones)
+
+
+def is_valid_timezone(name):
+    if name in zone_index():
+        return True
+    try:
+        get_zone(name)  # pytz 也接受大小写不同的写法，如 "utc"
+    except pytz.UnknownTimeZoneError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _offset_table(name):
+    """
+    编译时区换算表: (区间起点 UTC 秒数, 区间 UTC 偏移秒数, 区间对应的 pytz tzinfo)
+    """
+    zone = get_zone(name)
+    times = getattr(zone, "_utc_transition_times", None)
+    if not times:  # UTC / Etc/GMT+5 等固定偏移
+        offset = zone.utcoffset(EPOCH)
+        return (float("-inf"),), (int(offset.total_seconds()),), (zone,)
+    starts = tuple(local_seconds(t) for t in times)
+    offsets = tuple(int(info[0].total_seconds()) for info in zone._transition_info)
+    tzinfos = tuple(zone._tzinfos[info] for info in zone._transition_info)
+    return starts, offsets, tzinfos
+
+
+@lru_cache(maxsize=None)
+def _aware_epochs(name):
+    # 每个区间一个带 tzinfo 的 1970-01-01，加秒数即得结果（比 replace(tzinfo=...) 快）
+    return tuple(EPOCH.replace(tzinfo=tzinfo) for tzinfo in _offset_table(name)[2])
+
+
+@lru_cache(maxsize=None)
+def _zoneinfo(name):
+    from zoneinfo import ZoneInfo
+
+    return ZoneInfo(get_zone(name).zone)
+
+
+def prime_zones(names=None):
+    """
+    预先构造时区对象和换算表，返回成功预热的时区数；未知时区直接跳过。
+    names 默认取 BAZI_WARM_ZONES
+    """
+    if names is None:
+        names = WARM_ZONES
+    if isinstance(names, str):
+        names = sorted(zone_index()) if names.strip().lower() == "all" else [n.strip() for n in names.split(",")]
+    done = 0
+    for name in names:
+        if not is_valid_timezone(name):
+            continue
+        if TZ_BACKEND == "zoneinfo":
+            _zoneinfo(name)
+        else:
+            _aware_epochs(name)  # 同时编译 _offset_table
+        done += 1
+    return done
+
+
+def _utc_seconds(name, local):
+    """
+    本地时间秒数 -> UTC 秒数；靠近切换点时返回 None（交给 pytz.localize）
+    """
+    starts, offsets, _ = _offset_table(name)
+    k = bisect_right(starts, local) - 1
+    utc = local - offsets[k]
+    end = starts[k + 1] if k + 1 < len(starts) else float("inf")
+    if starts[k] + SAFE_MARGIN <= utc < end - SAFE_MARGIN:
+        return utc
+    return None
+
+
+def _beijing_from_utc(utc):
+    # 与 DstTzInfo.fromutc 相同：找到 UTC 时刻所在区间，加上该区间的偏移
+    starts, offsets, _ = _offset_table(BEIJING_TZ_NAME)
+    idx = max(0, bisect_right(starts, utc) - 1)
+    return _aware_epochs(BEIJING_TZ_NAME)[idx] + SECOND * (utc + offsets[idx])
+
+
+def _localize_zoneinfo(dt, zone):
+    # pytz 的 is_dst=False: 重复时间取标准时间那一次，不存在的时间按标准时间偏移解释
+    first = dt.replace(tzinfo=zone)
+    second = dt.replace(tzinfo=zone, fold=1)
+    if first.utcoffset() != second.utcoffset() and not second.dst():
+        return second
+    return first
+
+
+def localize(dt, name):
+    """
+    naive 本地时间 -> 带时区的本地时间
+    """
+    if TZ_BACKEND == "zoneinfo":
+        return _localize_zoneinfo(dt, _zoneinfo(name))
+    return get_zone(name).localize(dt)
+
+
+def to_beijing(dt, name):
+    """
+    naive 本地时间 + 时区名 -> 北京时间（带时区）
+    等价于 pytz.timezone(name).localize(dt).astimezone(pytz.timezone("Asia/Shanghai"))
+    """
+    if TZ_BACKEND == "zoneinfo":
+        return localize(dt, name).astimezone(_zoneinfo(BEIJING_TZ_NAME))
+    utc = _utc_seconds(name, local_seconds(dt))
+    if utc is None:
+        return get_zone(name).localize(dt).astimezone(get_zone(BEIJING_TZ_NAME))
+    return _beijing_from_utc(utc)
+
+
+def to_beijing_many(items):
+    """
+    批量版 to_beijing。
+    输入: (naive 本地时间, 时区名) 列表
+    输出: 与输入一一对应的北京时间列表
+    """
+    results = [None] * len(items)
+    if TZ_BACKEND == "zoneinfo":
+        for i, (dt, name) in enumerate(items):
+            results[i] = to_beijing(dt, name)
+        return results
+
+    import numpy as np
+
+    groups = {}
+    for i, (dt, name) in enumerate(items):
+        groups.setdefault(name, []).append(i)
+
+    bj_starts, bj_offsets, _ = _offset_table(BEIJING_TZ_NAME)
+    bj_epochs = _aware_epochs(BEIJING_TZ_NAME)
+    bj_starts = np.asarray(bj_starts, dtype=np.float64)
+    bj_offsets = np.asarray(bj_offsets, dtype=np.int64)
+    for name, indices in groups.items():
+        starts, offsets, _ = _offset_table(name)
+        starts = np.asarray(starts, dtype=np.float64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        ends = np.append(starts[1:], np.inf)
+
+        local = np.fromiter((local_seconds(items[i][0]) for i in indices), dtype=np.int64, count=len(indices))
+        k = np.searchsorted(starts, local, side="right") - 1
+        utc = local - offsets[k]
+        safe = (starts[k] + SAFE_MARGIN <= utc) & (utc < ends[k] - SAFE_MARGIN)
+        idx = np.maximum(np.searchsorted(bj_starts, utc, side="right") - 1, 0)
+        bj_local = (utc + bj_offsets[idx]).tolist()
+
+        for i, ok, j, seconds in zip(indices, safe.tolist(), idx.tolist(), bj_local):
+            results[i] = bj_epochs[j] + SECOND * seconds if ok else to_beijing(*items[i])
+    return results
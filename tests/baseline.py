@@ -0,0 +1,187 @@
+"""
+查表之前的十神和喜忌建议计算（从改动前的 bazi_calculator.py 原样复制并冻结），作为查表的对照。
+不从 bazi_calculator 导入任何东西，查表或翻译有改动时测试能发现。
+"""
+STEM_TO_ELEMENT = {
+    "甲": "木",
+    "乙": "木",
+    "丙": "火",
+    "丁": "火",
+    "戊": "土",
+    "己": "土",
+    "庚": "金",
+    "辛": "金",
+    "壬": "水",
+    "癸": "水",
+}
+
+
+GENERATE = {"木": "火", "火": "土", "土": "金", "金": "水", "水": "木"}   # 我生
+
+OVERCOME = {"木": "土", "土": "水", "水": "火", "火": "金", "金": "木"}  # 我克
+
+# 五行阴阳
+STEM_POLARITY = {
+    "甲":"阳","乙":"阴",
+    "丙":"阳","丁":"阴",
+    "戊":"阳","己":"阴",
+    "庚":"阳","辛":"阴",
+    "壬":"阳","癸":"阴",
+}
+
+# ten-god english translations (optional)
+TEN_GODS_TRANSLATION = {
+    "比肩": "BiJian Star, Friend and Self (比肩)",
+    "劫财": "JieCai Star, Rival (劫财)",
+    "食神": "ShiShen Star, Artisan (食神)",
+    "伤官": "ShangGuan Star, Performer (伤官)",
+    "偏财": "PianCai Star, Opportunity Wealth (偏财)",
+    "正财": "ZhengCai Star, Stable Wealth (正财)",
+    "七杀": "QiSha Star, Challenger (七杀)",
+    "正官": "ZhengGuan Star, Authority (正官)",
+    "偏印": "PianYin Star, Unconventional Resource (偏印)",
+    "正印": "ZhengYin Star, Direct Resource (正印)",
+}
+
+TEN_GODS_TRANSLATION_REVERSE = {v: k for k, v in TEN_GODS_TRANSLATION.items()}
+
+
+def get_ten_god(dayMaster, other_gan):
+    """
+    Return the ten-god (Chinese) name for 'other_gan' relative to 'dayMaster'.
+    Deterministic based on five-element relation and yin/yang.
+    用来计算十神的一个中间步骤，比对日干和其他天干的关系，根据阴阳和五行生克来决定。
+    """
+    if dayMaster not in STEM_TO_ELEMENT or other_gan not in STEM_TO_ELEMENT:
+        return None  # invalid stems
+
+    if dayMaster == other_gan:
+        # same exact stem: treat as same-element with same polarity => 比肩
+        # (if you want to mark the day pillar itself, you can return "日主" externally)
+        return "比肩"
+
+    day_elem = STEM_TO_ELEMENT[dayMaster]
+    other_elem = STEM_TO_ELEMENT[other_gan]
+    day_pol = STEM_POLARITY[dayMaster] # 日干阴阳
+    other_pol = STEM_POLARITY[other_gan] # 其他天干阴阳
+
+# Same element as Day Master
+    if other_elem == day_elem:
+        return "BiJian Star, Friend and Self (比肩)" if other_pol == day_pol else "JieCai Star, Rival (劫财)"
+
+# Day Master generates other element => Output Stars
+    if GENERATE[day_elem] == other_elem:
+        return "ShiShen Star, Artisan (食神)" if other_pol == day_pol else "ShangGuan Star, Performer (伤官)"
+
+# Other element generates Day Master => Resource Stars
+    if GENERATE[other_elem] == day_elem:
+        return "PianYin Star, Unconventional Resource (偏印)" if other_pol == day_pol else "ZhengYin Star, Direct Resource (正印)"
+
+# Other element overcomes Day Master => Authority Stars
+    if OVERCOME[other_elem] == day_elem:
+        return "QiSha Star, Challenger (七杀)" if other_pol == day_pol else "ZhengGuan Star, Authority (正官)"
+
+# Day Master overcomes other element => Wealth Stars
+    if OVERCOME[day_elem] == other_elem:
+        return "PianCai Star, Opportunity Wealth (偏财)" if other_pol == day_pol else "ZhengCai Star, Stable Wealth (正财)"
+
+    # fallback (should not happen)
+    return None
+
+
+def elem_to_stem(elem):
+    """
+    把五行元素映射到对应的天干（阳+阴）。
+    返回一个 list，例如 木 -> ["甲", "乙"]
+    """
+    return [gan for gan, e in STEM_TO_ELEMENT.items() if e == elem]
+
+
+def ten_god_advice(dayMaster, favored_elems, unfavored_elems):
+    """
+    把五行喜忌翻译成十神喜忌 + 人事建议
+    支持一个五行对应多个十神（阴阳干）
+    """
+
+    favorable_map = {
+        "比肩": "代表自我、兄弟、伙伴。喜比肩时，多合作、结交志同道合的人，可以增强自信和行动力",
+        "劫财": "代表朋友、同伴、竞争。喜劫财时，朋友能带来帮助和资源共享",
+        "正印": "代表学习、贵人、保护。喜正印时，应多学习、提升学识，并依靠贵人支持",
+        "偏印": "代表灵感、创造、直觉。喜偏印时，有助于发展创造力、灵性与直觉",
+        "食神": "代表才华、子女、表达。喜食神时，应多发挥才华，注重表达与分享",
+        "伤官": "代表创造力、叛逆、表现。喜伤官时，可以勇于创新与表达自我",
+        "正财": "代表财富、责任、配偶。喜正财时，宜脚踏实地、注重理财和责任",
+        "偏财": "代表机会、变通、人脉。喜偏财时，应抓住机会、灵活变通，注重人脉关系",
+        "正官": "代表事业、责任、纪律。喜正官时，守纪律、重责任，有助于事业发展",
+        "七杀": "代表挑战、竞争、魄力。喜七杀时，敢于挑战、果断有魄力，有助于开拓事业"
+    }
+
+    unfavorable_map = {
+        "比肩": "忌比肩时，容易固执，与人对抗，需避免争强好胜",
+        "劫财": "忌劫财时，易生竞争与冲突，需要学会分享与设立界限",
+        "正印": "忌正印时，过于依赖他人，缺乏独立，需保持自主",
+        "偏印": "忌偏印时，容易不切实际或精神不安定，应脚踏实地",
+        "食神": "忌食神时，易懒散、贪图享乐，应自律",
+        "伤官": "忌伤官时，易冲动叛逆，与权威对抗，需控制情绪",
+        "正财": "忌正财时，可能过于物质或劳累，应适度理财并平衡生活",
+        "偏财": "忌偏财时，易投机取巧、感情不稳，应谨慎理财与感情",
+        "正官": "忌正官时，容易受束缚或压力过大，应学会调适与放松",
+        "七杀": "忌七杀时，过度压力或冲动冒险，需谨慎行事"
+    }
+
+    favorable_map_eng = {
+    "BiJian Star, Friend and Self (比肩)": "Represents self, siblings, and partners. When favorable, BiJian encourages cooperation and connecting with like-minded people, boosting confidence and initiative.",
+    "JieCai Star, Rival (劫财)": "Represents friends, companions, and competition. When favorable, JieCai means friends can bring help and share resources.",
+    "ZhengYin Star, Direct Resource (正印)": "Represents learning, mentors, and protection. When favorable, ZhengYin suggests focusing on study, knowledge growth, and support from benefactors.",
+    "PianYin Star, Unconventional Resource (偏印)": "Represents inspiration, creativity, and intuition. When favorable, PianYin enhances imagination, spirituality, and intuitive insight.",
+    "ShiShen Star, Artisan (食神)": "Represents talent, children, and expression. When favorable, ShiShen encourages showcasing talents and sharing with others.",
+    "ShangGuan Star, Performer (伤官)": "Represents creativity, rebellion, and performance. When favorable, ShangGuan brings courage to innovate and express oneself boldly.",
+    "ZhengCai Star, Stable Wealth (正财)": "Represents wealth, responsibility, and spouse. When favorable, ZhengCai emphasizes diligence, financial management, and responsibility.",
+    "PianCai Star, Opportunity Wealth (偏财)": "Represents opportunity, adaptability, and connections. When favorable, PianCai encourages seizing opportunities, flexibility, and building networks.",
+    "ZhengGuan Star, Authority (正官)": "Represents career, responsibility, and discipline. When favorable, ZhengGuan supports following rules, taking responsibility, and career advancement.",
+    "QiSha Star, Challenger (七杀)": "Represents challenges, competition, and drive. When favorable, QiSha brings courage, decisiveness, and the power to pioneer new paths."
+    }
+
+    unfavorable_map_eng = {
+    "BiJian Star, Friend and Self (比肩)": "When unfavorable, BiJian may cause stubbornness and conflict with others; avoid being overly competitive.",
+    "JieCai Star, Rival (劫财)": "When unfavorable, JieCai can bring rivalry and conflict; learn to share and set healthy boundaries.",
+    "ZhengYin Star, Direct Resource (正印)": "When unfavorable, ZhengYin may cause over-reliance on others and lack of independence; maintain autonomy.",
+    "PianYin Star, Unconventional Resource (偏印)": "When unfavorable, PianYin may lead to unrealistic thinking or mental instability; stay grounded.",
+    "ShiShen Star, Artisan (食神)": "When unfavorable, ShiShen may cause laziness and indulgence in pleasure; practice self-discipline.",
+    "ShangGuan Star, Performer (伤官)": "When unfavorable, ShangGuan may cause impulsiveness, rebellion, and conflict with authority; control emotions.",
+    "ZhengCai Star, Stable Wealth (正财)": "When unfavorable, ZhengCai may lead to materialism or overwork; manage finances wisely and seek balance.",
+    "PianCai Star, Opportunity Wealth (偏财)": "When unfavorable, PianCai may cause opportunism and unstable relationships; be cautious in money and love matters.",
+    "ZhengGuan Star, Authority (正官)": "When unfavorable, ZhengGuan may bring restrictions or excessive pressure; learn to adjust and relax.",
+    "QiSha Star, Challenger (七杀)": "When unfavorable, QiSha may cause excessive stress or reckless risk-taking; act with caution."
+    }
+
+
+    advice = []
+    advice_eng = []
+
+
+    # 喜神部分
+    for elem in favored_elems:
+        for gan in elem_to_stem(elem):
+            tg = get_ten_god(dayMaster, gan)
+            if tg and tg in favorable_map_eng:
+                reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
+                advice.append(f"喜{reverse_key}：{favorable_map[reverse_key]}")
+                advice_eng.append(f"Favorable {tg}: {favorable_map_eng[tg]}")
+
+    # 忌神部分
+    for elem in unfavored_elems:
+        for gan in elem_to_stem(elem):
+            tg = get_ten_god(dayMaster, gan)
+            if tg and tg in unfavorable_map_eng:
+                reverse_key = TEN_GODS_TRANSLATION_REVERSE[tg]
+                advice.append(f"忌{reverse_key}：{unfavorable_map[reverse_key]}")
+                advice_eng.append(f"Unfavorable {tg}: {unfavorable_map_eng[tg]}")
+
+    result = {
+        "advice":advice,
+        "advice_eng": advice_eng
+    }
+    return result
+
+
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+import bazi_executor
+from bazi_admission import AdmissionController, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_unlimited():
+    async def scenario():
+        admission = AdmissionController(max_inflight=0, queue_size=0, timeout=0.05)
+        for _ in range(5):
+            await admission.acquire()
+        assert admission.inflight == 5
+        for _ in range(5):
+            admission.release()
+        assert admission.inflight == 0
+
+    run(scenario())
+
+
+def test_queue_full_and_timeout():
+    async def scenario():
+        admission = AdmissionController(max_inflight=1, queue_size=1, timeout=0.05, retry_after=3)
+        await admission.acquire()
+        waiting = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+
+        with pytest.raises(Overloaded) as full:
+            await admission.acquire()
+        assert (full.value.reason, full.value.retry_after) == ("queue_full", 3)
+
+        with pytest.raises(Overloaded) as timeout:
+            await waiting
+        assert timeout.value.reason == "timeout"
+
+        stats = admission.stats()
+        assert stats["shed"] == {"queue_full": 1, "timeout": 1}
+        assert (stats["inflight"], stats["queue_depth"], stats["admitted"], stats["queued"]) == (1, 0, 1, 1)
+        admission.release()
+        assert admission.inflight == 0
+
+    run(scenario())
+
+
+def test_release_hands_slot_to_waiter():
+    async def scenario():
+        admission = AdmissionController(max_inflight=1, queue_size=1, timeout=1)
+        await admission.acquire()
+        waiting = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()
+        await waiting
+        assert (admission.inflight, admission.admitted, admission.queue_depth) == (1, 2, 0)
+        admission.release()
+        assert admission.inflight == 0
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("handed_off", [False, True])
+def test_cancelled_waiter(handed_off):
+    # 客户端在排队时断开：从队列里移除；名额已经转交给它时再转给下一个（没有下一个时归还）
+    async def scenario():
+        admission = AdmissionController(max_inflight=1, queue_size=1, timeout=1)
+        await admission.acquire()
+        waiting = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        if handed_off:
+            admission.release()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert admission.queue_depth == 0
+        if not handed_off:
+            admission.release()
+        assert admission.inflight == 0
+        assert admission.shed == {"queue_full": 0, "timeout": 0}
+
+    run(scenario())
+
+
+def test_bazi_returns_503_with_retry_after(monkeypatch):
+    admission = AdmissionController(max_inflight=1, queue_size=1, timeout=0.2, retry_after=7)
+    monkeypatch.setattr(bazi_executor, "ADMISSION", admission)
+    started, unblock = threading.Event(), threading.Event()
+    summary_json = bazi_executor.summary_json
+
+    def blocking(data, *rest):
+        started.set()
+        unblock.wait(5)
+        return summary_json(data, *rest)
+
+    monkeypatch.setattr(bazi_executor, "summary_json", blocking)
+    from bazi_api import bazi_api
+
+    # 每个请求用不同的出生时间，不命中请求缓存
+    def body(minute):
+        return {"birth": "1993-08-21", "time": f"07:{minute:02d}", "tz": "Asia/Shanghai", "gender": "女"}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=bazi_api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.post("/bazi", json=body(1)))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(client.post("/bazi", json=body(2)))
+            while admission.queue_depth == 0:
+                await asyncio.sleep(0.01)
+
+            third = await client.post("/bazi", json=body(3))
+            assert third.status_code == 503
+            assert third.headers["Retry-After"] == "7"
+            assert "queue_full" in third.json()["detail"]
+
+            second = await second
+            assert second.status_code == 503
+            assert second.headers["Retry-After"] == "7"
+            assert "timeout" in second.json()["detail"]
+
+            unblock.set()
+            assert (await first).status_code == 200
+            assert admission.shed == {"queue_full": 1, "timeout": 1}
+            assert admission.inflight == 0
+
+            metrics = (await client.get("/metrics")).text
+            assert "bazi_admission" in metrics
+
+    try:
+        run(scenario())
+    finally:
+        unblock.set()
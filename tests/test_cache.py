@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+
+import bazi_cache
+from bazi_cache import FakeRedisServer, MemoryCache, RedisCache, SQLiteCache, encode_key
+
+
+@pytest.fixture
+def redis_server():
+    server = FakeRedisServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make(request, tmp_path):
+    # 返回一个工厂：同一个测试里多次调用得到共用同一份存储的缓存（模拟多个进程）
+    if request.param == "memory":
+        return lambda maxsize=100, ttl=0: MemoryCache(maxsize, ttl)
+    if request.param == "sqlite":
+        path = str(tmp_path / "cache.sqlite")
+        return lambda maxsize=100, ttl=0: SQLiteCache(path, maxsize, ttl)
+    server = request.getfixturevalue("redis_server")
+    return lambda maxsize=100, ttl=0: RedisCache(server.url, maxsize, ttl)
+
+
+def key(i):
+    return (("甲子", "乙丑", "丙寅", f"丁卯{i}"), "男"), ("favored_elements",), None
+
+
+def test_get_put(make):
+    cache = make()
+    assert cache.get(key(1)) is None
+    cache.put(key(1), b'{"a":1}')
+    assert cache.get(key(1)) == b'{"a":1}'
+    cache.put(key(1), b'{"a":2}')
+    assert cache.get(key(1)) == b'{"a":2}'
+    assert len(cache) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["errors"]) == (2, 1, 0)
+
+
+def test_disabled(make):
+    cache = make(maxsize=0)
+    cache.put(key(1), b"x")
+    assert cache.get(key(1)) is None
+
+
+def test_evicts_oldest(make):
+    cache = make(maxsize=4)
+    for i in range(6):
+        cache.put(key(i), b"v%d" % i)
+        time.sleep(0.002)  # sqlite / redis 按时间戳排序
+    assert len(cache) == 4
+    assert [cache.get(key(i)) for i in range(6)] == [None, None, b"v2", b"v3", b"v4", b"v5"]
+
+
+def test_ttl(make):
+    cache = make(ttl=0.05)
+    cache.put(key(1), b"x")
+    cache.put(key(2), b"y", ttl=10)
+    assert cache.get(key(1)) == b"x"
+    time.sleep(0.1)
+    assert cache.get(key(1)) is None
+    assert cache.get(key(2)) == b"y"
+
+
+def test_get_or_compute_single_flight(make):
+    cache = make()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return b"value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key(1), compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b"value"] * 8
+    assert len(calls) == 1
+    assert cache.get(key(1)) == b"value"
+
+
+def test_get_or_compute_error_propagates(make):
+    cache = make()
+
+    def compute():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute(key(1), compute)
+    assert cache.get_or_compute(key(1), lambda: b"ok") == b"ok"
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_shared(request, tmp_path):
+    if request.param == "sqlite":
+        path = str(tmp_path / "cache.sqlite")
+        return lambda: SQLiteCache(path, 100, 0)
+    server = request.getfixturevalue("redis_server")
+    return lambda: RedisCache(server.url, 100, 0)
+
+
+def test_lease_handoff(make_shared):
+    # 另一个“进程”持有租约并写入结果：这边等它的结果，不自己计算
+    owner, waiter = make_shared(), make_shared()
+    assert owner._acquire(key(1))
+    assert not waiter._acquire(key(1))
+
+    def finish():
+        time.sleep(0.05)
+        owner.put(key(1), b"from owner")
+        owner._release(key(1))
+
+    thread = threading.Thread(target=finish)
+    thread.start()
+    calls = []
+    value = waiter.get_or_compute(key(1), lambda: calls.append(1) or b"from waiter")
+    thread.join()
+    assert value == b"from owner"
+    assert calls == []
+    assert waiter._acquire(key(1))  # 租约已释放
+    waiter._release(key(1))
+
+
+def test_lease_expires(make_shared, monkeypatch):
+    # 持有租约的一方一直不写入：等到租约过期后自己计算
+    monkeypatch.setattr(bazi_cache, "LEASE_SECONDS", 0.1)
+    owner, waiter = make_shared(), make_shared()
+    assert owner._acquire(key(1))
+    start = time.monotonic()
+    assert waiter.get_or_compute(key(1), lambda: b"computed") == b"computed"
+    assert time.monotonic() - start >= 0.1
+    assert owner.get(key(1)) == b"computed"
+
+
+def test_redis_eviction_deletes_keys(redis_server):
+    cache = RedisCache(redis_server.url, 2, 0)
+    for i in range(3):
+        cache.put(key(i), b"v")
+        time.sleep(0.002)
+    assert encode_key(key(0)).encode("utf-8") not in redis_server.data
+    assert redis_server.command("ZCARD", [cache.index_key.encode("utf-8")]) == 2
+
+
+def test_redis_reconnects(redis_server):
+    cache = RedisCache(redis_server.url, 100, 0)
+    cache.put(key(1), b"x")
+    sock, _ = cache.client._local.conn
+    sock.shutdown(2)  # 连接被断开（服务器重启、网络中断）
+    assert cache.get(key(1)) is None  # 出错只当作未命中
+    assert cache.stats()["errors"] == 1
+    assert cache.get(key(1)) == b"x"  # 下一次请求重新连接
+
+
+def test_redis_unreachable(redis_server):
+    url = redis_server.url
+    redis_server.shutdown()
+    redis_server.server_close()
+    cache = RedisCache(url, 100, 0)
+    assert cache.get_or_compute(key(1), lambda: b"computed") == b"computed"
+    assert cache.stats()["errors"] > 0
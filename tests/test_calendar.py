@@ -0,0 +1,97 @@
+import io
+import random
+from datetime import date, timedelta
+
+import pytest
+from lunar_python import Lunar, Solar
+
+from bazi_calendar import (
+    JIAZI,
+    SHICHEN_HOURS,
+    TABLE_FIRST_YEAR,
+    TABLE_LAST_YEAR,
+    hour_index,
+    iter_pillar_indices,
+    pillar_indices,
+    verify,
+)
+
+
+def lunar_pillars(year, month, day, hour, minute=0):
+    lunar = Solar.fromYmdHms(year, month, day, hour, minute, 0).getLunar()
+    return (lunar.getYearInGanZhi(), lunar.getMonthInGanZhi(), lunar.getDayInGanZhi(), lunar.getTimeInGanZhi())
+
+
+def table_pillars(year, month, day, hour):
+    return tuple(JIAZI[i] for i in pillar_indices(year, month, day, hour))
+
+
+def test_random_timestamps():
+    rng = random.Random(7)
+    first = date(TABLE_FIRST_YEAR, 1, 1).toordinal()
+    last = date(TABLE_LAST_YEAR, 12, 31).toordinal()
+    for _ in range(600):
+        d = date.fromordinal(rng.randint(first, last))
+        hour, minute = rng.randrange(24), rng.randrange(60)
+        assert table_pillars(d.year, d.month, d.day, hour) == lunar_pillars(d.year, d.month, d.day, hour, minute), \
+            (d, hour, minute)
+
+
+@pytest.mark.parametrize("year", [1900, 1949, 1984, 2024, 2057, 2100])
+def test_solar_term_boundaries(year):
+    # 每个节气（换月柱的节和中气）及正月初一（换年柱）的前一天、当天、后一天，子时两端和节气时刻
+    days = {}
+    for term in Solar.fromYmd(year, 6, 1).getLunar().getJieQiTable().values():
+        days[date(term.getYear(), term.getMonth(), term.getDay())] = term.getHour()
+    new_year = Lunar.fromYmd(year, 1, 1).getSolar()
+    days[date(new_year.getYear(), new_year.getMonth(), new_year.getDay())] = 0
+    for day, term_hour in days.items():
+        for d in (day - timedelta(days=1), day, day + timedelta(days=1)):
+            if not TABLE_FIRST_YEAR <= d.year <= TABLE_LAST_YEAR:
+                continue
+            for hour in {0, 23, term_hour}:
+                assert table_pillars(d.year, d.month, d.day, hour) == lunar_pillars(d.year, d.month, d.day, hour), \
+                    (d, hour)
+
+
+def test_zi_hour_boundary():
+    # 22:59 亥时；23:00–23:59 晚子时，时干按次日起、日柱不变；次日 00:00–00:59 早子时，01:00 起丑时
+    rng = random.Random(11)
+    first = date(TABLE_FIRST_YEAR, 1, 1).toordinal()
+    last = date(TABLE_LAST_YEAR, 12, 30).toordinal()
+    for _ in range(100):
+        d = date.fromordinal(rng.randint(first, last))
+        nxt = d + timedelta(days=1)
+        for (day, hour, minute) in ((d, 22, 59), (d, 23, 0), (d, 23, 59), (nxt, 0, 0), (nxt, 0, 59), (nxt, 1, 0)):
+            assert table_pillars(day.year, day.month, day.day, hour) == \
+                lunar_pillars(day.year, day.month, day.day, hour, minute), (day, hour, minute)
+        late = pillar_indices(d.year, d.month, d.day, 23)
+        early = pillar_indices(nxt.year, nxt.month, nxt.day, 0)
+        assert late[3] == early[3]
+        assert late[2] != early[2]
+        assert late[3] == hour_index(early[2], 0)
+
+
+def test_table_range():
+    assert pillar_indices(TABLE_FIRST_YEAR - 1, 12, 31, 12) is None
+    assert pillar_indices(TABLE_LAST_YEAR + 1, 1, 1, 12) is None
+    assert table_pillars(TABLE_FIRST_YEAR, 1, 1, 12) == lunar_pillars(TABLE_FIRST_YEAR, 1, 1, 12)
+    assert table_pillars(TABLE_LAST_YEAR, 12, 31, 12) == lunar_pillars(TABLE_LAST_YEAR, 12, 31, 12)
+    with pytest.raises(ValueError):
+        list(iter_pillar_indices(date(TABLE_LAST_YEAR, 12, 31), date(TABLE_LAST_YEAR + 1, 1, 1)))
+
+
+def test_iter_matches_pillar_indices():
+    first, last = date(1983, 12, 1), date(1985, 3, 1)
+    rows = list(iter_pillar_indices(first, last, SHICHEN_HOURS))
+    assert len(rows) == ((last - first).days + 1) * len(SHICHEN_HOURS)
+    for day, hour, indices in rows:
+        assert indices == pillar_indices(day.year, day.month, day.day, hour)
+
+
+@pytest.mark.slow
+def test_full_table_sweep():
+    # 1900–2100 逐日与 lunar_python 对比（python -m pytest -m slow）：年、月、日柱按日期换柱，
+    # 每天查 00 点和 23 点（早子时 / 晚子时）即可覆盖所有换柱日期和时干换日
+    out = io.StringIO()
+    assert verify(step_hours=23, out=out) == 0, out.getvalue()
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+
+from bazi_calculator import calc_bazi
+from bazi_hours import hour_charts, hour_slots, hour_summaries
+from bazi_timezone import to_beijing
+
+# 与北京相差奇数小时、半小时、整两小时的时区
+ZONES = ["America/New_York", "Asia/Kolkata", "Europe/London", "Asia/Shanghai", "Australia/Adelaide"]
+# 2024-03-10 是纽约的夏令时切换日（当地只有 23 小时）
+BIRTHS = ["1990-01-15", "1990-07-15", "2024-03-10"]
+
+
+@pytest.mark.parametrize("tz", ZONES)
+@pytest.mark.parametrize("birth", BIRTHS)
+def test_slots_cover_local_date(birth, tz):
+    slots = hour_slots(birth, tz)
+    assert 13 <= len(slots) <= 14
+    assert all(start.strftime("%Y-%m-%d") == birth == end.strftime("%Y-%m-%d") for _, start, end in slots)
+    assert slots[0][1].strftime("%H:%M") == "00:00"
+    assert slots[-1][2].strftime("%H:%M") == "23:59"
+    # 按北京时间首尾相接：下一段从上一段结束的下一分钟开始
+    for (_, _, end), (_, start, _) in zip(slots, slots[1:]):
+        assert to_beijing(start, tz) == to_beijing(end, tz) + timedelta(minutes=1)
+
+
+@pytest.mark.parametrize("tz", ZONES)
+@pytest.mark.parametrize("birth", BIRTHS)
+def test_distinct_charts_grouped_by_day(birth, tz):
+    data = {"birth": birth, "tz": tz, "gender": "男"}
+    charts = hour_charts(data)
+    pillars = [(bazi["fourPillars"]["日柱 Day Pillar"], bazi["fourPillars"]["时柱 Hour Pillar"]) for bazi in charts]
+    assert len(set(pillars)) == len(pillars)
+    assert 1 <= len({day for day, _ in pillars}) <= 2
+
+    summary = hour_summaries(data)
+    assert [group["day_pillar"] for group in summary["day_pillars"]] == list(dict.fromkeys(day for day, _ in pillars))
+    assert [name for group in summary["day_pillars"] for name in group["shichen"]] == \
+        [variant["shichen"] for variant in summary["variants"]]
+
+
+@pytest.mark.parametrize("tz", ZONES)
+def test_variants_match_single_chart(tz):
+    data = {"birth": "1990-01-15", "tz": tz, "gender": "女", "fields": ["bazi"]}
+    slots = hour_slots(data["birth"], tz)
+    summary = hour_summaries(data)
+    for (name, _, _), variant in zip(slots, summary["variants"]):
+        assert variant["shichen"] == name
+        single = calc_bazi(dict(data, birth=variant["birth"], time=variant["time"]))
+        assert variant["result"]["bazi"] == single["fourPillars"]
+        assert variant["day_pillar"] == single["fourPillars"]["日柱 Day Pillar"]
+        assert single["fourPillars"]["时柱 Hour Pillar"][1] == name[-1]
+    for key in summary["common_fields"]:
+        assert all(variant["result"][key] == summary["variants"][0]["result"][key] for variant in summary["variants"])
+
+
+def test_shanghai_early_and_late_zi():
+    summary = hour_summaries({"birth": "1990-01-15", "tz": "Asia/Shanghai", "gender": "男", "fields": ["bazi"]})
+    variants = summary["variants"]
+    assert [v["shichen"] for v in variants] == ["早子"] + list("丑寅卯辰巳午未申酉戌亥") + ["晚子"]
+    assert (variants[0]["time"], variants[0]["range"]) == ("00:00", "00:00-00:59")
+    assert (variants[-1]["time"], variants[-1]["range"]) == ("23:00", "23:00-23:59")
+    # 同一日柱，晚子时的时干按次日起
+    assert variants[0]["result"]["bazi"]["时柱 Hour Pillar"] == "丙子"
+    assert variants[-1]["result"]["bazi"]["时柱 Hour Pillar"] == "戊子"
+    assert summary["day_pillars"] == [{"day_pillar": "庚辰", "range": "00:00-23:59", "shichen": [v["shichen"] for v in variants]}]
+
+
+def test_new_york_labels():
+    summary = hour_summaries({"birth": "1990-01-15", "tz": "America/New_York", "gender": "男"})
+    variants = summary["variants"]
+    labels = [(v["shichen"], v["day_pillar"], v["birth"], v["time"], v["range"]) for v in variants]
+    assert labels[0] == ("未", "庚辰", "1990-01-15", "00:00", "00:00-01:59")
+    assert labels[5] == ("晚子", "庚辰", "1990-01-15", "10:00", "10:00-10:59")
+    assert labels[6] == ("早子", "辛巳", "1990-01-15", "11:00", "11:00-11:59")
+    assert labels[-1] == ("午", "辛巳", "1990-01-15", "22:00", "22:00-23:59")
+    assert [(g["day_pillar"], g["range"]) for g in summary["day_pillars"]] == \
+        [("庚辰", "00:00-10:59"), ("辛巳", "11:00-23:59")]
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import bazi_json
+from bazi_calculator import FIELD_GROUPS, LANGS, RESULT_KEYS, generate_summary
+from bazi_json import encode_summary, summary_json
+
+NATAL = {"birth": "1990-06-15", "time": "10:30", "tz": "Asia/Shanghai", "gender": "男"}
+
+FIELDS = [None] + [[group] for group in FIELD_GROUPS] + [
+    ["strength", "advice"],
+    ["favored_elements", "advice"],
+    ["tenGods_advice"],
+    ["elementSuggestion", "advice"],
+]
+
+
+def stdlib_json(result):
+    return json.dumps(result, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(bazi_json, "orjson", None)
+    elif bazi_json.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("lang", LANGS)
+@pytest.mark.parametrize("fields", FIELDS)
+def test_encode_summary_matches_json(encoder, fields, lang):
+    data = dict(NATAL, fields=fields, lang=lang)
+    result = generate_summary(data)
+    assert encode_summary(result) == stdlib_json(result)
+    assert json.loads(summary_json(data)) == result
+
+
+def test_full_result_uses_advice_fragments(monkeypatch):
+    monkeypatch.setattr(bazi_json, "orjson", None)
+    result = generate_summary(NATAL)
+    assert tuple(result) == RESULT_KEYS
+    assert encode_summary(result) == stdlib_json(result)
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+import bazi_calculator
+import bazi_profiles
+from bazi_batch import batch_summaries
+from bazi_calculator import (
+    DEFAULT_FINGERPRINT,
+    DEFAULT_PROFILE,
+    DEFAULT_PROFILE_NAME,
+    SUMMARY_CACHE,
+    calc_bazi,
+    chart_key,
+    generate_summary,
+    get_profile,
+    profiles,
+)
+from bazi_json import request_key
+
+NATAL = {"birth": "1990-06-15", "time": "10:30", "tz": "Asia/Shanghai", "gender": "男"}
+# 避开辰月（月令表含 "余"，原有的 KeyError）
+RECORDS = [
+    NATAL,
+    {"birth": "1985-01-20", "time": "23:30", "tz": "Asia/Shanghai", "gender": "女"},
+    {"birth": "2001-03-09", "time": "06:05", "tz": "America/New_York", "gender": "男"},
+    {"birth": "1972-09-30", "time": "14:45", "tz": "Europe/London", "gender": "女"},
+    {"birth": "2010-11-11", "time": "00:15", "tz": "Asia/Tokyo", "gender": "男"},
+]
+CONFIG = {
+    "default_profile": "classic",
+    "profiles": {
+        "classic": {"strength_ratio": 1.5},
+        "strong-month": {"position_weights": {"月支": 6.0}},
+        "lenient": {"strength_ratio": 0.01},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def restore_profiles(monkeypatch):
+    state = profiles()
+    monkeypatch.setattr(bazi_profiles, "STATUS", {"path": None, "mtime": None, "loaded_at": None, "error": None})
+    yield
+    bazi_calculator.set_profiles(*state)
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+
+    def write(config):
+        path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+        return str(path)
+
+    write(CONFIG)
+    monkeypatch.setenv("BAZI_PROFILES", str(path))
+    monkeypatch.setattr(bazi_profiles, "PROFILES_PATH", str(path))
+    monkeypatch.setattr(bazi_profiles, "PROFILES_POLL", 0)
+    return write
+
+
+def test_compile_non_default_profile(config_file):
+    compiled, default = bazi_profiles.load_profiles(config_file(CONFIG))
+    assert sorted(compiled) == sorted([DEFAULT_PROFILE_NAME, "classic", "strong-month", "lenient"])
+    assert default == "classic"
+    assert compiled[DEFAULT_PROFILE_NAME] is DEFAULT_PROFILE
+
+    strong = compiled["strong-month"]
+    assert strong.params["position_weights"]["月支"] == 6.0
+    assert strong.params["position_weights"]["月干"] == DEFAULT_PROFILE.params["position_weights"]["月干"]
+    assert strong.fingerprint != DEFAULT_FINGERPRINT
+    assert strong.namespace == strong.fingerprint
+    # 只有月柱的贡献变了
+    assert strong.pillar_increments[1] != DEFAULT_PROFILE.pillar_increments[1]
+    assert strong.pillar_increments[0] == DEFAULT_PROFILE.pillar_increments[0]
+
+
+@pytest.mark.parametrize("config", [
+    {"profiles": {"x": {"unknown": 1}}},
+    {"profiles": {"x": {"position_weights": {"月": 1.0}}}},
+    {"profiles": {"x": {"state_weights": {"旺": "high"}}}},
+    {"profiles": {"x": {"branch_hidden_stems": {"辰": []}}}},
+    {"profiles": {"x": {"branch_hidden_stems": {"辰": [["X", 0.5]]}}}},
+    {"profiles": {"x": {"strength_ratio": 0}}},
+    {"profiles": {"x": {}}, "default_profile": "y"},
+    {"profiles": []},
+])
+def test_load_rejects_invalid_config(config_file, config):
+    with pytest.raises(ValueError):
+        bazi_profiles.load_profiles(config_file(config))
+
+
+def test_load_rejects_invalid_json(config_file, tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(ValueError):
+        bazi_profiles.load_profiles(str(path))
+
+
+def test_reload_keeps_old_profiles_on_error(config_file):
+    bazi_profiles.init_profiles()
+    assert get_profile().name == "classic"
+    before = profiles()
+
+    config_file({"profiles": {"classic": {"strength_ratio": -1}}, "default_profile": "classic"})
+    assert not bazi_profiles.reload_profiles()
+    assert profiles() is before
+    assert "strength_ratio" in bazi_profiles.STATUS["error"]
+
+    config_file(dict(CONFIG, default_profile=DEFAULT_PROFILE_NAME))
+    assert bazi_profiles.reload_profiles()
+    assert get_profile() is DEFAULT_PROFILE
+    assert bazi_profiles.STATUS["error"] is None
+
+
+def test_cache_namespace_by_fingerprint(config_file):
+    bazi_profiles.init_profiles()
+    strong = get_profile("strong-month")
+    pillars = calc_bazi(NATAL)["fourPillars"]
+    assert chart_key(pillars, "男", strong) == chart_key(pillars, "男") + (strong.fingerprint,)
+    assert request_key(dict(NATAL, profile="strong-month")) != request_key(NATAL)
+
+    SUMMARY_CACHE.clear()
+    generate_summary(dict(NATAL, profile="strong-month"))
+    assert SUMMARY_CACHE.get(chart_key(pillars, "男", strong)) is not None
+    assert SUMMARY_CACHE.get(chart_key(pillars, "男")) is None
+    generate_summary(dict(NATAL, profile=DEFAULT_PROFILE_NAME))
+    assert SUMMARY_CACHE.get(chart_key(pillars, "男")) is not None
+
+
+def test_default_fingerprint_keeps_cache_keys(config_file):
+    bazi_profiles.init_profiles()
+    classic = get_profile("classic")
+    assert classic.fingerprint == DEFAULT_FINGERPRINT
+    assert classic.namespace is None
+    pillars = calc_bazi(NATAL)["fourPillars"]
+    assert chart_key(pillars, "男", classic) == chart_key(pillars, "男", DEFAULT_PROFILE) == chart_key(pillars, "男")
+    assert request_key(dict(NATAL, profile="classic")) == request_key(NATAL) == \
+        request_key(dict(NATAL, profile=DEFAULT_PROFILE_NAME))
+
+
+@pytest.mark.parametrize("name, field", [("strong-month", "fiveElementsScore"), ("lenient", "strength")])
+def test_profile_changes_single_and_batch_results(config_file, name, field):
+    bazi_profiles.init_profiles()
+    changed = 0
+    records = [dict(record, profile=name) for record in RECORDS]
+    batch = batch_summaries(records)["results"]
+    for record, item in zip(records, batch):
+        result = generate_summary(record)
+        assert item["result"] == result
+        changed += result[field] != generate_summary(dict(record, profile=DEFAULT_PROFILE_NAME))[field]
+    assert changed > 0
+    if name == "lenient":
+        assert all(item["result"]["strength"] == "身强" for item in batch)